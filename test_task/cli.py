@@ -0,0 +1,364 @@
+"""
+Maintenance commands.
+
+Usage: python -m test_task.cli <command> [options].
+"""
+import argparse
+import asyncio
+import json
+import statistics
+import sys
+import time
+from typing import Awaitable, List, Optional, Tuple
+
+from redis.asyncio import ConnectionPool
+from tortoise import Tortoise
+
+from test_task.db.config import TORTOISE_CONFIG
+from test_task.services.auth.hashing import (
+    PasswordHasher,
+    build_password_context,
+    get_hashed_password,
+    verify_password,
+)
+from test_task.services.auth.taken_names import taken_names
+from test_task.services.redis.compression import Compressor, lz4_frame
+from test_task.services.redis.leaderboard import Leaderboards
+from test_task.services.redis.sweeper import sweep_stale_keys
+from test_task.services.redis.warmup import warm_cache
+from test_task.settings import settings
+from test_task.web.api.currency_type.schema import CurrencyTypeModelDTO
+from test_task.web.api.router import api_router  # noqa: F401
+
+MEGABYTE = 1024 * 1024
+
+
+def _compression_payload(items: int) -> bytes:
+    """
+    Build value which looks like cached page of currency types.
+
+    :param items: quantity of items in the page.
+    :return: serialized page.
+    """
+    dtos = [
+        CurrencyTypeModelDTO(id=index, name=f"Currency {index}")
+        for index in range(items)
+    ]
+    return json.dumps([dto.model_dump_json() for dto in dtos]).encode()
+
+
+def _measure(
+    compression: Compressor,
+    payload: bytes,
+    rounds: int,
+) -> Tuple[bytes, float, float]:
+    """
+    Measure compression and decompression time.
+
+    :param compression: compressor.
+    :param payload: value to compress.
+    :param rounds: quantity of rounds.
+    :return: stored value, compression and decompression time.
+    """
+    stored = compression.compress(payload)
+    started = time.perf_counter()
+    for _ in range(rounds):
+        compression.compress(payload)
+    compress_time = time.perf_counter() - started
+    started = time.perf_counter()
+    for _ in range(rounds):
+        compression.decompress(stored)
+    return stored, compress_time, time.perf_counter() - started
+
+
+def benchmark_compression(args: argparse.Namespace) -> None:
+    """
+    Compare codecs by throughput and redis memory saved.
+
+    :param args: command line arguments.
+    """
+    payload = _compression_payload(args.items)
+    codecs = ["zlib"]
+    if lz4_frame is not None:
+        codecs.append("lz4")
+    payload_size = len(payload)
+    sys.stdout.write(f"payload: {payload_size} bytes, {args.rounds} rounds\n")
+    processed = payload_size * args.rounds / MEGABYTE
+    for codec in codecs:
+        stored, compress_time, decompress_time = _measure(
+            Compressor(codec=codec, min_size=0),
+            payload,
+            args.rounds,
+        )
+        stored_size = len(stored)
+        saved = 1 - stored_size / payload_size
+        compress_speed = processed / compress_time
+        decompress_speed = processed / decompress_time
+        sys.stdout.write(
+            f"{codec}: {stored_size} bytes stored, {saved:.1%} saved, "
+            + f"compress {compress_speed:.1f} MB/s, "
+            + f"decompress {decompress_speed:.1f} MB/s\n",
+        )
+
+
+async def _measure_lateness(interval: float, stop: asyncio.Event) -> List[float]:
+    """
+    Measure how late the loop wakes up a request which sleeps.
+
+    :param interval: sleep of the request.
+    :param stop: event which stops measuring.
+    :return: delays in seconds.
+    """
+    delays = []
+    while not stop.is_set():
+        started = time.perf_counter()
+        await asyncio.sleep(interval)
+        delays.append(time.perf_counter() - started - interval)
+    return delays
+
+
+async def _verify_inline(password: str, hashed_pass: str) -> bool:
+    """
+    Verify password on the event loop.
+
+    :param password: password.
+    :param hashed_pass: hashed password.
+    :return: flag if passwords equal.
+    """
+    return verify_password(password, hashed_pass)
+
+
+async def _login_storm(
+    logins: List[Awaitable[bool]],
+    interval: float,
+) -> List[float]:
+    """
+    Run logins while measuring latency of other requests.
+
+    :param logins: password checks.
+    :param interval: sleep of other requests.
+    :return: delays of other requests in seconds.
+    """
+    stop = asyncio.Event()
+    lateness = asyncio.create_task(_measure_lateness(interval, stop))
+    await asyncio.sleep(interval)
+    await asyncio.gather(*logins)
+    await asyncio.sleep(interval)
+    stop.set()
+    return await lateness
+
+
+async def benchmark_password_hashing(args: argparse.Namespace) -> None:
+    """
+    Compare latency of other requests during a login storm.
+
+    :param args: command line arguments.
+    """
+    password = "benchmark-password"
+    hashed_pass = get_hashed_password(password)
+    hasher = PasswordHasher(workers=args.workers, queue_size=args.logins)
+    modes = {
+        "inline": lambda: _verify_inline(password, hashed_pass),
+        "pool": lambda: hasher.verify(password, hashed_pass),
+    }
+    sys.stdout.write(f"{args.logins} concurrent logins, {args.workers} workers\n")
+    for mode, login in modes.items():
+        started = time.perf_counter()
+        delays = await _login_storm(
+            [login() for _ in range(args.logins)],
+            args.interval,
+        )
+        elapsed = time.perf_counter() - started
+        percentiles = statistics.quantiles(delays, n=100, method="inclusive")
+        median = percentiles[49] * 1000
+        tail = percentiles[98] * 1000
+        worst = max(delays) * 1000
+        sys.stdout.write(
+            f"{mode}: storm {elapsed:.2f}s, other requests delayed "
+            + f"p50 {median:.1f}ms, p99 {tail:.1f}ms, "
+            + f"max {worst:.1f}ms\n",
+        )
+    hasher.shutdown()
+
+
+def benchmark_password_cost(args: argparse.Namespace) -> None:
+    """
+    Measure hashing speed of one thread for every cost.
+
+    :param args: command line arguments.
+    """
+    password = "benchmark-password"
+    scheme, seconds = args.scheme, args.seconds
+    sys.stdout.write(f"{scheme}, {seconds:.1f}s per cost\n")
+    for cost in args.costs:
+        context = build_password_context(scheme, cost)
+        hashes = 0
+        started = time.perf_counter()
+        deadline = started + seconds
+        while not hashes or time.perf_counter() < deadline:
+            context.hash(password)
+            hashes += 1
+        elapsed = time.perf_counter() - started
+        rate = hashes / elapsed
+        latency = elapsed / hashes * 1000
+        marker = " (current)" if cost == settings.password_hash_rounds else ""
+        sys.stdout.write(
+            f"rounds {cost}: {rate:.1f} hashes/sec, "
+            + f"{latency:.1f}ms per hash{marker}\n",
+        )
+
+
+async def warm_cache_command(args: argparse.Namespace) -> None:
+    """
+    Fill the most requested cache keys.
+
+    Cacheable handlers are registered when routers are imported.
+
+    :param args: command line arguments.
+    """
+    await Tortoise.init(config=TORTOISE_CONFIG)
+    redis_pool = ConnectionPool.from_url(str(settings.redis_url))
+    try:  # noqa: WPS501
+        filled = await warm_cache(
+            redis_pool,
+            limit=args.keys,
+            concurrency=args.concurrency,
+        )
+    finally:
+        await redis_pool.disconnect()
+        await Tortoise.close_connections()
+    sys.stdout.write(f"warmed {filled} keys\n")
+
+
+async def sweep_cache_command(args: argparse.Namespace) -> None:
+    """
+    Remove keys of old namespace versions.
+
+    :param args: command line arguments.
+    """
+    redis_pool = ConnectionPool.from_url(str(settings.redis_url))
+    try:  # noqa: WPS501
+        removed = await sweep_stale_keys(redis_pool, batch=args.batch)
+    finally:
+        await redis_pool.disconnect()
+    sys.stdout.write(f"removed {removed} stale keys\n")
+
+
+async def rebuild_registration_filter(args: argparse.Namespace) -> None:
+    """
+    Rebuild filter of registered emails and usernames.
+
+    :param args: command line arguments.
+    """
+    await Tortoise.init(config=TORTOISE_CONFIG)
+    redis_pool = ConnectionPool.from_url(str(settings.redis_url))
+    taken_names.batch = args.batch
+    taken_names.enable(redis_pool)
+    try:  # noqa: WPS501
+        users = await taken_names.rebuild()
+    finally:
+        taken_names.disable()
+        await redis_pool.disconnect()
+        await Tortoise.close_connections()
+    sys.stdout.write(f"added {users} users\n")
+
+
+async def rebuild_leaderboards(args: argparse.Namespace) -> None:
+    """
+    Rebuild character leaderboards from the database.
+
+    :param args: command line arguments.
+    """
+    await Tortoise.init(config=TORTOISE_CONFIG)
+    redis_pool = ConnectionPool.from_url(str(settings.redis_url))
+    try:  # noqa: WPS501
+        characters = await Leaderboards(redis_pool, batch=args.batch).rebuild()
+    finally:
+        await redis_pool.disconnect()
+        await Tortoise.close_connections()
+    sys.stdout.write(f"added {characters} characters\n")
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    """
+    Entrypoint of the maintenance commands.
+
+    :param argv: command line arguments.
+    """
+    parser = argparse.ArgumentParser(prog="python -m test_task.cli")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    compression = commands.add_parser(
+        "benchmark-compression",
+        help="compare cache compression codecs",
+    )
+    compression.add_argument("--items", type=int, default=1000)
+    compression.add_argument("--rounds", type=int, default=100)
+    compression.set_defaults(handler=benchmark_compression)
+
+    warmup = commands.add_parser("warm-cache", help="fill the most requested keys")
+    warmup.add_argument("--keys", type=int, default=settings.cache_warmup_keys)
+    warmup.add_argument(
+        "--concurrency",
+        type=int,
+        default=settings.cache_warmup_concurrency,
+    )
+    warmup.set_defaults(handler=warm_cache_command)
+
+    sweeper = commands.add_parser("sweep-cache", help="remove keys of old versions")
+    sweeper.add_argument("--batch", type=int, default=settings.cache_sweeper_batch)
+    sweeper.set_defaults(handler=sweep_cache_command)
+
+    registration = commands.add_parser(
+        "rebuild-registration-filter",
+        help="rebuild filter of registered emails and usernames",
+    )
+    registration.add_argument(
+        "--batch",
+        type=int,
+        default=settings.registration_filter_batch,
+    )
+    registration.set_defaults(handler=rebuild_registration_filter)
+
+    leaderboards = commands.add_parser(
+        "rebuild-leaderboards",
+        help="rebuild character leaderboards from the database",
+    )
+    leaderboards.add_argument("--batch", type=int, default=settings.leaderboard_batch)
+    leaderboards.set_defaults(handler=rebuild_leaderboards)
+
+    hashing = commands.add_parser(
+        "benchmark-password-hashing",
+        help="compare latency of other requests during a login storm",
+    )
+    hashing.add_argument("--logins", type=int, default=50)
+    hashing.add_argument(
+        "--workers",
+        type=int,
+        default=settings.password_hash_workers,
+    )
+    hashing.add_argument("--interval", type=float, default=0.005)
+    hashing.set_defaults(handler=benchmark_password_hashing)
+
+    cost = commands.add_parser(
+        "benchmark-password-cost",
+        help="measure password hashes per second for every cost",
+    )
+    cost.add_argument("--scheme", default=settings.password_hash_scheme)
+    cost.add_argument(
+        "--costs",
+        type=int,
+        nargs="+",
+        default=[10, 11, 12, 13, 14],
+    )
+    cost.add_argument("--seconds", type=float, default=1)
+    cost.set_defaults(handler=benchmark_password_cost)
+
+    args = parser.parse_args(argv)
+    command = args.handler(args)
+    if asyncio.iscoroutine(command):
+        asyncio.run(command)
+
+
+if __name__ == "__main__":
+    main()
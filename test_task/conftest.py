@@ -1,5 +1,5 @@
 import uuid
-from typing import Any, AsyncGenerator
+from typing import Any, AsyncGenerator, Callable, Iterator, List
 from unittest.mock import Mock
 
 import nest_asyncio
@@ -18,7 +18,11 @@ from tortoise.contrib.test import finalizer, initializer
 from test_task.db.config import MODELS_MODULES, TORTOISE_CONFIG
 from test_task.services.rabbit.dependencies import get_rmq_channel_pool
 from test_task.services.rabbit.lifetime import init_rabbit, shutdown_rabbit
+from test_task.services.redis.adaptive_ttl import ttl_policy
+from test_task.services.redis.cache import circuit_breaker
 from test_task.services.redis.dependency import get_redis_pool
+from test_task.services.redis.local_cache import local_cache
+from test_task.services.redis.sketch import key_sketch
 from test_task.settings import settings
 from test_task.web.application import get_app
 
@@ -148,9 +152,35 @@ async def fake_redis_pool() -> AsyncGenerator[ConnectionPool, None]:
 
     yield pool
 
+    local_cache.clear()
+    circuit_breaker.reset()
+    key_sketch.reset()
+    ttl_policy.reset()
     await pool.disconnect()
 
 
+@pytest.fixture
+def enable_service(
+    fake_redis_pool: ConnectionPool,
+) -> Iterator[Callable[[Any], Any]]:
+    """
+    Enable redis services with the fake redis, they're disabled after test.
+
+    :param fake_redis_pool: fake redis pool.
+    :yield: function which enables the service and returns it.
+    """
+    enabled: List[Any] = []
+
+    def enable(service: Any) -> Any:  # noqa: WPS430
+        service.enable(fake_redis_pool)
+        enabled.append(service)
+        return service
+
+    yield enable
+    for service in enabled:
+        service.disable()
+
+
 @pytest.fixture
 def fastapi_app(
     fake_redis_pool: ConnectionPool,
@@ -1,5 +1,6 @@
-from typing import List, Optional
+from typing import Dict, List, Optional, Sequence
 
+from test_task.db.dao.row_cache import row_cache
 from test_task.db.models.models import Character
 
 
@@ -29,20 +30,39 @@ class CharacterDAO:
             experience=experience,
         )
 
-    async def get_character_by_id(self, character_id: int) -> Optional[Character]:
+    async def get_character_by_id(
+        self,
+        character_id: int,
+        fresh: bool = False,
+    ) -> Optional[Character]:
         """
         Get a character by ID.
 
         :param character_id: ID of the character.
+        :param fresh: read from the database, skipping the cache.
         :return: character instance or None.
         """
-        return (
-            await Character.filter(id=character_id)
-            .prefetch_related(
+        character = await row_cache.get(Character, character_id, fresh=fresh)
+        if character:
+            await row_cache.fetch_related(
+                character,
                 "user",
+                fresh=fresh,
             )
-            .first()
-        )
+        return character
+
+    async def get_characters_by_ids(
+        self,
+        character_ids: Sequence[int],
+    ) -> Dict[int, Character]:
+        """
+        Get characters by IDs.
+
+        :param character_ids: IDs of the characters.
+        :return: characters by IDs, missing ones are skipped.
+        """
+        characters = await Character.filter(id__in=character_ids)
+        return {character.id: character for character in characters}
 
     async def get_all_characters(self, limit: int, offset: int) -> List[Character]:
         """
@@ -89,7 +109,7 @@ class CharacterDAO:
         :param experience: new experience points of the character (optional).
         :return: updated character instance or None if character not found.
         """
-        character = await self.get_character_by_id(character_id)
+        character = await self.get_character_by_id(character_id, fresh=True)
         if not character:
             return None
 
@@ -1,5 +1,6 @@
 from typing import List, Optional
 
+from test_task.db.dao.row_cache import row_cache
 from test_task.db.models.models import Character, CurrencyBalance, CurrencyType
 
 
@@ -34,21 +35,24 @@ class CurrencyBalanceDAO:
     async def get_currency_balance_by_id(
         self,
         balance_id: int,
+        fresh: bool = False,
     ) -> Optional[CurrencyBalance]:
         """
         Get currency balance by ID.
 
         :param balance_id: ID of the currency balance.
+        :param fresh: read from the database, skipping the cache.
         :return: currency balance instance or None.
         """
-        return (
-            await CurrencyBalance.filter(id=balance_id)
-            .prefetch_related(
+        currency_balance = await row_cache.get(CurrencyBalance, balance_id, fresh=fresh)
+        if currency_balance:
+            await row_cache.fetch_related(
+                currency_balance,
                 "character",
                 "currency_type",
+                fresh=fresh,
             )
-            .first()
-        )
+        return currency_balance
 
     async def get_all_currency_balances(
         self,
@@ -103,7 +107,7 @@ class CurrencyBalanceDAO:
         :param currency_type_id: currency type id (optional).
         :return: updated currency balance instance or None.
         """
-        currency_balance = await self.get_currency_balance_by_id(balance_id)
+        currency_balance = await self.get_currency_balance_by_id(balance_id, fresh=True)
         if not currency_balance:
             return None
         await currency_balance.fetch_related(
@@ -1,5 +1,6 @@
 from typing import List, Optional
 
+from test_task.db.dao.row_cache import row_cache
 from test_task.db.models.models import CurrencyType
 
 
@@ -23,14 +24,19 @@ class CurrencyTypeDAO:
             description=description,
         )
 
-    async def get_currency_type_by_id(self, type_id: int) -> Optional[CurrencyType]:
+    async def get_currency_type_by_id(
+        self,
+        type_id: int,
+        fresh: bool = False,
+    ) -> Optional[CurrencyType]:
         """
         Get currency type by ID.
 
         :param type_id: ID of the currency type.
+        :param fresh: read from the database, skipping the cache.
         :return: currency type instance or None.
         """
-        return await CurrencyType.filter(id=type_id).first()
+        return await row_cache.get(CurrencyType, type_id, fresh=fresh)
 
     async def get_all_currency_types(
         self,
@@ -75,7 +81,7 @@ class CurrencyTypeDAO:
         :param description: new description of the currency type (optional).
         :return: updated currency type instance or None if currency type not found.
         """
-        currency_type = await self.get_currency_type_by_id(type_id)
+        currency_type = await self.get_currency_type_by_id(type_id, fresh=True)
         if not currency_type:
             return None
 
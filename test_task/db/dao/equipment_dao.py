@@ -4,6 +4,7 @@ import tortoise
 from loguru import logger
 from tortoise.exceptions import ValidationError
 
+from test_task.db.dao.row_cache import row_cache
 from test_task.db.models.models import Character, CurrencyType, Equipment
 
 
@@ -64,18 +65,25 @@ class EquipmentDAO:
         )
         return equipment
 
-    async def get_equipment_by_id(self, equipment_id: int) -> Optional[Equipment]:
+    async def get_equipment_by_id(
+        self,
+        equipment_id: int,
+        fresh: bool = False,
+    ) -> Optional[Equipment]:
         """
         Get equipment by ID.
 
         :param equipment_id: ID of the equipment.
+        :param fresh: read from the database, skipping the cache.
         :return: equipment instance or None.
         """
-        equipment = await Equipment.filter(id=equipment_id).first()
+        equipment = await row_cache.get(Equipment, equipment_id, fresh=fresh)
         if equipment:
-            await equipment.fetch_related(
+            await row_cache.fetch_related(
+                equipment,
                 "character",
                 "currency_type",
+                fresh=fresh,
             )
         return equipment
 
@@ -163,7 +171,7 @@ class EquipmentDAO:
         :raises ValidationError: HTTPException
         :return: updated equipment instance or None if equipment not found.
         """
-        equipment = await self.get_equipment_by_id(equipment_id)
+        equipment = await self.get_equipment_by_id(equipment_id, fresh=True)
         if not equipment:
             return None
         await equipment.fetch_related(
@@ -1,5 +1,6 @@
 from typing import List, Optional
 
+from test_task.db.dao.row_cache import row_cache
 from test_task.db.models.models import Character, Inventory
 
 
@@ -31,16 +32,25 @@ class InventoryDAO:
         await inventory.fetch_related("character")
         return inventory
 
-    async def get_inventory_by_id(self, inventory_id: int) -> Optional[Inventory]:
+    async def get_inventory_by_id(
+        self,
+        inventory_id: int,
+        fresh: bool = False,
+    ) -> Optional[Inventory]:
         """
         Get inventory by ID.
 
         :param inventory_id: ID of the inventory.
+        :param fresh: read from the database, skipping the cache.
         :return: inventory instance or None.
         """
-        inventory = await Inventory.filter(id=inventory_id).first()
+        inventory = await row_cache.get(Inventory, inventory_id, fresh=fresh)
         if inventory:
-            await inventory.fetch_related("character")
+            await row_cache.fetch_related(
+                inventory,
+                "character",
+                fresh=fresh,
+            )
         return inventory
 
     async def get_all_inventory(self, limit: int, offset: int) -> List[Inventory]:
@@ -94,7 +104,7 @@ class InventoryDAO:
         :param quantity: new quantity of the item (optional).
         :return: updated inventory instance or None if inventory item not found.
         """
-        inventory = await self.get_inventory_by_id(inventory_id)
+        inventory = await self.get_inventory_by_id(inventory_id, fresh=True)
         if not inventory:
             return None
         await inventory.fetch_related(
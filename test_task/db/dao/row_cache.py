@@ -0,0 +1,397 @@
+"""Read-through cache of rows fetched by primary key."""
+import contextvars
+import enum
+import functools
+import json
+from contextlib import asynccontextmanager
+from typing import (  # noqa: WPS235
+    Any,
+    AsyncIterator,
+    Awaitable,
+    Callable,
+    List,
+    Optional,
+    Sequence,
+    Type,
+    TypeVar,
+    cast,
+)
+
+from tortoise.backends.base.client import BaseDBAsyncClient, BaseTransactionWrapper
+from tortoise.fields.relational import BackwardFKRelation, ForeignKeyFieldInstance
+from tortoise.models import Model
+from tortoise.signals import Signals
+from tortoise.transactions import in_transaction
+
+from test_task.db.listeners import Listeners, ModelListener
+from test_task.db.models.models import (
+    Character,
+    CurrencyBalance,
+    CurrencyType,
+    Equipment,
+    Inventory,
+    Transaction,
+    User,
+    UserProfile,
+)
+from test_task.services.redis.cache import Cache, get_cache
+from test_task.settings import settings
+
+MODEL = TypeVar("MODEL", bound=Model)
+# Marker which replaces invalidated row, fills don't overwrite it.
+FENCE = b"\x00fence"
+# Callbacks which run after commit of the current row_cache.transaction.
+CommitCallback = Callable[[], Awaitable[Any]]
+CommitCallbacks = Optional[List[CommitCallback]]
+_after_commit: "contextvars.ContextVar[CommitCallbacks]" = contextvars.ContextVar(
+    "after_commit",
+    default=None,
+)
+
+
+def generate_row_key(model: Type[Model], pk: Any) -> str:
+    """
+    Generate cache key of the row.
+
+    Table name is the cache namespace, so all rows
+    of the table can be invalidated at once.
+
+    :param model: model class.
+    :param pk: primary key.
+    :return: key.
+    """
+    table = model._meta.db_table  # noqa: WPS437
+    return f"{table}:{pk}"
+
+
+def _default(value: Any) -> Any:
+    """
+    Convert field value which json can't encode.
+
+    :param value: field value.
+    :return: json compatible value.
+    """
+    if isinstance(value, enum.Enum):
+        return value.value
+    return str(value)
+
+
+def encode_row(instance: Model) -> str:
+    """
+    Serialize db fields of the model instance.
+
+    Values are stored as a list in order of the model fields,
+    so field names aren't repeated in every entry.
+
+    :param instance: model instance.
+    :return: serialized row.
+    """
+    projection = instance._meta.fields_db_projection  # noqa: WPS437
+    return json.dumps(
+        [getattr(instance, name) for name in projection],
+        default=_default,
+        separators=(",", ":"),
+    )
+
+
+def decode_row(model: Type[MODEL], cached_row: Any) -> Optional[MODEL]:
+    """
+    Build model instance from the serialized row.
+
+    :param model: model class.
+    :param cached_row: serialized row.
+    :return: model instance or None if the row has other fields.
+    """
+    row_values = json.loads(cached_row)
+    meta = model._meta  # noqa: WPS437
+    projection = meta.fields_db_projection
+    if len(row_values) != len(projection):
+        return None
+    fields_map = meta.fields_map
+    return model._init_from_db(  # noqa: WPS437
+        **{
+            column: fields_map[name].to_python_value(row_value)
+            for (name, column), row_value in zip(projection.items(), row_values)
+        },
+    )
+
+
+def _dependent_models(model: Type[Model]) -> List[Type[Model]]:
+    """
+    Get models which reference the model directly or transitively.
+
+    :param model: model class.
+    :return: dependent models.
+    """
+    dependents: List[Type[Model]] = []
+    pending = [model]
+    while pending:
+        current = pending.pop()
+        fields_map = current._meta.fields_map  # noqa: WPS437
+        for field in fields_map.values():
+            if not isinstance(field, BackwardFKRelation):
+                continue
+            related = field.related_model
+            if related not in dependents and related is not model:
+                dependents.append(related)
+                pending.append(related)
+    return dependents
+
+
+def after_commit(callback: CommitCallback) -> bool:
+    """
+    Run callback after commit of the current row_cache.transaction.
+
+    Callbacks of rolled back transactions never run.
+
+    :param callback: coroutine function without arguments.
+    :return: False outside of row_cache.transaction, callback isn't run then.
+    """
+    callbacks = _after_commit.get()
+    if callbacks is None:
+        return False
+    callbacks.append(callback)
+    return True
+
+
+def _in_transaction(model: Type[Model]) -> bool:
+    """
+    Check whether queries of the model run in a transaction.
+
+    :param model: model class.
+    :return: True inside in_transaction.
+    """
+    return isinstance(model._meta.db, BaseTransactionWrapper)  # noqa: WPS437
+
+
+class RowCache(ModelListener):
+    """
+    Read-through cache of model rows keyed by model and pk.
+
+    Cache is disabled until it gets redis pool. Rows are dropped
+    by post_save and post_delete signals of the cached models,
+    listeners are registered when cache is enabled.
+    Rows which are removed by database cascades are dropped
+    with namespaces of the dependent models.
+
+    Dropped row is replaced with a fence for fence_ttl seconds and
+    fills don't overwrite existing keys, so a fill which has read
+    the row before the change can't put it back. Lookups inside
+    transactions skip the cache. Rows saved inside transaction are
+    fenced on save and again after commit of transaction.
+    """
+
+    def __init__(
+        self,
+        models: Sequence[Type[Model]],
+        ttl: int = settings.dao_cache_ttl,
+        fence_ttl: int = settings.dao_cache_fence_ttl,
+    ):
+        super().__init__()
+        self.models = frozenset(models)
+        self.ttl = ttl
+        self.fence_ttl = fence_ttl
+
+    def listeners(self) -> Listeners:
+        """
+        Drop rows of the cached models on save and delete.
+
+        :return: listeners.
+        """
+        listeners: Listeners = []
+        for model in self.models:
+            listeners.append((model, Signals.post_save, self._on_save))
+            listeners.append((model, Signals.post_delete, self._on_delete))
+        return listeners
+
+    async def get(
+        self,
+        model: Type[MODEL],
+        pk: Any,
+        fresh: bool = False,
+    ) -> Optional[MODEL]:
+        """
+        Get model instance by primary key.
+
+        Models which aren't cached, lookups inside transactions
+        and fresh lookups are always fetched from the database.
+
+        :param model: model class.
+        :param pk: primary key.
+        :param fresh: skip the cache, used to read rows before changing them.
+        :return: model instance or None.
+        """
+        if self.redis_pool is None or model not in self.models:
+            return await model.filter(pk=pk).first()
+        if fresh or _in_transaction(model):
+            return await model.filter(pk=pk).first()
+        return await self._get_cached(get_cache(self.redis_pool), model, pk)
+
+    async def fetch_related(
+        self,
+        instance: Model,
+        *related: str,
+        fresh: bool = False,
+    ) -> None:
+        """
+        Load foreign key targets of the instance through the cache.
+
+        Targets are looked up like get does and attached to the instance,
+        so lookups of cached rows with their relations skip the database.
+
+        :param instance: model instance.
+        :param related: names of foreign key fields.
+        :param fresh: skip the cache.
+        """
+        fields_map = instance._meta.fields_map  # noqa: WPS437
+        for name in related:
+            field = cast("ForeignKeyFieldInstance[Model]", fields_map[name])
+            target_pk = getattr(instance, str(field.source_field))
+            if target_pk is None:
+                setattr(instance, name, None)
+                continue
+            target = await self.get(field.related_model, target_pk, fresh=fresh)
+            if target is None:
+                await instance.fetch_related(name)
+            else:
+                setattr(instance, name, target)
+
+    @asynccontextmanager
+    async def transaction(self) -> AsyncIterator[BaseDBAsyncClient]:
+        """
+        Run in_transaction and drop saved rows again after commit.
+
+        Readers outside of transaction see old rows until commit,
+        so rows they have cached meanwhile are dropped after it.
+        Other after_commit callbacks run after commit too.
+
+        :yield: transaction connection.
+        """
+        callbacks: List[CommitCallback] = []
+        token = _after_commit.set(callbacks)
+        try:  # noqa: WPS501
+            async with in_transaction() as connection:
+                yield connection
+        finally:
+            _after_commit.reset(token)
+        for callback in callbacks:
+            await callback()
+
+    async def invalidate(self, instance: Model) -> None:
+        """
+        Replace cached row of the instance with the fence.
+
+        Row is deleted first, so other workers drop it from local cache.
+
+        :param instance: model instance.
+        """
+        if self.redis_pool is None:
+            return
+        cache = get_cache(self.redis_pool)
+        key = generate_row_key(type(instance), instance.pk)
+        await cache.delete(key)
+        await cache.set(key, FENCE, expire=self.fence_ttl)
+
+    async def invalidate_dependents(self, model: Type[Model]) -> None:
+        """
+        Drop cached rows of models which reference the model.
+
+        :param model: model class.
+        """
+        if self.redis_pool is None:
+            return
+        cache = get_cache(self.redis_pool)
+        for dependent in _dependent_models(model):
+            if dependent in self.models:
+                await cache.invalidate_namespace(
+                    dependent._meta.db_table,  # noqa: WPS437
+                )
+
+    async def _get_cached(
+        self,
+        cache: Cache,
+        model: Type[MODEL],
+        pk: Any,
+    ) -> Optional[MODEL]:
+        """
+        Get model instance from the cache or fill the cache.
+
+        :param cache: cache.
+        :param model: model class.
+        :param pk: primary key.
+        :return: model instance or None.
+        """
+        key = generate_row_key(model, pk)
+        cached_row = await cache.get(key)
+        if cached_row == FENCE:
+            return await model.filter(pk=pk).first()
+        if cached_row is not None:
+            instance = decode_row(model, cached_row)
+            if instance is not None:
+                return instance
+            await cache.delete(key)
+        instance = await model.filter(pk=pk).first()
+        if instance is not None:
+            await cache.add(key, encode_row(instance), expire=self.ttl)
+        return instance
+
+    def _defer(self, instance: Model) -> None:
+        """
+        Drop row again after commit if it's changed in row_cache.transaction.
+
+        :param instance: changed instance.
+        """
+        after_commit(functools.partial(self.invalidate, instance))
+
+    async def _on_save(
+        self,
+        sender: Type[Model],
+        instance: Model,
+        created: bool,
+        *args: Any,
+    ) -> None:
+        """
+        Drop saved row.
+
+        Created rows can't be cached yet, so they aren't fenced.
+
+        :param sender: model class.
+        :param instance: saved instance.
+        :param created: whether row is new.
+        :param args: other signal arguments.
+        """
+        if created:
+            return
+        self._defer(instance)
+        await self.invalidate(instance)
+
+    async def _on_delete(
+        self,
+        sender: Type[Model],
+        instance: Model,
+        *args: Any,
+    ) -> None:
+        """
+        Drop deleted row and rows removed by cascades.
+
+        :param sender: model class.
+        :param instance: deleted instance.
+        :param args: other signal arguments.
+        """
+        self._defer(instance)
+        await self.invalidate(instance)
+        await self.invalidate_dependents(sender)
+
+
+row_cache = RowCache(
+    (
+        Character,
+        CurrencyBalance,
+        CurrencyType,
+        Equipment,
+        Inventory,
+        Transaction,
+        User,
+        UserProfile,
+    ),
+)
@@ -1,5 +1,6 @@
 from typing import List, Optional
 
+from test_task.db.dao.row_cache import row_cache
 from test_task.db.models.models import Character, CurrencyType, Equipment, Transaction
 
 
@@ -42,23 +43,29 @@ class TransactionDAO:
         )
         return transaction
 
-    async def get_transaction_by_id(self, transaction_id: int) -> Optional[Transaction]:
+    async def get_transaction_by_id(
+        self,
+        transaction_id: int,
+        fresh: bool = False,
+    ) -> Optional[Transaction]:
         """
         Get transaction by ID.
 
         :param transaction_id: ID of the transaction.
+        :param fresh: read from the database, skipping the cache.
         :return: transaction instance or None.
         """
-        return (
-            await Transaction.filter(id=transaction_id)
-            .prefetch_related(
+        transaction = await row_cache.get(Transaction, transaction_id, fresh=fresh)
+        if transaction:
+            await row_cache.fetch_related(
+                transaction,
                 "character_from",
                 "character_to",
                 "item",
                 "currency_type",
+                fresh=fresh,
             )
-            .first()
-        )
+        return transaction
 
     async def get_all_transactions(self, limit: int, offset: int) -> List[Transaction]:
         """
@@ -115,7 +122,7 @@ class TransactionDAO:
         :param character_to_id: ID of the character (optional).
         :return: updated transaction instance or None if transaction not found.
         """
-        transaction = await self.get_transaction_by_id(transaction_id)
+        transaction = await self.get_transaction_by_id(transaction_id, fresh=True)
         if not transaction:
             return None
         await transaction.fetch_related(
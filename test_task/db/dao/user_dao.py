@@ -1,5 +1,6 @@
 from typing import List, Optional
 
+from test_task.db.dao.row_cache import row_cache
 from test_task.db.models.models import User
 
 
@@ -45,7 +46,7 @@ class UserDAO:
         :param password_hash: new password hash of the user (optional).
         :return: updated user instance or None if user not found.
         """
-        user = await self.get_user_by_id(user_id)
+        user = await self.get_user_by_id(user_id, fresh=True)
         if not user:
             return None
 
@@ -59,14 +60,19 @@ class UserDAO:
         await user.save()
         return user
 
-    async def get_user_by_id(self, user_id: int) -> Optional[User]:
+    async def get_user_by_id(
+        self,
+        user_id: int,
+        fresh: bool = False,
+    ) -> Optional[User]:
         """
         Get a user by ID.
 
         :param user_id: ID of the user.
+        :param fresh: read from the database, skipping the cache.
         :return: user instance or None.
         """
-        return await User.filter(id=user_id).first()
+        return await row_cache.get(User, user_id, fresh=fresh)
 
     async def get_all_users(self, limit: int, offset: int) -> List[User]:
         """
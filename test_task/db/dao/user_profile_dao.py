@@ -1,5 +1,6 @@
 from typing import List, Optional
 
+from test_task.db.dao.row_cache import row_cache
 from test_task.db.models.models import UserProfile
 
 
@@ -29,14 +30,19 @@ class UserProfileDAO:
             location=location,
         )
 
-    async def get_user_profile_by_id(self, profile_id: int) -> Optional[UserProfile]:
+    async def get_user_profile_by_id(
+        self,
+        profile_id: int,
+        fresh: bool = False,
+    ) -> Optional[UserProfile]:
         """
         Get user profile by ID.
 
         :param profile_id: ID of the user profile.
+        :param fresh: read from the database, skipping the cache.
         :return: user profile instance or None.
         """
-        return await UserProfile.filter(id=profile_id).first()
+        return await row_cache.get(UserProfile, profile_id, fresh=fresh)
 
     async def get_all_user_profiles(self, limit: int, offset: int) -> List[UserProfile]:
         """
@@ -79,7 +85,7 @@ class UserProfileDAO:
         :param location: new location of the user (optional).
         :return: updated user profile instance or None if profile not found.
         """
-        profile = await self.get_user_profile_by_id(profile_id)
+        profile = await self.get_user_profile_by_id(profile_id, fresh=True)
         if not profile:
             return None
 
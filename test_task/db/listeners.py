@@ -0,0 +1,49 @@
+"""Services which follow changes of models by tortoise signals."""
+from abc import ABC, abstractmethod
+from typing import Any, Awaitable, Callable, List, Optional, Tuple, Type
+
+from redis.asyncio import ConnectionPool
+from tortoise.models import Model
+from tortoise.signals import Signals
+
+# Signal listener, it gets model class, instance and other signal arguments.
+Listener = Callable[..., Awaitable[Any]]
+# Models, signals and listeners of the service.
+Listeners = List[Tuple[Type[Model], Signals, Listener]]
+
+
+class ModelListener(ABC):
+    """
+    Redis service which is kept in sync with models by signals.
+
+    Tortoise can't unregister listeners, so they're registered
+    on the first enable and do nothing while service is disabled.
+    """
+
+    def __init__(self) -> None:
+        self.redis_pool: Optional[ConnectionPool] = None
+        self._connected = False
+
+    @abstractmethod
+    def listeners(self) -> Listeners:
+        """
+        Get listeners of the service.
+
+        :raises NotImplementedError: Must be redefined
+        """
+
+    def enable(self, redis_pool: ConnectionPool) -> None:
+        """
+        Start using redis.
+
+        :param redis_pool: redis pool.
+        """
+        if not self._connected:
+            for model, signal, listener in self.listeners():
+                model.register_listener(signal, listener)
+            self._connected = True
+        self.redis_pool = redis_pool
+
+    def disable(self) -> None:
+        """Stop using redis."""
+        self.redis_pool = None
@@ -1,17 +1,23 @@
+import hashlib
+import time
 from datetime import datetime, timedelta
-from typing import Dict, Union
+from typing import Dict, Optional, Union
 
 from fastapi import Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordBearer
 from jose import jwt
-from passlib.context import CryptContext
 from pydantic import ValidationError
 
 from test_task.db.models.models import User
+from test_task.services.auth.hashing import (  # noqa: F401
+    get_hashed_password,
+    verify_password,
+)
+from test_task.services.auth.user_cache import user_cache
+from test_task.services.redis.local_cache import LocalCache
 from test_task.settings import settings
 from test_task.web.api.auth.schema import TokenData, UserOutput
 
-password_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
 reuseable_oauth = OAuth2PasswordBearer(
     tokenUrl="/login",
     scheme_name="JWT",
@@ -24,26 +30,8 @@ ALGORITHM = settings.algorithm
 JWT_SECRET_KEY = settings.jwt_secret_key
 JWT_REFRESH_SECRET_KEY = settings.jwt_refresh_secret_key
 
-
-def get_hashed_password(password: str) -> str:
-    """
-    Get hashed password.
-
-    :param password: user password.
-    :return: hashed password.
-    """
-    return password_context.hash(password)
-
-
-def verify_password(password: str, hashed_pass: str) -> bool:
-    """
-    Verify user password.
-
-    :param password: user password.
-    :param hashed_pass: user hashed_pass.
-    :return: flag if passwords equal.
-    """
-    return password_context.verify(password, hashed_pass)
+# Validated access tokens by digests, entries live until tokens expire.
+token_cache = LocalCache(maxsize=settings.auth_token_cache_maxsize)
 
 
 def create_access_token(
@@ -137,15 +125,49 @@ def decode_access_token(token: str) -> TokenData:
         )
 
 
+def _token_digest(token: str) -> str:
+    """
+    Get key of the token in the token cache.
+
+    :param token: token.
+    :return: digest of the token.
+    """
+    return hashlib.sha256(token.encode()).hexdigest()
+
+
+def _get_cached_token(digest: str) -> Optional[TokenData]:
+    """
+    Get validated token from the token cache.
+
+    Cached tokens are checked for expiry like jwt.decode does.
+
+    :param digest: digest of the token.
+    :raises ExpiredSignatureError: if token has expired.
+    :return: TokenData model or None if token isn't cached.
+    """
+    token_data: Optional[TokenData] = token_cache.get(digest)
+    if token_data is not None and token_data.exp < time.time():
+        token_cache.delete(digest)
+        raise jwt.ExpiredSignatureError("Signature has expired.")
+    return token_data
+
+
 def verify_token_access(token: str) -> TokenData:
     """
     Verify access.
 
+    Validated tokens are kept in the token cache until they expire,
+    so repeated requests skip signature check and parsing.
+
     :param token: user token.
     :raises HTTPException: HTTPException.
     :raises exp: JWTError.
     :return: TokenData model.
     """
+    digest = _token_digest(token)
+    cached_token = _get_cached_token(digest)
+    if cached_token is not None:
+        return cached_token
     try:
         payload = jwt.decode(token, JWT_SECRET_KEY, algorithms=ALGORITHM)
         user_id: str = payload.get("user_id")
@@ -154,15 +176,45 @@ def verify_token_access(token: str) -> TokenData:
                 status_code=status.HTTP_400_BAD_REQUEST,
                 detail="Incorrect user_id",
             )
-        return TokenData(**payload)
+        token_data = TokenData(**payload)
     except jwt.JWTError as exp:  # noqa: WPS329
         raise exp
+    ttl = int(token_data.exp - time.time())
+    if ttl > 0:
+        token_cache.set(digest, token_data, ttl=ttl)
+    return token_data
+
+
+async def _get_user(token_data: TokenData) -> Optional[UserOutput]:
+    """
+    Get user of the token from cache or database.
+
+    :param token_data: token data.
+    :return: user or None if token doesn't match any user.
+    """
+    user = await user_cache.get(token_data.user_id)
+    if user is None:
+        db_user = await User.filter(
+            id=token_data.user_id,
+            username=token_data.username,
+            email=token_data.email,
+        ).first()
+        if db_user is None:
+            return None
+        user = UserOutput.model_validate(db_user)
+        await user_cache.set(token_data.user_id, user)
+    if user.username != token_data.username or user.email != token_data.email:
+        return None
+    return user
 
 
 async def get_current_user(token: str = Depends(reuseable_oauth)) -> UserOutput:
     """
     Method to check auth header.
 
+    Users are cached for a short time, so valid tokens
+    don't query the database.
+
     :param token: user token.
     :raises HTTPException: HTTPException.
     :return: User model.
@@ -182,16 +234,11 @@ async def get_current_user(token: str = Depends(reuseable_oauth)) -> UserOutput:
             headers={"WWW-Authenticate": "Bearer"},
         )
 
-    user = await User.filter(
-        id=token_data.user_id,
-        username=token_data.username,
-        email=token_data.email,
-    ).first()
-
+    user = await _get_user(token_data)
     if user is None:
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
             detail="Not authenticated",
         )
 
-    return UserOutput.model_validate(user)
+    return user
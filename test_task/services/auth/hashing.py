@@ -0,0 +1,144 @@
+"""Password hashing which doesn't block the event loop."""
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, List, Optional, TypeVar
+
+from fastapi import HTTPException, status
+from passlib.context import CryptContext
+
+from test_task.settings import settings
+
+RESULT = TypeVar("RESULT")
+
+
+def build_password_context(
+    scheme: str = settings.password_hash_scheme,
+    rounds: int = settings.password_hash_rounds,
+    deprecated_schemes: Optional[List[str]] = None,
+) -> CryptContext:
+    """
+    Build context which hashes passwords with the scheme and cost.
+
+    Hashes of deprecated schemes and hashes with other rounds
+    are still verified, but they need update.
+
+    :param scheme: scheme of new hashes.
+    :param rounds: cost of new hashes.
+    :param deprecated_schemes: schemes of old hashes.
+    :return: password context.
+    """
+    if deprecated_schemes is None:
+        deprecated_schemes = settings.password_hash_deprecated_schemes
+    context = CryptContext(schemes=[scheme, *deprecated_schemes], deprecated="auto")
+    context.update({f"{scheme}__rounds": rounds})
+    return context
+
+
+password_context = build_password_context()
+
+
+def get_hashed_password(password: str) -> str:
+    """
+    Get hashed password.
+
+    :param password: user password.
+    :return: hashed password.
+    """
+    return password_context.hash(password)
+
+
+def verify_password(password: str, hashed_pass: str) -> bool:
+    """
+    Verify user password.
+
+    :param password: user password.
+    :param hashed_pass: user hashed_pass.
+    :return: flag if passwords equal.
+    """
+    return password_context.verify(password, hashed_pass)
+
+
+def password_needs_update(hashed_pass: str) -> bool:
+    """
+    Check whether hash was made with outdated scheme or cost.
+
+    :param hashed_pass: user hashed_pass.
+    :return: flag if password should be hashed again.
+    """
+    return password_context.needs_update(hashed_pass)
+
+
+class PasswordHasher:
+    """
+    Bounded thread pool for password hashing.
+
+    Bcrypt releases the GIL, so hashes run in parallel with
+    the event loop. At most workers hashes run at once and
+    queue_size more wait for a thread, other calls are rejected
+    with 503 instead of piling up.
+    """
+
+    def __init__(
+        self,
+        workers: int = settings.password_hash_workers,
+        queue_size: int = settings.password_hash_queue_size,
+    ):
+        self.workers = workers
+        self.queue_size = queue_size
+        self.pending = 0
+        self._executor: Optional[ThreadPoolExecutor] = None
+
+    async def hash(self, password: str) -> str:
+        """
+        Get hashed password.
+
+        :param password: user password.
+        :return: hashed password.
+        """
+        return await self.run(get_hashed_password, password)
+
+    async def verify(self, password: str, hashed_pass: str) -> bool:
+        """
+        Verify user password.
+
+        :param password: user password.
+        :param hashed_pass: user hashed_pass.
+        :return: flag if passwords equal.
+        """
+        return await self.run(verify_password, password, hashed_pass)
+
+    async def run(self, func: Callable[..., RESULT], *args: str) -> RESULT:
+        """
+        Run hashing function in the pool.
+
+        :param func: hashing function.
+        :param args: function arguments.
+        :raises HTTPException: if the queue is full.
+        :return: function result.
+        """
+        if self.pending >= self.workers + self.queue_size:
+            raise HTTPException(
+                status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                detail="Too many concurrent password checks",
+                headers={"Retry-After": "1"},
+            )
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(
+                max_workers=self.workers,
+                thread_name_prefix="password-hash",
+            )
+        self.pending += 1
+        try:  # noqa: WPS501
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(self._executor, func, *args)
+        finally:
+            self.pending -= 1
+
+    def shutdown(self) -> None:
+        """Stop threads of the pool."""
+        if self._executor is not None:
+            self._executor.shutdown(wait=False)
+            self._executor = None
+
+
+password_hasher = PasswordHasher()
@@ -0,0 +1,74 @@
+"""Throttling of login attempts."""
+import math
+from typing import Optional
+
+from fastapi import HTTPException, status
+from loguru import logger
+from redis.asyncio import ConnectionPool, RedisError
+
+from test_task.services.redis.rate_limit import SlidingWindowLimiter
+from test_task.settings import settings
+
+
+class LoginLimiter:
+    """
+    Limits login attempts by client address and by email.
+
+    Attempts are checked before users are looked up and passwords
+    are verified, so credential stuffing doesn't burn bcrypt time.
+    Logins aren't limited while redis is unavailable.
+    """
+
+    def __init__(
+        self,
+        prefix: str = settings.login_rate_limit_prefix,
+        window: int = settings.login_rate_limit_window,
+        per_ip: int = settings.login_rate_limit_per_ip,
+        per_email: int = settings.login_rate_limit_per_email,
+    ):
+        self.prefix = prefix
+        self.window = window
+        self.per_ip = per_ip
+        self.per_email = per_email
+        self.limiter: Optional[SlidingWindowLimiter] = None
+
+    def enable(self, redis_pool: ConnectionPool) -> None:
+        """
+        Start limiting logins.
+
+        :param redis_pool: redis pool.
+        """
+        self.limiter = SlidingWindowLimiter(redis_pool, self.window)
+
+    def disable(self) -> None:
+        """Stop limiting logins."""
+        self.limiter = None
+
+    async def check(self, client_ip: Optional[str], email: str) -> None:
+        """
+        Count login attempt.
+
+        :param client_ip: address of the client, if it's known.
+        :param email: email of the user.
+        :raises HTTPException: if too many attempts were made.
+        """
+        if self.limiter is None:
+            return
+        limits = {f"{self.prefix}:email:{email.lower()}": self.per_email}
+        if client_ip is not None:
+            limits[f"{self.prefix}:ip:{client_ip}"] = self.per_ip
+        try:
+            retry_after = await self.limiter.hit(limits)
+        except RedisError as err:
+            logger.error("Login rate limiter error")
+            logger.error(err)
+            return
+        if retry_after:
+            raise HTTPException(
+                status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+                detail="Too many login attempts",
+                headers={"Retry-After": str(math.ceil(retry_after))},
+            )
+
+
+login_limiter = LoginLimiter()
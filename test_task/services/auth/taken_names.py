@@ -0,0 +1,138 @@
+"""Fast check of emails and usernames which are already registered."""
+from typing import Any, AsyncIterator, List, Optional, Type
+
+from tortoise.models import Model
+from tortoise.signals import Signals
+
+from test_task.db.listeners import Listeners, ModelListener
+from test_task.db.models.models import User
+from test_task.services.redis.bloom import BloomFilter
+from test_task.settings import settings
+
+
+def _members(email: str, username: str) -> List[str]:
+    """
+    Get filter members of the user.
+
+    :param email: email.
+    :param username: username.
+    :return: members.
+    """
+    return [f"email:{email}", f"username:{username}"]
+
+
+class TakenNames(ModelListener):
+    """
+    Bloom filter of emails and usernames of the users.
+
+    Names are added by post_save signal of the user, listener
+    is registered when filter is enabled. Filter only answers
+    that name is definitely free, database unique constraints
+    are still the final guard.
+    """
+
+    def __init__(
+        self,
+        key: str = settings.registration_filter_key,
+        size: int = settings.registration_filter_size,
+        hashes: int = settings.registration_filter_hashes,
+        batch: int = settings.registration_filter_batch,
+    ):
+        super().__init__()
+        self.key = key
+        self.size = size
+        self.hashes = hashes
+        self.batch = batch
+
+    @property
+    def bloom(self) -> Optional[BloomFilter]:
+        """
+        Filter of names, None while it's disabled and every name may be taken.
+
+        :return: filter.
+        """
+        if self.redis_pool is None:
+            return None
+        return BloomFilter(self.redis_pool, self.key, self.size, self.hashes)
+
+    def listeners(self) -> Listeners:
+        """
+        Add names of saved users.
+
+        :return: listeners.
+        """
+        return [(User, Signals.post_save, self._on_save)]
+
+    async def might_be_taken(self, email: str, username: str) -> bool:
+        """
+        Check whether email or username can be registered already.
+
+        :param email: email.
+        :param username: username.
+        :return: False only if both are definitely free.
+        """
+        if self.bloom is None:
+            return True
+        return await self.bloom.might_contain(*_members(email, username))
+
+    async def rebuild(self) -> int:
+        """
+        Build the filter from all users.
+
+        :return: quantity of users.
+        """
+        if self.bloom is None:
+            return 0
+        added = await self.bloom.rebuild(self._batches())
+        return added // 2
+
+    async def build_if_missing(self) -> int:
+        """
+        Build the filter unless other worker has built it.
+
+        :return: quantity of users.
+        """
+        if self.bloom is None or await self.bloom.exists():
+            return 0
+        return await self.rebuild()
+
+    async def _batches(self) -> AsyncIterator[List[str]]:
+        """
+        Read names of all users in batches.
+
+        :yield: members of the batch.
+        """
+        last_id = 0
+        while True:
+            rows = (
+                await User.filter(id__gt=last_id)
+                .order_by("id")
+                .limit(self.batch)
+                .values_list("id", "email", "username")
+            )
+            if not rows:
+                return
+            members = []
+            for user_id, email, username in rows:
+                members.extend(_members(email, username))
+                last_id = user_id
+            yield members
+
+    async def _on_save(
+        self,
+        sender: Type[Model],
+        instance: User,
+        *args: Any,
+    ) -> None:
+        """
+        Put names of the saved user into the filter.
+
+        :param sender: model class.
+        :param instance: saved user.
+        :param args: other signal arguments.
+        """
+        if self.bloom is not None:
+            await self.bloom.add(*_members(instance.email, instance.username))
+
+
+taken_names = TakenNames()
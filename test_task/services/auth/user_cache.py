@@ -0,0 +1,116 @@
+"""Cache of users resolved from access tokens."""
+from typing import Any, Optional, Type
+
+from tortoise.models import Model
+from tortoise.signals import Signals
+
+from test_task.db.listeners import Listeners, ModelListener
+from test_task.db.models.models import User
+from test_task.services.redis.cache import Cache, get_cache
+from test_task.settings import settings
+from test_task.web.api.auth.schema import UserOutput
+
+
+def _generate_key(user_id: int) -> str:
+    """
+    Generate cache key of the user.
+
+    :param user_id: id of the user.
+    :return: key.
+    """
+    return f"current_user:{user_id}"
+
+
+class UserCache(ModelListener):
+    """
+    Short-lived cache of authenticated users keyed by user id.
+
+    Users are kept in local cache of the worker in front of redis.
+    Entries are dropped by post_save and post_delete signals of users,
+    so edits, deactivation and deletion are seen by every worker,
+    listeners are registered when cache is enabled. Bulk updates
+    which don't send signals are seen after ttl. Drops which fail
+    are retried by the shared cache client until redis takes them.
+    """
+
+    def __init__(self, ttl: int = settings.auth_user_cache_ttl):
+        super().__init__()
+        self.ttl = ttl
+
+    @property
+    def cache(self) -> Optional[Cache]:
+        """
+        Shared cache client, None while cache is disabled.
+
+        :return: cache.
+        """
+        if self.redis_pool is None:
+            return None
+        return get_cache(self.redis_pool)
+
+    def listeners(self) -> Listeners:
+        """
+        Drop users on save and delete.
+
+        :return: listeners.
+        """
+        return [
+            (User, Signals.post_save, self._on_change),
+            (User, Signals.post_delete, self._on_change),
+        ]
+
+    async def get(self, user_id: int) -> Optional[UserOutput]:
+        """
+        Get cached user.
+
+        :param user_id: id of the user.
+        :return: user or None if it isn't cached.
+        """
+        if self.cache is None:
+            return None
+        cached_user = await self.cache.get(_generate_key(user_id), self.ttl)
+        if cached_user is None:
+            return None
+        return UserOutput.model_validate_json(cached_user)
+
+    async def set(self, user_id: int, user: UserOutput) -> None:
+        """
+        Put user into cache.
+
+        :param user_id: id of the user.
+        :param user: user.
+        """
+        if self.cache is not None:
+            await self.cache.set(
+                _generate_key(user_id),
+                user.model_dump_json(),
+                expire=self.ttl,
+                local_ttl=self.ttl,
+            )
+
+    async def invalidate(self, user_id: int) -> None:
+        """
+        Drop cached user.
+
+        :param user_id: id of the user.
+        """
+        if self.cache is not None:
+            await self.cache.delete(_generate_key(user_id))
+
+    async def _on_change(
+        self,
+        sender: Type[Model],
+        instance: User,
+        *args: Any,
+    ) -> None:
+        """
+        Drop saved or deleted user.
+
+        :param sender: model class.
+        :param instance: user.
+        :param args: other signal arguments.
+        """
+        await self.invalidate(instance.id)
+
+
+user_cache = UserCache()
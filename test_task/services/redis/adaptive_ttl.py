@@ -0,0 +1,82 @@
+"""TTL of cache keys which follows their reads and changes."""
+import time
+from collections import OrderedDict
+
+from test_task.settings import settings
+
+
+class _KeyStats:
+    """Lifetime of the last stored value of the key."""
+
+    def __init__(self, ttl: int, stored_at: float):
+        self.ttl = ttl
+        self.stored_at = stored_at
+        self.reads = 0
+
+
+class AdaptiveTTL:
+    """
+    Per-key TTL adjusted by how the key is used.
+
+    Value which is stored again before its TTL elapsed was
+    invalidated, so TTL of the key is halved. Value which lived
+    until expiry and was read at least min_reads times is stable,
+    so TTL of the key is doubled. TTL is kept between min_ttl and max_ttl.
+
+    Stats of the most recently stored keys are kept
+    in memory of the worker process.
+    """
+
+    def __init__(
+        self,
+        min_ttl: int = settings.cache_adaptive_ttl_min,
+        max_ttl: int = settings.cache_adaptive_ttl_max,
+        min_reads: int = settings.cache_adaptive_ttl_min_reads,
+        maxsize: int = settings.cache_adaptive_ttl_maxsize,
+    ):
+        self.min_ttl = min_ttl
+        self.max_ttl = max_ttl
+        self.min_reads = min_reads
+        self.maxsize = maxsize
+        self._stats: "OrderedDict[str, _KeyStats]" = OrderedDict()
+
+    def read(self, key: str) -> None:
+        """
+        Count read of the cached value.
+
+        :param key: key.
+        """
+        stats = self._stats.get(key)
+        if stats is not None:
+            stats.reads += 1
+
+    def ttl(self, key: str, default: int) -> int:
+        """
+        Get TTL of the value which is stored now.
+
+        :param key: key.
+        :param default: TTL of the key which has no stats yet.
+        :return: TTL in seconds.
+        """
+        now = time.monotonic()
+        stats = self._stats.pop(key, None)
+        if stats is None:
+            ttl = default
+        elif now < stats.stored_at + stats.ttl:
+            ttl = stats.ttl // 2
+        elif stats.reads >= self.min_reads:
+            ttl = stats.ttl * 2
+        else:
+            ttl = stats.ttl
+        ttl = min(max(ttl, self.min_ttl), self.max_ttl)
+        self._stats[key] = _KeyStats(ttl, now)
+        while len(self._stats) > self.maxsize:
+            self._stats.popitem(last=False)
+        return ttl
+
+    def reset(self) -> None:
+        """Drop stats of all keys."""
+        self._stats.clear()
+
+
+ttl_policy = AdaptiveTTL()
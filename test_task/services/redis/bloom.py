@@ -0,0 +1,133 @@
+"""Bloom filter kept in a redis bitmap."""
+import hashlib
+import uuid
+from typing import AsyncIterable, Iterable, List
+
+from loguru import logger
+from redis.asyncio import ConnectionPool, Redis, RedisError
+
+_HALF_DIGEST_SIZE = 8
+
+
+class BloomFilter:
+    """
+    Bloom filter of strings in a redis bitmap.
+
+    Member which isn't in the filter is never reported as present,
+    member which is in the filter can be reported as present
+    because of collisions of other members. Members can't be removed.
+
+    Filter answers "maybe present" while the bitmap doesn't exist
+    or redis is unavailable, so callers fall back to the exact check.
+    """
+
+    def __init__(
+        self,
+        redis_pool: ConnectionPool,
+        key: str,
+        size: int,
+        hashes: int,
+    ):
+        self.redis = Redis(connection_pool=redis_pool)
+        self.key = key
+        self.size = size
+        self.hashes = hashes
+
+    async def add(self, *members: str) -> None:
+        """
+        Put members into the filter.
+
+        :param members: members.
+        """
+        try:
+            await self._set_bits(self.key, members)
+        except RedisError as err:
+            logger.error("Bloom filter error")
+            logger.error(err)
+
+    async def might_contain(self, *members: str) -> bool:
+        """
+        Check whether any of members can be in the filter.
+
+        :param members: members.
+        :return: False only if none of members is in the filter.
+        """
+        try:
+            async with self.redis.pipeline(transaction=False) as pipe:
+                pipe.exists(self.key)
+                for member in members:
+                    for offset in self._offsets(member):
+                        pipe.getbit(self.key, offset)
+                exists, *bits = await pipe.execute()
+        except RedisError as err:
+            logger.error("Bloom filter error")
+            logger.error(err)
+            return True
+        if not exists:
+            return True
+        return any(
+            all(bits[start : start + self.hashes])
+            for start in range(0, len(bits), self.hashes)
+        )
+
+    async def exists(self) -> bool:
+        """
+        Check whether the filter is built.
+
+        :return: True if bitmap exists.
+        """
+        return bool(await self.redis.exists(self.key))
+
+    async def rebuild(self, batches: AsyncIterable[Iterable[str]]) -> int:
+        """
+        Replace the filter with one built from the members.
+
+        Filter is built under temporary key and swapped atomically,
+        members added while it's built can be lost from the filter.
+
+        :param batches: batches of members.
+        :return: quantity of members.
+        """
+        building_key = f"{self.key}:building:{uuid.uuid4()}"
+        added = 0
+        try:  # noqa: WPS501
+            await self.redis.setbit(building_key, 0, 0)
+            async for batch in batches:
+                members = list(batch)
+                await self._set_bits(building_key, members)
+                added += len(members)
+            await self.redis.rename(building_key, self.key)
+        finally:
+            await self.redis.delete(building_key)
+        return added
+
+    async def _set_bits(self, key: str, members: Iterable[str]) -> None:
+        """
+        Set bits of the members.
+
+        :param key: key of the bitmap.
+        :param members: members.
+        """
+        async with self.redis.pipeline(transaction=False) as pipe:
+            for member in members:
+                for offset in self._offsets(member):
+                    pipe.setbit(key, offset, 1)
+            await pipe.execute()
+
+    def _offsets(self, member: str) -> List[int]:
+        """
+        Get bits of the member.
+
+        Bits are derived from two halves of one digest,
+        so they're the same in every worker.
+
+        :param member: member.
+        :return: bit offsets.
+        """
+        digest = hashlib.blake2b(member.encode(), digest_size=16).digest()
+        first = int.from_bytes(digest[:_HALF_DIGEST_SIZE], "little")
+        second = int.from_bytes(digest[_HALF_DIGEST_SIZE:], "little") | 1
+        offsets = []
+        for index in range(self.hashes):
+            offsets.append((first + index * second) % self.size)
+        return offsets
@@ -1,29 +1,398 @@
 import asyncio
+import enum
 import functools
 import json
-from typing import Any, Callable, Optional
+import random
+import time
+import uuid
+from typing import (  # noqa: WPS235
+    Any,
+    Awaitable,
+    Callable,
+    Dict,
+    List,
+    Mapping,
+    Optional,
+    Sequence,
+    Set,
+    Tuple,
+    Type,
+    Union,
+)
 
+from fastapi import HTTPException, status
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import Response
 from loguru import logger
-from redis.asyncio import Redis, RedisError
+from redis.asyncio import ConnectionPool, Redis, RedisError
+from redis.exceptions import WatchError
 
+from test_task.services.redis.adaptive_ttl import ttl_policy
+from test_task.services.redis.compression import Compressor, compressor
+from test_task.services.redis.hot_keys import HotKeys, encode_member
+from test_task.services.redis.key_builder import CacheKeyBuilder
+from test_task.services.redis.local_cache import FLUSH_ALL, LocalCache, local_cache
+from test_task.services.redis.metrics import (
+    CacheMetrics,
+    cache_metrics,
+    key_label,
+    keys_label,
+)
+from test_task.services.redis.namespaces import ALL_NAMESPACES, version_tag
+from test_task.services.redis.pending import PendingInvalidations
+from test_task.services.redis.sharding import HashRing, create_pool
+from test_task.services.redis.single_flight import single_flight
+from test_task.services.redis.sketch import HotKeySketch, key_sketch
 from test_task.settings import settings
 
 
-class Cache:  # noqa: WPS338
-    """Cache class."""
+class BreakerState(str, enum.Enum):  # noqa: WPS600
+    """States of the circuit breaker."""
 
-    def __init__(self, redis: Redis, prefix: str = settings.cache_prefix):
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+
+class CircuitOpenError(RedisError):
+    """Redis call is skipped, because redis is unhealthy."""
+
+
+class CircuitBreaker:
+    """
+    Circuit breaker which stops calling unhealthy redis.
+
+    Breaker opens after failure_threshold consecutive failures.
+    Open breaker rejects calls, so requests go straight to the database.
+    After recovery_timeout it's half open and lets one probe call through:
+    success closes the breaker, failure opens it again.
+    """
+
+    def __init__(
+        self,
+        failure_threshold: int = settings.cache_breaker_failure_threshold,
+        recovery_timeout: float = settings.cache_breaker_recovery_timeout,
+    ):
+        self.failure_threshold = failure_threshold
+        self.recovery_timeout = recovery_timeout
+        self.state = BreakerState.CLOSED
+        self.failures = 0
+        self._retry_at: float = 0
+
+    def allow(self) -> bool:
+        """
+        Check whether redis can be called.
+
+        :return: True if call is allowed.
+        """
+        if self.state == BreakerState.CLOSED:
+            return True
+        now = time.monotonic()
+        if now < self._retry_at:
+            return False
+        logger.info("Probing redis after cache circuit breaker was opened.")
+        self.state = BreakerState.HALF_OPEN
+        self._retry_at = now + self.recovery_timeout
+        return True
+
+    @property
+    def available(self) -> bool:
+        """
+        Check whether allow would let the call through without probing.
+
+        :return: True if breaker is closed or ready for a probe.
+        """
+        return self.state == BreakerState.CLOSED or time.monotonic() >= self._retry_at
+
+    def record_success(self) -> None:
+        """Close breaker after successful call."""
+        if self.state != BreakerState.CLOSED:
+            logger.info("Cache circuit breaker is closed.")
+        self.state = BreakerState.CLOSED
+        self.failures = 0
+
+    def record_failure(self) -> None:
+        """Count failed call and open breaker if redis is unhealthy."""
+        self.failures += 1
+        if self.state == BreakerState.CLOSED:
+            if self.failures < self.failure_threshold:
+                return
+        logger.warning("Cache circuit breaker is opened.")
+        self.state = BreakerState.OPEN
+        self._retry_at = time.monotonic() + self.recovery_timeout
+
+    def snapshot(self) -> Dict[str, Any]:
+        """
+        Get current state.
+
+        :return: state, consecutive failures and seconds until the next probe.
+        """
+        retry_in = None
+        if self.state != BreakerState.CLOSED:
+            retry_in = max(self._retry_at - time.monotonic(), 0)
+        return {
+            "state": self.state,
+            "failures": self.failures,
+            "retry_in": retry_in,
+        }
+
+    def reset(self) -> None:
+        """Close breaker."""
+        self.state = BreakerState.CLOSED
+        self.failures = 0
+        self._retry_at = 0
+
+
+circuit_breaker = CircuitBreaker()
+
+
+def _remaining_ttl(pttl: int) -> Optional[float]:
+    """
+    Convert PTTL reply into seconds.
+
+    :param pttl: remaining ttl in milliseconds, negative if key doesn't expire.
+    :return: remaining ttl in seconds or None if key doesn't expire.
+    """
+    if pttl < 0:
+        return None
+    return pttl / 1000
+
+
+def _log_error(err: RedisError) -> None:
+    """
+    Log failed cache call.
+
+    Calls rejected by the open breaker are expected, so they're not errors.
+
+    :param err: error.
+    """
+    if isinstance(err, CircuitOpenError):
+        logger.debug("Cache call skipped, circuit breaker is open")
+        return
+    logger.error("Cache error")
+    logger.error(err)
+
+
+# Keys of every shard and result of the call.
+ShardResults = List[Tuple[List[str], Any]]
+
+# Stored value and its remaining ttl in seconds.
+StoredValue = Tuple[Optional[bytes], Optional[float]]
+
+
+def _decode_members(members: List[Set[Any]]) -> Set[str]:
+    """
+    Get cache keys from members of the tag sets.
+
+    :param members: members of every tag set.
+    :return: cache keys.
+    """
+    return {
+        member.decode() if isinstance(member, bytes) else member
+        for tag_members in members
+        for member in tag_members
+    }
+
+
+def _expire_by_key(
+    items: Mapping[str, Any],
+    expire: Union[int, Mapping[str, int]],
+) -> Dict[str, int]:
+    """
+    Get expire of every key.
+
+    :param items: values by keys.
+    :param expire: expire for all keys or expire by keys.
+    :return: expire by keys.
+    """
+    if isinstance(expire, int):
+        return dict.fromkeys(items, expire)
+    return {key: expire.get(key, settings.cache_ttl) for key in items}
+
+
+class Cache:  # noqa: WPS230, WPS338
+    """
+    Cache class.
+
+    If local cache is given, it's used as L1 in front of redis.
+    Large values are compressed before they're sent to redis.
+    All redis calls go through the circuit breaker.
+    Accessed keys are counted in the sketch and the hottest ones
+    live longer in the local cache.
+
+    If shards are given, values are spread across them by consistent
+    hashing and versions, tags, locks and invalidations stay on redis.
+    Every shard has own breaker and keys of the unhealthy shard
+    go to the next shards of the ring until it recovers. Keys are
+    deleted from their shard and from the shard which takes them
+    while it's down. Deletes of the unhealthy shard are kept pending
+    and the shard isn't used until they're replayed, so it doesn't
+    serve values which were invalidated while it was down.
+
+    Invalidations which fail are kept pending and retried
+    in background until redis takes them.
+    """
+
+    def __init__(
+        self,
+        redis: ConnectionPool,
+        prefix: str = settings.cache_prefix,
+        local: Optional[LocalCache] = None,
+        local_ttl: Optional[int] = None,
+        compression: Compressor = compressor,
+        metrics: CacheMetrics = cache_metrics,
+        breaker: CircuitBreaker = circuit_breaker,
+        shards: Optional[Mapping[str, ConnectionPool]] = None,
+        sketch: HotKeySketch = key_sketch,
+    ):
         self.redis = Redis(connection_pool=redis)
         self.prefix = prefix
+        self.local = local
+        self.local_ttl = local_ttl
+        self.compression = compression
+        self.metrics = metrics
+        self.breaker = breaker
+        self.shards = {
+            node: Redis(connection_pool=pool) for node, pool in (shards or {}).items()
+        }
+        self.shard_breakers = {node: CircuitBreaker() for node in self.shards}
+        self.ring = HashRing(list(self.shards)) if self.shards else None
+        self.sketch = sketch
+        self.pending = PendingInvalidations()
+        self._replay_task: "Optional[asyncio.Future[Any]]" = None
 
-    def _generate_cache_key(self, key: str) -> str:
+    async def _generate_cache_key(self, key: str) -> str:
         """
         Generate cache key.
 
         :param key: key.
         :return: cache key.
         """
-        return f"{self.prefix}:{key}"
+        cache_keys = await self._generate_cache_keys([key])
+        return cache_keys[0]
+
+    async def _generate_cache_keys(self, keys: Sequence[str]) -> List[str]:
+        """
+        Generate cache keys with versions of their namespaces.
+
+        Namespace is the key prefix, the part before the first colon.
+
+        :param keys: keys.
+        :return: cache keys.
+        """
+        tags = await self._get_version_tags({key_label(key) for key in keys})
+        cache_keys = []
+        for key in keys:
+            tag = tags[key_label(key)]
+            if tag:
+                cache_keys.append(f"{self.prefix}:{tag}:{key}")
+            else:
+                cache_keys.append(f"{self.prefix}:{key}")
+        return cache_keys
+
+    def _generate_version_key(self, namespace: str) -> str:
+        """
+        Generate key of the namespace version counter.
+
+        :param namespace: namespace or ALL_NAMESPACES.
+        :return: version key.
+        """
+        return f"{self.prefix}:version:{namespace}"
+
+    async def _get_version_tags(self, namespaces: Set[str]) -> Dict[str, str]:
+        """
+        Get version tags of namespaces.
+
+        Counters are kept in local cache and dropped
+        by every worker when they're bumped.
+
+        :param namespaces: namespaces.
+        :return: version tags by namespaces.
+        """
+        version_keys = {
+            namespace: self._generate_version_key(namespace)
+            for namespace in namespaces | {ALL_NAMESPACES}
+        }
+        counters: Dict[str, Any] = {
+            namespace: local_cache.get(version_key)
+            for namespace, version_key in version_keys.items()
+        }
+        missing = [name for name, counter in counters.items() if counter is None]
+        if missing:
+            fetched = await self._with_backoff(
+                self.redis.mget,
+                [version_keys[name] for name in missing],
+            )
+            for missing_name, fetched_counter in zip(missing, fetched):
+                counters[missing_name] = int(fetched_counter or 0)
+                local_cache.set(
+                    version_keys[missing_name],
+                    counters[missing_name],
+                    ttl=settings.cache_version_local_ttl,
+                )
+        global_version = counters[ALL_NAMESPACES]
+        return {
+            namespace: version_tag((global_version, counters[namespace]))
+            for namespace in namespaces
+        }
+
+    async def _bump_version(self, version_key: str) -> None:
+        """
+        Increment version counter and drop it from local caches.
+
+        :param version_key: version key.
+        """
+        local_cache.delete(version_key)
+        async with self.redis.pipeline(transaction=False) as pipe:
+            pipe.incr(version_key)
+            pipe.publish(settings.cache_invalidation_channel, version_key)
+            await pipe.execute()
+
+    def _shard_of(self, cache_key: str) -> Optional[str]:
+        """
+        Get shard which holds the key.
+
+        :param cache_key: cache key.
+        :raises CircuitOpenError: if all shards are unhealthy.
+        :return: shard or None if cache isn't sharded.
+        """
+        if self.ring is None:
+            return None
+        unhealthy = {
+            node
+            for node, breaker in self.shard_breakers.items()
+            if not breaker.available or node in self.pending.node_keys
+        }
+        shard = self.ring.get_node(cache_key, skip=unhealthy)
+        if shard is None:
+            raise CircuitOpenError("All cache shards are unhealthy")
+        return shard
+
+    def _route(self, shard: Optional[str]) -> Tuple[Redis, CircuitBreaker]:
+        """
+        Get client and breaker of the shard.
+
+        :param shard: shard or None if cache isn't sharded.
+        :return: redis client and its breaker.
+        """
+        if shard is None:
+            return self.redis, self.breaker
+        return self.shards[shard], self.shard_breakers[shard]
+
+    def _group_by_shard(
+        self,
+        cache_keys: Sequence[str],
+    ) -> Dict[Optional[str], List[str]]:
+        """
+        Split keys by shards which hold them.
+
+        :param cache_keys: cache keys.
+        :return: cache keys by shards.
+        """
+        groups: Dict[Optional[str], List[str]] = {}
+        for cache_key in cache_keys:
+            groups.setdefault(self._shard_of(cache_key), []).append(cache_key)
+        return groups
 
     async def _with_backoff(
         self,
@@ -31,6 +400,7 @@ class Cache:  # noqa: WPS338
         *args: Any,
         retries: int = 1,
         base_delay: float = 0.5,
+        breaker: Optional[CircuitBreaker] = None,
         **kwargs: Any,
     ) -> Any:
         """
@@ -39,43 +409,504 @@ class Cache:  # noqa: WPS338
         :param coro: coroutine.
         :param retries: retries.
         :param base_delay: base_delay.
+        :param breaker: breaker of the called node, cache breaker by default.
         :param args: args.
         :param kwargs: kwargs.
         :raises RedisError: RedisError
+        :raises CircuitOpenError: if breaker doesn't allow the call.
         :return: coro result.
         """
+        breaker = breaker or self.breaker
+        if not breaker.allow():
+            raise CircuitOpenError("Redis is unhealthy")
         attempt = 0
         while attempt < retries:
             try:
                 logger.info("Retrying to put into cache.")
-                return await coro(*args, **kwargs)
+                call_result = await coro(*args, **kwargs)
             except RedisError:
                 attempt += 1
                 if attempt < retries:
                     await asyncio.sleep(base_delay * 2 ** (attempt - 1))
+            else:
+                breaker.record_success()
+                return call_result
+        breaker.record_failure()
         raise RedisError(f"Operation failed after {retries} retries")
 
-    async def get(self, key: str) -> Optional[Any]:
+    async def _call(
+        self,
+        label: str,
+        coro: Callable[..., Any],
+        *args: Any,
+        **kwargs: Any,
+    ) -> Any:
+        """
+        Call redis with backoff and record latency and errors.
+
+        Calls rejected by the breaker aren't recorded.
+
+        :param label: metrics label.
+        :param coro: coroutine.
+        :param args: args.
+        :param kwargs: kwargs.
+        :raises RedisError: if call failed.
+        :return: coro result.
+        """
+        started = time.perf_counter()
+        try:
+            call_result = await self._with_backoff(coro, *args, **kwargs)
+        except RedisError as err:
+            if not isinstance(err, CircuitOpenError):
+                self.metrics.error(label)
+                self.metrics.observe(label, time.perf_counter() - started)
+            raise
+        self.metrics.observe(label, time.perf_counter() - started)
+        return call_result
+
+    def _generate_lock_key(self, key: str) -> str:
         """
-        Cache get method.
+        Generate key of the lock which guards filling of the key.
 
         :param key: key.
+        :return: lock key.
+        """
+        return f"{self.prefix}:lock:{key}"
+
+    def _generate_tag_key(self, tag: str) -> str:
+        """
+        Generate key of the set which holds keys marked with tag.
+
+        :param tag: tag.
+        :return: tag key.
+        """
+        return f"{self.prefix}:tag:{tag}"
+
+    async def _set_tagged(
+        self,
+        client: Redis,
+        cache_key: str,
+        value: Any,
+        expire: int,
+        tags: Sequence[str],
+    ) -> None:
+        """
+        Set value and add its key to the tag sets.
+
+        Tag set lives as long as the longest living key in it.
+
+        :param client: client of the node which holds the key.
+        :param cache_key: cache key.
+        :param value: value.
+        :param expire: expire.
+        :param tags: tags.
+        """
+        tag_keys = [self._generate_tag_key(tag) for tag in tags]
+        stored_value = self.compression.compress(value)
+        async with self.redis.pipeline(transaction=False) as pipe:
+            for tag_key in tag_keys:
+                pipe.sadd(tag_key, cache_key)
+                pipe.ttl(tag_key)
+            if client is self.redis:
+                pipe.set(cache_key, stored_value, ex=expire)
+            else:
+                await client.set(cache_key, stored_value, ex=expire)
+            results = await pipe.execute()
+        tag_ttls = results[1 : len(tag_keys) * 2 : 2]
+        async with self.redis.pipeline(transaction=False) as expire_pipe:
+            for short_lived_key, tag_ttl in zip(tag_keys, tag_ttls):
+                if tag_ttl < expire:
+                    expire_pipe.expire(short_lived_key, expire)
+            await expire_pipe.execute()
+
+    async def _set_many(
+        self,
+        client: Redis,
+        cache_keys: Sequence[str],
+        items: Mapping[str, Any],
+        ttls: Mapping[str, int],
+    ) -> None:
+        """
+        Set values with their own ttl in one pipeline.
+
+        :param client: client of the node which holds the keys.
+        :param cache_keys: cache keys to set.
+        :param items: values by cache keys.
+        :param ttls: expire by cache keys.
+        """
+        async with client.pipeline(transaction=False) as pipe:
+            for cache_key in cache_keys:
+                pipe.set(
+                    cache_key,
+                    self.compression.compress(items[cache_key]),
+                    ex=ttls[cache_key],
+                )
+            await pipe.execute()
+
+    async def _call_by_shard(
+        self,
+        label: str,
+        coro: Callable[..., Any],
+        cache_keys: Sequence[str],
+        *args: Any,
+    ) -> ShardResults:
+        """
+        Call coroutine with client and keys of every shard.
+
+        Failed shards are logged and skipped, so other shards
+        still serve their keys.
+
+        :param label: metrics label.
+        :param coro: coroutine which takes client, keys and args.
+        :param cache_keys: cache keys.
+        :param args: args.
+        :return: keys of every successful shard and its result.
+        """
+        try:
+            shards = self._group_by_shard(cache_keys)
+        except RedisError as err:
+            _log_error(err)
+            return []
+        results = []
+        for shard, shard_keys in shards.items():
+            client, breaker = self._route(shard)
+            try:
+                shard_result = await self._call(
+                    label,
+                    coro,
+                    client,
+                    shard_keys,
+                    *args,
+                    breaker=breaker,
+                )
+            except RedisError as shard_err:
+                _log_error(shard_err)
+                continue
+            results.append((shard_keys, shard_result))
+        return results
+
+    async def _queue_delete(
+        self,
+        pipe: Any,
+        client: Redis,
+        cache_keys: Sequence[str],
+    ) -> None:
+        """
+        Delete keys and queue notifications of other workers.
+
+        Keys are deleted in the redis pipeline
+        or right away if they live on a shard.
+
+        :param pipe: pipeline of redis.
+        :param client: client of the node which holds the keys.
+        :param cache_keys: cache keys.
+        """
+        if client is self.redis:
+            pipe.delete(*cache_keys)
+        else:
+            await client.delete(*cache_keys)
+        for cache_key in cache_keys:
+            pipe.publish(settings.cache_invalidation_channel, cache_key)
+
+    async def _delete_many(self, client: Redis, cache_keys: Sequence[str]) -> None:
+        """
+        Delete keys and notify other workers in one pipeline.
+
+        :param client: client of the node which holds the keys.
+        :param cache_keys: cache keys.
+        """
+        async with self.redis.pipeline(transaction=False) as pipe:
+            await self._queue_delete(pipe, client, cache_keys)
+            await pipe.execute()
+
+    async def _invalidate_tags(self, tag_keys: List[str]) -> Set[str]:
+        """
+        Delete keys from the tag sets.
+
+        Only fetched members are removed from the sets,
+        so keys added meanwhile are kept.
+
+        :param tag_keys: keys of the tag sets.
+        :return: deleted cache keys.
+        """
+        async with self.redis.pipeline(transaction=False) as pipe:
+            for tag_key in tag_keys:
+                pipe.smembers(tag_key)
+            members = await pipe.execute()
+        cache_keys = _decode_members(members)
+        if not cache_keys:
+            return cache_keys
+        groups = self._delete_groups(list(cache_keys))
+        primary_keys = groups.pop(None, [])
+        if primary_keys:
+            await self._delete_many(self.redis, primary_keys)
+        await self._delete_from_nodes("tag", groups)
+        async with self.redis.pipeline(transaction=False) as srem_pipe:
+            for tag_set_key, tag_members in zip(tag_keys, members):
+                if tag_members:
+                    srem_pipe.srem(tag_set_key, *tag_members)
+            await srem_pipe.execute()
+        return cache_keys
+
+    def _holders(self, cache_key: str) -> List[str]:
+        """
+        Get shards which can hold the key.
+
+        These are the shard of the key and the shard
+        which takes the key while the first one is down.
+
+        :param cache_key: cache key.
+        :return: shards.
+        """
+        if self.ring is None:
+            return []
+        owner = self.ring.get_node(cache_key)
+        if owner is None:
+            return []
+        successor = self.ring.get_node(cache_key, skip={owner})
+        return [node for node in (owner, successor) if node is not None]
+
+    def _delete_groups(
+        self,
+        cache_keys: Sequence[str],
+    ) -> Dict[Optional[str], List[str]]:
+        """
+        Split keys by nodes they're deleted from.
+
+        Deletes of unhealthy shards are kept pending.
+
+        :param cache_keys: cache keys.
+        :return: cache keys by healthy nodes, None is the redis.
+        """
+        if self.ring is None:
+            return {None: list(cache_keys)}
+        groups: Dict[Optional[str], List[str]] = {}
+        for cache_key in cache_keys:
+            for node in self._holders(cache_key):
+                if self.shard_breakers[node].available:
+                    groups.setdefault(node, []).append(cache_key)
+                else:
+                    self._defer_node_keys(node, [cache_key])
+        return groups
+
+    async def _delete_from_nodes(
+        self,
+        label: str,
+        groups: Dict[Optional[str], List[str]],
+    ) -> Set[str]:
+        """
+        Delete keys from their nodes.
+
+        Failed deletes of shards are kept pending.
+
+        :param label: metrics label.
+        :param groups: cache keys by nodes, None is the redis.
+        :return: cache keys which weren't deleted from the redis.
+        """
+        failed: Set[str] = set()
+        for node, node_keys in groups.items():
+            client, breaker = self._route(node)
+            try:
+                await self._call(
+                    label,
+                    self._delete_many,
+                    client,
+                    node_keys,
+                    breaker=breaker,
+                )
+            except RedisError as err:
+                _log_error(err)
+                if node is None:
+                    failed.update(node_keys)
+                else:
+                    self._defer_node_keys(node, node_keys)
+        return failed
+
+    async def _release_lock(self, lock_key: str, token: str) -> None:
+        """
+        Delete lock key if it holds the token.
+
+        :param lock_key: lock key.
+        :param token: lock token.
+        """
+        async with self.redis.pipeline(transaction=True) as pipe:
+            await pipe.watch(lock_key)
+            lock_owner = await pipe.get(lock_key)
+            if lock_owner not in {token, token.encode()}:
+                return
+            pipe.multi()
+            pipe.delete(lock_key)
+            try:
+                await pipe.execute()
+            except WatchError:
+                logger.info(f"Lock {lock_key} was changed by other worker.")
+
+    def _local_ttl(self, local_ttl: Optional[int] = None) -> int:
+        """
+        Time to live of local cache entries.
+
+        :param local_ttl: ttl of the call, defaults to ttl of the client.
+        :return: ttl in seconds.
+        """
+        if self.local is None:
+            return 0
+        if local_ttl is not None:
+            return local_ttl
+        if self.local_ttl is not None:
+            return self.local_ttl
+        return self.local.ttl
+
+    def _get_local(
+        self,
+        cache_key: str,
+        local_ttl: Optional[int] = None,
+    ) -> Optional[Any]:
+        """
+        Get value from the local cache if it's enabled.
+
+        :param cache_key: cache key.
+        :param local_ttl: ttl of the call, local cache is skipped if it's 0.
+        :return: cached value or None.
+        """
+        if self.local is None or local_ttl == 0:
+            return None
+        return self.local.get(cache_key)
+
+    def _set_local(
+        self,
+        cache_key: str,
+        value: Any,
+        expire: Optional[float] = None,
+        hot: bool = False,
+        local_ttl: Optional[int] = None,
+    ) -> None:
+        """
+        Put value into the local cache if it's enabled.
+
+        :param cache_key: cache key.
+        :param value: value.
+        :param expire: remaining redis ttl in seconds, local entry never outlives
+            it, None if redis value doesn't expire.
+        :param hot: whether key is one of the most accessed.
+        :param local_ttl: ttl of the call, local cache is skipped if it's 0.
+        """
+        if self.local is None or local_ttl == 0:
+            return
+        ttl: float = self._local_ttl(local_ttl)
+        if hot:
+            ttl = max(ttl, settings.cache_hot_keys_local_ttl)
+        if expire is not None:
+            ttl = min(ttl, expire)
+        if ttl > 0:
+            self.local.set(cache_key, value, ttl=ttl)
+
+    async def _get_with_ttl(
+        self,
+        client: Redis,
+        cache_key: str,
+    ) -> StoredValue:
+        """
+        Get value and its remaining ttl in one pipeline.
+
+        :param client: client of the node which holds the key.
+        :param cache_key: cache key.
+        :return: stored value and remaining ttl in seconds.
+        """
+        async with client.pipeline(transaction=False) as pipe:
+            pipe.get(cache_key)
+            pipe.pttl(cache_key)
+            stored_value, pttl = await pipe.execute()
+        return stored_value, _remaining_ttl(pttl)
+
+    async def _mget_with_ttl(
+        self,
+        client: Redis,
+        cache_keys: Sequence[str],
+    ) -> List[StoredValue]:
+        """
+        Get values and their remaining ttls in one pipeline.
+
+        :param client: client of the node which holds the keys.
+        :param cache_keys: cache keys.
+        :return: stored value and remaining ttl in seconds of every key.
+        """
+        async with client.pipeline(transaction=False) as pipe:
+            pipe.mget(cache_keys)
+            for cache_key in cache_keys:
+                pipe.pttl(cache_key)
+            stored_values, *pttls = await pipe.execute()
+        return [
+            (stored_value, _remaining_ttl(pttl))
+            for stored_value, pttl in zip(stored_values, pttls)
+        ]
+
+    async def _publish_invalidation(self, message: str) -> None:
+        """
+        Ask every worker to drop message from its local cache.
+
+        :param message: cache key or FLUSH_ALL.
+        """
+        await self._with_backoff(
+            self.redis.publish,
+            settings.cache_invalidation_channel,
+            message,
+        )
+
+    async def _get(self, key: str, local_ttl: Optional[int] = None) -> Optional[Any]:
+        """
+        Get value from local cache or redis.
+
+        :param key: key.
+        :param local_ttl: ttl of local entry, local cache is skipped if it's 0.
         :return: cached data or nothing.
         """
-        cache_key = self._generate_cache_key(key)
-        logger.info(f"Getting from cache {cache_key}.")
         try:
-            return await self._with_backoff(self.redis.get, cache_key)
+            cache_key = await self._generate_cache_key(key)
+            local_value = self._get_local(cache_key, local_ttl)
+            if local_value is not None:
+                logger.info(f"Got {cache_key} from local cache.")
+                return local_value
+            logger.info(f"Getting from cache {cache_key}.")
+            client, breaker = self._route(self._shard_of(cache_key))
+            stored_value, expire = await self._call(
+                key_label(key),
+                self._get_with_ttl,
+                client,
+                cache_key,
+                breaker=breaker,
+            )
         except RedisError as err:
-            logger.error("Cache error")
-            logger.error(err)
+            _log_error(err)
             return None
+        cached_value = self.compression.decompress(stored_value)
+        if cached_value is not None:
+            hot = self.sketch.is_hot(key)
+            self._set_local(cache_key, cached_value, expire, hot, local_ttl)
+        return cached_value
+
+    async def get(self, key: str, local_ttl: Optional[int] = None) -> Optional[Any]:
+        """
+        Cache get method.
+
+        :param key: key.
+        :param local_ttl: ttl of local entry, local cache is skipped if it's 0.
+        :return: cached data or nothing.
+        """
+        self.sketch.add(key)
+        cached_value = await self._get(key, local_ttl)
+        if cached_value is None:
+            self.metrics.miss(key_label(key))
+        else:
+            self.metrics.hit(key_label(key))
+        return cached_value
 
     async def set(  # noqa: WPS324
         self,
         key: str,
         value: Any,
         expire: int = settings.cache_ttl,
+        tags: Sequence[str] = (),
+        local_ttl: Optional[int] = None,
     ) -> None:
         """
         Cache set method.
@@ -83,113 +914,1021 @@ class Cache:  # noqa: WPS338
         :param key: key.
         :param value: value.
         :param expire: expire.
+        :param tags: tags which can be used to invalidate the key.
+        :param local_ttl: ttl of local entry, local cache is skipped if it's 0.
         :return: nothing.
         """
-        cache_key = self._generate_cache_key(key)
-        logger.info(f"Setting {cache_key} into cache.")
         try:
-            await self._with_backoff(self.redis.set, cache_key, value, ex=expire)
+            cache_key = await self._generate_cache_key(key)
+            logger.info(f"Setting {cache_key} into cache.")
+            client, breaker = self._route(self._shard_of(cache_key))
+            if tags:
+                await self._call(
+                    key_label(key),
+                    self._set_tagged,
+                    client,
+                    cache_key,
+                    value,
+                    expire,
+                    tags,
+                    breaker=breaker,
+                )
+            else:
+                await self._call(
+                    key_label(key),
+                    client.set,
+                    cache_key,
+                    self.compression.compress(value),
+                    ex=expire,
+                    breaker=breaker,
+                )
         except RedisError as err:
-            logger.error("Cache error")
-            logger.error(err)
+            _log_error(err)
             return None
+        hot = self.sketch.is_hot(key)
+        self._set_local(cache_key, value, expire, hot=hot, local_ttl=local_ttl)
 
-    async def delete(self, key: str) -> None:  # noqa: WPS324
+    async def add(
+        self,
+        key: str,
+        value: Any,
+        expire: int = settings.cache_ttl,
+    ) -> bool:
+        """
+        Put value unless the key is already in cache.
+
+        Fills which can race with invalidations use it,
+        so they never replace markers left by invalidations.
+
+        :param key: key.
+        :param value: value.
+        :param expire: expire.
+        :return: True if value was stored.
+        """
+        try:
+            cache_key = await self._generate_cache_key(key)
+            logger.info(f"Adding {cache_key} into cache.")
+            client, breaker = self._route(self._shard_of(cache_key))
+            added = await self._call(
+                key_label(key),
+                client.set,
+                cache_key,
+                self.compression.compress(value),
+                ex=expire,
+                nx=True,
+                breaker=breaker,
+            )
+        except RedisError as err:
+            _log_error(err)
+            return False
+        if added:
+            self._set_local(cache_key, value, expire, hot=self.sketch.is_hot(key))
+        return bool(added)
+
+    async def delete(self, key: str) -> bool:
         """
         Cache delete method.
 
+        If redis fails, delete is retried in background.
+
         :param key: key.
-        :return: nothing.
+        :return: True if key is deleted, False if it's deferred.
+        """
+        return await self.delete_many([key])
+
+    async def _fill_many(
+        self,
+        keys: Sequence[str],
+        cache_keys: List[str],
+        cached_values: List[Optional[Any]],
+        missing: List[int],
+    ) -> None:
+        """
+        Fill values missing in local cache from redis.
+
+        Keys are fetched with one MGET per shard, local entries
+        don't outlive the remaining ttls of redis values.
+
+        :param keys: keys.
+        :param cache_keys: cache keys.
+        :param cached_values: values found in local cache, filled in place.
+        :param missing: indexes of missing values.
+        """
+        missing_keys = [cache_keys[index] for index in missing]
+        logger.info(f"Getting {missing_keys} from cache.")
+        indexes = dict(zip(missing_keys, missing))
+        shard_values = await self._call_by_shard(
+            keys_label(keys),
+            self._mget_with_ttl,
+            missing_keys,
+        )
+        for shard_keys, redis_values in shard_values:
+            for cache_key, (stored_value, expire) in zip(shard_keys, redis_values):
+                redis_value = self.compression.decompress(stored_value)
+                index = indexes[cache_key]
+                cached_values[index] = redis_value
+                if redis_value is not None:
+                    hot = self.sketch.is_hot(keys[index])
+                    self._set_local(cache_key, redis_value, expire, hot=hot)
+
+    async def _get_many(self, keys: Sequence[str]) -> List[Optional[Any]]:
+        """
+        Get values from local cache and the missing ones from redis.
+
+        :param keys: keys.
+        :return: cached data or None for every key.
         """
-        cache_key = self._generate_cache_key(key)
-        logger.info(f"Deleting {cache_key} from cache.")
         try:
-            await self._with_backoff(self.redis.delete, cache_key)
+            cache_keys = await self._generate_cache_keys(keys)
         except RedisError as err:
-            logger.error("Cache error")
-            logger.error(err)
-            return None
+            _log_error(err)
+            return [None for _ in keys]
+        cached_values = [self._get_local(cache_key) for cache_key in cache_keys]
+        missing = [index for index, value in enumerate(cached_values) if value is None]
+        if missing:
+            await self._fill_many(keys, cache_keys, cached_values, missing)
+        return cached_values
+
+    async def get_many(self, keys: Sequence[str]) -> List[Optional[Any]]:
+        """
+        Get many keys in one round trip.
+
+        :param keys: keys.
+        :return: cached data or None for every key.
+        """
+        for accessed_key in keys:
+            self.sketch.add(accessed_key)
+        cached_values = await self._get_many(keys)
+        for key, cached_value in zip(keys, cached_values):
+            if cached_value is None:
+                self.metrics.miss(key_label(key))
+            else:
+                self.metrics.hit(key_label(key))
+        return cached_values
+
+    async def set_many(
+        self,
+        items: Mapping[str, Any],
+        expire: Union[int, Mapping[str, int]] = settings.cache_ttl,
+    ) -> None:
+        """
+        Set many keys in one pipeline.
+
+        :param items: values by keys.
+        :param expire: expire for all keys or expire by keys.
+        """
+        if not items:
+            return
+        ttls = _expire_by_key(items, expire)
+        logger.info(f"Setting {ttls} into cache.")
+        try:
+            cache_keys = dict(zip(items, await self._generate_cache_keys(list(items))))
+        except RedisError as err:
+            _log_error(err)
+            return
+        values = {cache_keys[key]: value for key, value in items.items()}
+        cache_ttls = {cache_keys[key]: ttl for key, ttl in ttls.items()}
+        stored = await self._call_by_shard(
+            keys_label(list(items)),
+            self._set_many,
+            list(values),
+            values,
+            cache_ttls,
+        )
+        for shard_keys, _ in stored:
+            for cache_key in shard_keys:
+                self._set_local(cache_key, values[cache_key], cache_ttls[cache_key])
+
+    async def delete_many(self, keys: Sequence[str]) -> bool:
+        """
+        Delete many keys in one round trip.
+
+        Keys which redis fails to delete are retried in background.
+
+        :param keys: keys.
+        :return: True if keys are deleted, False if some of them are deferred.
+        """
+        if not keys:
+            return True
+        failed = await self._delete_keys(keys)
+        if failed:
+            self._defer(keys=failed)
+        return not failed
+
+    async def _delete_keys(self, keys: Sequence[str]) -> List[str]:
+        """
+        Delete keys from local cache and redis.
+
+        :param keys: keys.
+        :return: keys which weren't deleted from redis.
+        """
+        try:
+            cache_keys = await self._generate_cache_keys(keys)
+        except RedisError as err:
+            _log_error(err)
+            return list(keys)
+        logger.info(f"Deleting {cache_keys} from cache.")
+        if self.local is not None:
+            for cache_key in cache_keys:
+                self.local.delete(cache_key)
+        failed = await self._delete_from_nodes(
+            keys_label(keys),
+            self._delete_groups(cache_keys),
+        )
+        return [
+            key
+            for key, versioned_key in zip(keys, cache_keys)
+            if versioned_key in failed
+        ]
+
+    async def invalidate_tags(self, *tags: str, namespaces: Sequence[str] = ()) -> bool:
+        """
+        Delete all keys marked with any of the tags.
+
+        If tag sets can't be read, namespaces of the tagged keys
+        are invalidated instead. If that fails too, invalidation
+        is retried in background until redis takes it.
 
-    async def flush(self) -> None:  # noqa: WPS324
+        :param tags: tags.
+        :param namespaces: namespaces of the tagged keys.
+        :return: True if keys are invalidated, False if it's deferred.
+        """
+        logger.info(f"Invalidating cache tags {tags}.")
+        if await self._try_invalidate_tags(tags, namespaces):
+            return True
+        logger.warning(f"Invalidation of cache tags {tags} is deferred.")
+        self._defer(tags=tags, namespaces=namespaces)
+        return False
+
+    async def _try_invalidate_tags(
+        self,
+        tags: Sequence[str],
+        namespaces: Sequence[str],
+    ) -> bool:
+        """
+        Delete keys of the tags or fall back to their namespaces.
+
+        :param tags: tags.
+        :param namespaces: namespaces of the tagged keys.
+        :return: True if keys are invalidated.
+        """
+        tag_keys = [self._generate_tag_key(tag) for tag in tags]
+        try:
+            cache_keys = await self._with_backoff(self._invalidate_tags, tag_keys)
+        except RedisError as err:
+            _log_error(err)
+            if not namespaces:
+                return False
+            return not await self._bump_namespaces(namespaces)
+        if self.local is not None:
+            for cache_key in cache_keys:
+                self.local.delete(cache_key)
+        return True
+
+    async def _bump_namespaces(self, namespaces: Sequence[str]) -> List[str]:
+        """
+        Bump versions of the namespaces.
+
+        :param namespaces: namespaces.
+        :return: namespaces which weren't bumped.
+        """
+        failed = []
+        for namespace in namespaces:
+            if not await self._bump_namespace(namespace):
+                failed.append(namespace)
+        return failed
+
+    def _defer(
+        self,
+        keys: Sequence[str] = (),
+        tags: Sequence[str] = (),
+        namespaces: Sequence[str] = (),
+        flush: bool = False,
+    ) -> None:
+        """
+        Keep failed invalidations pending and start retrying them.
+
+        :param keys: keys to delete.
+        :param tags: tags to invalidate.
+        :param namespaces: namespaces to invalidate.
+        :param flush: whether the whole cache has to be flushed.
+        """
+        self.pending.add(keys, tags, namespaces, flush)
+        self._start_replay()
+
+    def _defer_node_keys(self, node: str, cache_keys: Sequence[str]) -> None:
+        """
+        Keep keys which weren't deleted from the shard pending.
+
+        :param node: shard.
+        :param cache_keys: cache keys.
+        """
+        self.pending.add_node_keys(node, cache_keys)
+        self._start_replay()
+
+    def _start_replay(self) -> None:
+        """Start retrying pending invalidations unless they're retried already."""
+        if self._replay_task is None or self._replay_task.done():
+            self._replay_task = _run_in_background(self._replay_pending())
+
+    async def _replay_pending(self) -> None:
+        """
+        Retry pending invalidations until all of them are done.
+
+        Invalidations which fail again stay pending,
+        so they aren't lost however long redis is unavailable.
+        """
+        while self.pending:
+            await asyncio.sleep(settings.cache_invalidation_retry_interval)
+            await self._replay(self.pending.take())
+        logger.info("Pending cache invalidations are done.")
+
+    async def _replay(self, batch: PendingInvalidations) -> None:
+        """
+        Run pending invalidations, failed ones are kept pending again.
+
+        :param batch: pending invalidations.
+        """
+        if batch.flush:
+            if not await self._flush():
+                self.pending.add(flush=True)
+            return
+        failed_namespaces = await self._bump_namespaces(list(batch.namespaces))
+        failed_tags: List[str] = []
+        if batch.tags and not await self._try_invalidate_tags(list(batch.tags), ()):
+            failed_tags = list(batch.tags)
+        failed_keys: List[str] = []
+        if batch.keys:
+            failed_keys = await self._delete_keys(list(batch.keys))
+        self.pending.add(failed_keys, failed_tags, failed_namespaces)
+        for node, node_keys in batch.node_keys.items():
+            await self._replay_node_keys(node, list(node_keys))
+
+    async def _replay_node_keys(self, node: str, cache_keys: List[str]) -> None:
+        """
+        Delete pending keys from the shard.
+
+        The shard is used again once all of its keys are deleted.
+
+        :param node: shard.
+        :param cache_keys: cache keys.
+        """
+        client, breaker = self._route(node)
+        try:
+            await self._with_backoff(
+                self._delete_many,
+                client,
+                cache_keys,
+                breaker=breaker,
+            )
+        except RedisError as err:
+            _log_error(err)
+            return
+        self.pending.discard_node_keys(node, cache_keys)
+
+    async def acquire_lock(self, key: str, timeout: float) -> Optional[str]:
+        """
+        Acquire short lock for filling the key.
+
+        Lock is treated as acquired if redis fails,
+        so cache errors never block the request.
+
+        :param key: key.
+        :param timeout: lock timeout in seconds.
+        :return: lock token or None if lock is held by someone else.
+        """
+        token = uuid.uuid4().hex
+        try:
+            acquired = await self._call(
+                key_label(key),
+                self.redis.set,
+                self._generate_lock_key(key),
+                token,
+                nx=True,
+                px=int(timeout * 1000),
+            )
+        except RedisError as err:
+            _log_error(err)
+            return token
+        return token if acquired else None
+
+    async def release_lock(self, key: str, token: str) -> None:
+        """
+        Release lock if it's still held by token owner.
+
+        :param key: key.
+        :param token: token returned by acquire_lock.
+        """
+        try:
+            await self._with_backoff(
+                self._release_lock,
+                self._generate_lock_key(key),
+                token,
+            )
+        except RedisError as err:
+            _log_error(err)
+
+    async def wait_for(
+        self,
+        key: str,
+        timeout: float,
+        local_ttl: Optional[int] = None,
+    ) -> Optional[Any]:
+        """
+        Wait until other worker puts the key into cache.
+
+        Waiting stops early if the lock is released without the value.
+
+        :param key: key.
+        :param timeout: max time to wait in seconds.
+        :param local_ttl: ttl of local entry, local cache is skipped if it's 0.
+        :return: cached data or None.
+        """
+        lock_key = self._generate_lock_key(key)
+        deadline = time.monotonic() + timeout
+        while time.monotonic() < deadline:
+            await asyncio.sleep(settings.cache_lock_poll_interval)
+            cached_value = await self._get(key, local_ttl)
+            if cached_value is not None:
+                return cached_value
+            try:
+                if not await self._with_backoff(self.redis.exists, lock_key):
+                    return None
+            except RedisError as err:
+                _log_error(err)
+                return None
+        return None
+
+    async def invalidate_namespace(self, namespace: str) -> bool:
+        """
+        Make all keys of the namespace unreachable.
+
+        Version of the namespace is bumped in O(1),
+        old keys expire by ttl or are removed by the sweeper.
+        If redis fails, invalidation is retried in background.
+
+        :param namespace: key prefix, the part before the first colon.
+        :return: True if version is bumped, False if it's deferred.
+        """
+        logger.info(f"Invalidating cache namespace {namespace}.")
+        if await self._bump_namespace(namespace):
+            return True
+        self._defer(namespaces=[namespace])
+        return False
+
+    async def _bump_namespace(self, namespace: str) -> bool:
+        """
+        Bump version of the namespace.
+
+        :param namespace: namespace.
+        :return: True if version is bumped.
+        """
+        try:
+            await self._with_backoff(
+                self._bump_version,
+                self._generate_version_key(namespace),
+            )
+        except RedisError as err:
+            _log_error(err)
+            return False
+        return True
+
+    async def flush(self) -> bool:
         """
         Cache flush method.
 
-        :return: nothing.
+        Global version is bumped, so every key becomes unreachable
+        without touching other data in the redis database.
+        If redis fails, flush is retried in background.
+
+        :return: True if cache is flushed, False if it's deferred.
+        """
+        logger.info("Flushing cache.")
+        if self.local is not None:
+            self.local.clear()
+        if await self._flush():
+            return True
+        self._defer(flush=True)
+        return False
+
+    async def _flush(self) -> bool:
+        """
+        Bump global version and ask workers to clear their local caches.
+
+        :return: True if cache is flushed.
         """
         try:
-            logger.info("Flushing cache.")
-            await self._with_backoff(self.redis.flushdb)
+            await self._with_backoff(
+                self._bump_version,
+                self._generate_version_key(ALL_NAMESPACES),
+            )
+            await self._publish_invalidation(FLUSH_ALL)
         except RedisError as err:
-            logger.error("Cache error")
-            logger.error(err)
+            _log_error(err)
+            return False
+        return True
+
+    async def disconnect_shards(self) -> None:
+        """Close connection pools of the shards."""
+        for shard in self.shards.values():
+            await shard.connection_pool.disconnect()
+
+
+@functools.lru_cache(maxsize=8)
+def get_cache(redis: ConnectionPool) -> Cache:
+    """
+    Get app-scoped cache client of the pool.
+
+    Client is created on the first call and is used by cacheable
+    handlers too, so their values, tags and local entries are
+    where invalidations of this client look for them.
+    Values are sharded if cache_shard_urls are set.
+
+    :param redis: redis connection pool.
+    :return: cache.
+    """
+    shards = {url: create_pool(url) for url in settings.cache_shard_urls}
+    return Cache(redis, local=local_cache, shards=shards)
+
+
+# Keeps references to background tasks until they are done.
+_background_tasks: "Set[asyncio.Future[Any]]" = set()
+
+
+def _run_in_background(coro: Awaitable[Any]) -> "asyncio.Future[Any]":
+    """
+    Run coroutine without waiting for it.
+
+    :param coro: coroutine.
+    :return: task.
+    """
+    task = asyncio.ensure_future(coro)
+    _background_tasks.add(task)
+    task.add_done_callback(_background_task_done)
+    return task
+
+
+def _background_task_done(task: "asyncio.Future[Any]") -> None:
+    """
+    Forget finished background task and log its error.
+
+    :param task: finished task.
+    """
+    _background_tasks.discard(task)
+    if not task.cancelled() and task.exception() is not None:
+        logger.error("Background cache task failed")
+        logger.error(task.exception())
+
+
+# Metadata stored in front of the cached data.
+EntryHeader = Dict[str, Any]
+# Cached marker of the missing entity.
+MISSING = b"\x00"
+
+
+def _wrap(data: bytes, header: EntryHeader) -> bytes:
+    """
+    Put header line in front of the serialized data.
+
+    Serialized json never contains raw newlines,
+    so the first newline always ends the header.
+
+    :param data: serialized data.
+    :param header: entry metadata, e.g. soft expiry or response headers.
+    :return: cache entry.
+    """
+    if not header:
+        return data
+    return b"\n".join([json.dumps(header).encode(), data])
+
+
+def _unwrap(cached_data: Union[str, bytes]) -> Tuple[bytes, EntryHeader]:
+    """
+    Split cache entry into serialized data and its header.
+
+    Entries cached without header are returned as is.
+
+    :param cached_data: cache entry.
+    :return: serialized data and header.
+    """
+    if isinstance(cached_data, str):
+        cached_data = cached_data.encode()
+    header, separator, data = cached_data.partition(b"\n")
+    if not separator:
+        return cached_data, {}
+    return data, json.loads(header)
+
+
+def _validate(result: Any, dto_model: Any) -> Any:
+    """
+    Convert handler result to DTOs.
+
+    :param result: handler result.
+    :param dto_model: dto_model.
+    :return: dto or list of dto.
+    """
+    if isinstance(result, list):
+        return [dto_model.model_validate(obj) for obj in result]
+    return dto_model.model_validate(result)
+
+
+def _serialize(result: Any, dto_model: Any) -> str:
+    """
+    Serialize handler result for the cache.
+
+    :param result: handler result.
+    :param dto_model: dto_model.
+    :return: serialized data.
+    """
+    dto = _validate(result, dto_model)
+    if isinstance(dto, list):
+        return json.dumps([obj.json() for obj in dto])
+    return dto.json()
+
+
+def _deserialize(cached_data: Any, dto_model: Any) -> Any:
+    """
+    Build DTOs from the cached data.
+
+    :param cached_data: cached data.
+    :param dto_model: dto_model.
+    :return: dto or list of dto.
+    """
+    cached_data = json.loads(cached_data)
+    if isinstance(cached_data, list):
+        return [dto_model(**json.loads(obj)) for obj in cached_data]
+    return dto_model(**cached_data)
+
+
+class _CachedHandler:  # noqa: WPS230
+    """Handler wrapped with cacheable."""
+
+    def __init__(
+        self,
+        func: Callable[..., Any],
+        key_prefix: str,
+        dto_model: Any,
+        expire: int,
+        local_ttl: Optional[int],
+        tags: Sequence[str],
+        lock_timeout: float,
+        stale_ttl: Optional[int],
+        negative_ttl: Optional[int],
+        key_builder: CacheKeyBuilder,
+        response_class: Optional[Type[Response]],
+        adaptive_ttl: bool = False,
+    ):
+        self.func = func
+        self.key_prefix = key_prefix
+        self.dto_model = dto_model
+        self.expire = expire
+        self.local_ttl = local_ttl
+        self.tags = tags
+        self.lock_timeout = lock_timeout
+        self.stale_ttl = stale_ttl
+        self.negative_ttl = negative_ttl
+        self.key_builder = key_builder
+        self.response_class = response_class
+        self.ttl_policy = ttl_policy if adaptive_ttl else None
+
+    async def __call__(self, *args: Any, **kwargs: Any) -> Any:
+        redis: Optional[ConnectionPool] = kwargs.get("redis_pool")
+        if not redis:
+            raise ValueError(
+                "Redis instance must be provided as a keyword argument",
+            )
+        cache = get_cache(redis)
+        key_params = self.key_builder.key_params(kwargs)
+        cache_key = self.key_builder.build_key(self.key_prefix, key_params)
+        self._record_hot(redis, key_params)
+
+        cached_data = await cache.get(cache_key, self._local_ttl)
+        if cached_data:
+            logger.info("Retrieved data from cache")
+            self._record_read(cache_key)
+            data, header = _unwrap(cached_data)
+            stale_at = header.get("stale_at")
+            if stale_at is not None and stale_at <= time.time():
+                cache.metrics.stale(key_label(cache_key))
+                self._revalidate(cache, cache_key, args, kwargs)
+            result = self._decode(data, header)
+        else:
+            result = await single_flight.do(
+                cache_key,
+                functools.partial(self._load, cache, cache_key, args, kwargs),
+            )
+        if result is None:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="Not found",
+            )
+        return result
+
+    async def warm(self, redis: ConnectionPool, key_params: Dict[str, Any]) -> bool:
+        """
+        Put handler result into cache unless it's already there.
+
+        :param redis: redis pool.
+        :param key_params: key params of the call.
+        :return: True if handler was called.
+        """
+        cache = get_cache(redis)
+        cache_key = self.key_builder.build_key(self.key_prefix, key_params)
+        if await cache.get(cache_key, self._local_ttl):
+            return False
+        kwargs = self.key_builder.restore_kwargs(key_params, redis)
+        await single_flight.do(
+            cache_key,
+            functools.partial(self._load, cache, cache_key, (), kwargs),
+        )
+        return True
+
+    @property
+    def _local_ttl(self) -> int:
+        """
+        Time to live of local entries of the handler.
+
+        :return: ttl in seconds, 0 if local cache is off.
+        """
+        return 0 if self.local_ttl is None else self.local_ttl
+
+    def _encode(self, result: Any) -> Tuple[bytes, EntryHeader]:
+        """
+        Serialize handler result.
+
+        If response_class is set, final response body
+        and its headers are cached.
+
+        :param result: handler result, None if entity is missing.
+        :return: serialized data and header.
+        """
+        if result is None:
+            return MISSING, {}
+        if self.response_class is None:
+            return _serialize(result, self.dto_model).encode(), {}
+        response = self.response_class(
+            content=jsonable_encoder(_validate(result, self.dto_model)),
+        )
+        headers = {
+            name: header_value
+            for name, header_value in response.headers.items()
+            if name != "content-length"
+        }
+        return response.body, {"headers": headers}
+
+    def _decode(self, data: bytes, header: EntryHeader) -> Any:
+        """
+        Build handler result from the cached data.
+
+        :param data: serialized data.
+        :param header: header of the cache entry.
+        :return: response or DTOs, None if entity is missing.
+        """
+        if data == MISSING:
             return None
+        headers = header.get("headers")
+        if headers is not None:
+            return Response(content=data, headers=headers)
+        return _deserialize(data, self.dto_model)
+
+    async def _load(
+        self,
+        cache: Cache,
+        cache_key: str,
+        args: Any,
+        kwargs: Dict[str, Any],
+        wait: bool = True,
+    ) -> Any:
+        """
+        Run handler and put its result into cache.
+
+        Only one worker runs the handler, others wait
+        until the result appears in cache.
 
+        :param cache: cache.
+        :param cache_key: cache key.
+        :param args: handler args.
+        :param kwargs: handler kwargs.
+        :param wait: wait for other worker instead of skipping the call.
+        :return: handler result or None if skipped.
+        """
+        lock_token = await cache.acquire_lock(cache_key, self.lock_timeout)
+        if lock_token is None:
+            if not wait:
+                return None
+            cached_data = await cache.wait_for(
+                cache_key,
+                self.lock_timeout,
+                self._local_ttl,
+            )
+            if cached_data:
+                logger.info("Retrieved data from cache after waiting")
+                return self._decode(*_unwrap(cached_data))
+        try:  # noqa: WPS501
+            result = await self.func(*args, **kwargs)
+            logger.info("Failed to retrieve data from cache")
+            logger.info("Putting into cache")
+            data, header = self._encode(result)
+            await self._store(cache, cache_key, data, header, kwargs)
+        finally:
+            if lock_token is not None:
+                await cache.release_lock(cache_key, lock_token)
+        if self.response_class is not None:
+            return self._decode(data, header)
+        return result
 
-def cacheable(  # noqa: C901
+    async def _store(
+        self,
+        cache: Cache,
+        cache_key: str,
+        data: bytes,
+        header: EntryHeader,
+        kwargs: Dict[str, Any],
+    ) -> None:
+        """
+        Put serialized handler result into cache.
+
+        In adaptive mode expire is the initial TTL of the key,
+        it's adjusted by the policy on every store.
+        In stale-while-revalidate mode the value is kept for
+        stale_ttl seconds more than expire with soft expiry next to it.
+        Missing entity is kept for negative_ttl seconds with the same tags,
+        so it's dropped when entity is created.
+
+        :param cache: cache.
+        :param cache_key: cache key.
+        :param data: serialized handler result.
+        :param header: header of the cache entry.
+        :param kwargs: handler kwargs.
+        """
+        if data == MISSING:
+            if self.negative_ttl is None:
+                return
+            expire = self.negative_ttl
+        else:
+            expire = self._adapt_ttl(cache_key)
+            if self.stale_ttl is not None:
+                header = {**header, "stale_at": time.time() + expire}
+                expire += self.stale_ttl
+        await cache.set(
+            cache_key,
+            _wrap(data, header),
+            expire=expire,
+            tags=[tag.format(**kwargs) for tag in self.tags],
+            local_ttl=self._local_ttl,
+        )
+
+    def _adapt_ttl(self, cache_key: str) -> int:
+        """
+        Get TTL of the value which is stored now.
+
+        :param cache_key: cache key.
+        :return: TTL in seconds.
+        """
+        if self.ttl_policy is None:
+            return self.expire
+        return self.ttl_policy.ttl(cache_key, self.expire)
+
+    def _record_read(self, cache_key: str) -> None:
+        """
+        Count cache hit in the TTL policy.
+
+        :param cache_key: cache key.
+        """
+        if self.ttl_policy is not None:
+            self.ttl_policy.read(cache_key)
+
+    def _revalidate(
+        self,
+        cache: Cache,
+        cache_key: str,
+        args: Any,
+        kwargs: Dict[str, Any],
+    ) -> None:
+        """
+        Refresh stale key in background.
+
+        :param cache: cache.
+        :param cache_key: cache key.
+        :param args: handler args.
+        :param kwargs: handler kwargs.
+        """
+        logger.info(f"Revalidating stale {cache_key} in background.")
+        _run_in_background(
+            single_flight.do(
+                cache_key,
+                functools.partial(
+                    self._load,
+                    cache,
+                    cache_key,
+                    args,
+                    kwargs,
+                    wait=False,
+                ),
+            ),
+        )
+
+    def _record_hot(self, redis: ConnectionPool, key_params: Dict[str, Any]) -> None:
+        """
+        Count sampled request in the hot list used to warm cache.
+
+        :param redis: redis pool.
+        :param key_params: key params of the request.
+        """
+        if not self.key_builder.restorable:
+            return
+        if circuit_breaker.state != BreakerState.CLOSED:
+            return
+        if random.random() >= settings.cache_hot_keys_sample_rate:  # noqa: S311
+            return
+        _run_in_background(
+            HotKeys(redis).record(encode_member(self.key_prefix, key_params)),
+        )
+
+
+# Cacheable handlers by key prefixes, used to warm cache.
+cached_handlers: Dict[str, _CachedHandler] = {}
+
+
+def cacheable(
     key_prefix: str,
     dto_model: Any,
     expire: int = settings.cache_ttl,
+    local_ttl: Optional[int] = None,
+    tags: Sequence[str] = (),
+    lock_timeout: float = settings.cache_lock_timeout,
+    stale_ttl: Optional[int] = None,
+    vary_on: Sequence[str] = (),
+    vary_on_user: bool = False,
+    response_class: Optional[Type[Response]] = None,
+    negative_ttl: Optional[int] = settings.cache_negative_ttl,
+    adaptive_ttl: bool = False,
 ) -> Callable[[Callable[..., Any]], Callable[..., Any]]:
     """
     Cache decorator which can be applied to router method.
 
+    If local_ttl is set, responses are also kept in the
+    in-process cache of every worker for local_ttl seconds.
+
+    Tags are formatted with the handler kwargs,
+    e.g. "currency_type:{currency_type_id}", and can be
+    passed to Cache.invalidate_tags by write handlers.
+
+    Concurrent misses of the same key are coalesced,
+    so handler runs once per key per expiry.
+
+    If stale_ttl is set, value older than expire is still
+    returned for stale_ttl seconds while it's refreshed in background.
+
+    Key is a hash of all path, query and body parameters
+    and the dependencies listed in vary_on.
+
+    If response_class is set, cache holds the rendered response
+    and hits are returned as raw responses without DTO validation.
+
+    Handler returns None if entity is missing, it's answered with 404
+    and remembered for negative_ttl seconds.
+
+    If adaptive_ttl is set, expire is only the initial TTL.
+    Keys which are read and outlive their TTL live twice longer
+    next time and keys which are invalidated earlier live twice shorter,
+    within cache_adaptive_ttl_min and cache_adaptive_ttl_max.
+
     :param key_prefix: key_prefix.
     :param dto_model: dto_model.
     :param expire: expire.
+    :param local_ttl: ttl of the local cache entries, local cache is off if None.
+    :param tags: tag templates of the cached entries.
+    :param lock_timeout: max time to wait for other worker filling the key.
+    :param stale_ttl: how long stale value can be served.
+    :param vary_on: names of dependencies which are part of the key.
+    :param vary_on_user: cache responses per authenticated user.
+    :param response_class: class used to render and cache the whole response.
+    :param negative_ttl: ttl of missing entities, they aren't cached if None.
+    :param adaptive_ttl: adjust ttl of every key by its reads and changes.
     :return: inner function.
     """
 
     def decorator(func: Callable[..., Any]) -> Callable[..., Any]:
+        handler = _CachedHandler(
+            func,
+            key_prefix=key_prefix,
+            dto_model=dto_model,
+            expire=expire,
+            local_ttl=local_ttl,
+            tags=tags,
+            lock_timeout=lock_timeout,
+            stale_ttl=stale_ttl,
+            negative_ttl=negative_ttl,
+            key_builder=CacheKeyBuilder(func, vary_on, vary_on_user),
+            response_class=response_class,
+            adaptive_ttl=adaptive_ttl,
+        )
+        cached_handlers[key_prefix] = handler
+
         @functools.wraps(func)
         async def wrapper(*args: Any, **kwargs: Any) -> Any:
-            redis: Redis = kwargs.get("redis_pool")
-            if not redis:
-                raise ValueError(
-                    "Redis instance must be provided as a keyword argument",
-                )
-
-            cache = Cache(redis)
-            cache_key = f"{key_prefix}"
-
-            kwargs_list = [
-                value for key, value in kwargs.items() if key.endswith("_id")
-            ]
-            if kwargs_list:
-                cache_key = f"{cache_key}_{kwargs_list[0]}"
-
-            try:
-                cached_data = await cache.get(cache_key)
-                if cached_data:
-                    cached_data = json.loads(cached_data)
-                    if isinstance(cached_data, list):
-                        cached_data = [
-                            dto_model(**json.loads(obj)) for obj in cached_data  # type: ignore  # noqa: E501
-                        ]
-                    else:
-                        cached_data = dto_model(**cached_data)  # type: ignore
-                    logger.info("Retrieved data from cache")
-                    logger.info(cached_data)
-                    return cached_data
-            except RedisError as err:
-                logger.error("Cache error")
-                logger.error(err)
-
-            result = await func(*args, **kwargs)
-            try:
-                if isinstance(result, list):
-                    data = json.dumps(
-                        [dto_model.model_validate(obj).json() for obj in result],
-                    )
-                else:
-                    data = dto_model.model_validate(result).json()
-                logger.info("Failed to retrieve data from cache")
-                logger.info("Putting into cache")
-                logger.info(cached_data)
-                await cache.set(cache_key, data, expire=expire)
-                return result
-            except RedisError as error:
-                logger.error("Cache error")
-                logger.error(error)
+            return await handler(*args, **kwargs)
 
         return wrapper
 
@@ -0,0 +1,116 @@
+"""Compression of large cache values."""
+import zlib
+from typing import Any, Callable, Dict, Optional
+
+from test_task.settings import settings
+
+try:
+    from lz4 import frame as lz4_frame  # noqa: WPS433
+except ImportError:
+    lz4_frame = None  # noqa: WPS440
+
+# One-byte headers which mark the format of stored value.
+# Values without them are uncompressed entries written before compression.
+RAW = b"\x01"
+ZLIB = b"\x02"
+LZ4 = b"\x03"
+
+_HEADERS = frozenset((RAW, ZLIB, LZ4))
+_DECOMPRESSORS: Dict[bytes, Callable[[bytes], bytes]] = {
+    RAW: bytes,
+    ZLIB: zlib.decompress,
+}
+if lz4_frame is not None:
+    _DECOMPRESSORS[LZ4] = lz4_frame.decompress
+
+
+def _zlib_compress(data: bytes) -> bytes:
+    """
+    Compress data with zlib.
+
+    :param data: data.
+    :return: compressed data.
+    """
+    return zlib.compress(data, settings.cache_compression_level)
+
+
+def default_codec() -> str:
+    """
+    Get the fastest available codec.
+
+    :return: codec name.
+    """
+    if lz4_frame is None:
+        return "zlib"
+    return "lz4"
+
+
+class Compressor:
+    """
+    Compresses cache values above the size threshold.
+
+    Every compressed value starts with the header of its codec,
+    so values written with any codec or without compression stay readable.
+    """
+
+    def __init__(
+        self,
+        codec: Optional[str] = settings.cache_compression,
+        min_size: int = settings.cache_compression_min_size,
+    ):
+        codecs = {"zlib": (ZLIB, _zlib_compress)}
+        if lz4_frame is not None:
+            codecs["lz4"] = (LZ4, lz4_frame.compress)
+        if codec is None:
+            codec = default_codec()
+        if codec not in codecs:
+            raise ValueError(f"Unknown compression codec {codec}")
+        self.codec = codec
+        header, compress = codecs[codec]
+        self.header = header
+        self._compress = compress
+        self.min_size = min_size
+
+    def compress(self, value: Any) -> Any:
+        """
+        Compress value if it's large enough.
+
+        Small values are stored as is, unless they start
+        with one of the headers.
+
+        :param value: value.
+        :return: value to store in redis.
+        """
+        if isinstance(value, str):
+            value = value.encode()
+        if not isinstance(value, bytes):
+            return value
+        if len(value) >= self.min_size:
+            compressed = self._compress(value)
+            if len(compressed) < len(value):
+                return self.header + compressed
+        if value[:1] in _HEADERS:
+            return RAW + value
+        return value
+
+    def decompress(self, stored: Optional[bytes]) -> Optional[bytes]:
+        """
+        Restore value read from redis.
+
+        Value compressed with unavailable codec is treated as missing.
+
+        :param stored: stored value.
+        :return: original value.
+        """
+        if not stored:
+            return stored
+        header = stored[:1]
+        if header not in _HEADERS:
+            return stored
+        decompress = _DECOMPRESSORS.get(header)
+        if decompress is None:
+            return None
+        return decompress(stored[1:])
+
+
+compressor = Compressor()
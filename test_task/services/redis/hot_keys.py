@@ -0,0 +1,110 @@
+"""Rolling list of the most requested cache keys."""
+import json
+import operator
+import time
+from typing import Any, Dict, List, Tuple
+
+from loguru import logger
+from redis.asyncio import ConnectionPool, Redis, RedisError
+
+from test_task.settings import settings
+
+
+def encode_member(key_prefix: str, params: Dict[str, Any]) -> str:
+    """
+    Build hot list member of the cached call.
+
+    :param key_prefix: key prefix of the cacheable handler.
+    :param params: json compatible handler params which build the key.
+    :return: member.
+    """
+    return json.dumps([key_prefix, params], sort_keys=True, separators=(",", ":"))
+
+
+def decode_member(member: Any) -> Tuple[str, Dict[str, Any]]:
+    """
+    Get cached call from the hot list member.
+
+    :param member: member.
+    :return: key prefix and handler params.
+    """
+    decoded = json.loads(member)
+    return decoded[0], decoded[1]
+
+
+class HotKeys:
+    """
+    Request counters of cached calls in time windows.
+
+    Counters of the current and the previous window are kept,
+    so the list follows recent traffic.
+    """
+
+    def __init__(
+        self,
+        redis: ConnectionPool,
+        prefix: str = settings.cache_prefix,
+        window: int = settings.cache_hot_keys_window,
+    ):
+        self.redis = Redis(connection_pool=redis)
+        self.prefix = prefix
+        self.window = window
+
+    async def record(self, member: str) -> None:
+        """
+        Count request of the cached call.
+
+        :param member: cached call.
+        """
+        window_key = self._generate_window_key(self._current_window())
+        try:
+            async with self.redis.pipeline(transaction=False) as pipe:
+                pipe.zincrby(window_key, 1, member)
+                pipe.expire(window_key, self.window * 2)
+                await pipe.execute()
+        except RedisError as err:
+            logger.error("Hot keys error")
+            logger.error(err)
+
+    async def top(self, limit: int) -> List[str]:
+        """
+        Get the most requested calls of the current and the previous window.
+
+        :param limit: max quantity of calls.
+        :return: members ordered by requests.
+        """
+        current_window = self._current_window()
+        async with self.redis.pipeline(transaction=False) as pipe:
+            for window_start in (current_window - 1, current_window):
+                pipe.zrevrange(
+                    self._generate_window_key(window_start),
+                    0,
+                    limit - 1,
+                    withscores=True,
+                )
+            windows = await pipe.execute()
+        scores: Dict[str, float] = {}
+        for window in windows:
+            for member, score in window:
+                if isinstance(member, bytes):
+                    member = member.decode()
+                scores[member] = scores.get(member, 0) + score
+        ranked = sorted(scores.items(), key=operator.itemgetter(1), reverse=True)
+        return [ranked_member for ranked_member, _ in ranked[:limit]]
+
+    def _generate_window_key(self, window_start: int) -> str:
+        """
+        Generate key of the window counters.
+
+        :param window_start: window number.
+        :return: key.
+        """
+        return f"{self.prefix}:hot:{window_start}"
+
+    def _current_window(self) -> int:
+        """
+        Get number of the current window.
+
+        :return: window number.
+        """
+        return int(time.time() // self.window)
@@ -0,0 +1,158 @@
+"""Cache keys of the cacheable handlers."""
+import enum
+import hashlib
+import inspect
+import json
+from typing import Any, Callable, Dict, Sequence
+
+from fastapi import params
+from pydantic import BaseModel
+from redis.asyncio import ConnectionPool
+
+# Name of the dependency with authenticated user.
+CURRENT_USER_PARAM = "current_user"
+# Redis pool is required by cacheable and never affects the response.
+REDIS_POOL_PARAM = "redis_pool"
+
+
+def _canonical(value: Any) -> Any:
+    """
+    Convert value to the stable json compatible form.
+
+    :param value: handler argument.
+    :return: json compatible value.
+    """
+    if isinstance(value, BaseModel):
+        return value.model_dump(mode="json")
+    if isinstance(value, enum.Enum):
+        return value.value
+    if isinstance(value, (list, tuple, set, frozenset)):
+        items = [_canonical(item) for item in value]
+        if isinstance(value, (set, frozenset)):
+            items.sort(key=repr)
+        return items
+    if isinstance(value, dict):
+        return {str(key): _canonical(item) for key, item in value.items()}
+    return value
+
+
+def _restore(annotation: Any, value: Any) -> Any:
+    """
+    Convert canonical value back to the handler argument.
+
+    :param annotation: argument annotation.
+    :param value: canonical value.
+    :return: handler argument.
+    """
+    if value is None or not inspect.isclass(annotation):
+        return value
+    if issubclass(annotation, BaseModel):
+        return annotation.model_validate(value)
+    if issubclass(annotation, enum.Enum):
+        return annotation(value)
+    return value
+
+
+class CacheKeyBuilder:
+    """
+    Builds compact cache keys from all relevant handler arguments.
+
+    Path, query and body parameters are always used.
+    Dependencies are skipped unless they are listed in vary_on.
+    """
+
+    def __init__(
+        self,
+        func: Callable[..., Any],
+        vary_on: Sequence[str] = (),
+        vary_on_user: bool = False,
+    ):
+        self.signature = inspect.signature(func)
+        vary_on = list(vary_on)
+        if vary_on_user:
+            vary_on.append(CURRENT_USER_PARAM)
+        self.params = [
+            name
+            for name, param in self.signature.parameters.items()
+            if name != REDIS_POOL_PARAM
+            and (name in vary_on or not isinstance(param.default, params.Depends))
+        ]
+        # Calls which vary on dependencies can't be repeated outside of request.
+        self.restorable = not any(
+            isinstance(self.signature.parameters[name].default, params.Depends)
+            for name in self.params
+        )
+
+    def __call__(self, key_prefix: str, kwargs: Dict[str, Any]) -> str:
+        """
+        Build cache key.
+
+        Missing arguments are replaced with their defaults,
+        so omitted query parameters share key with the explicit ones.
+
+        :param key_prefix: key prefix.
+        :param kwargs: handler kwargs.
+        :return: cache key.
+        """
+        return self.build_key(key_prefix, self.key_params(kwargs))
+
+    def key_params(self, kwargs: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Get json compatible arguments which are part of the key.
+
+        :param kwargs: handler kwargs.
+        :return: key params.
+        """
+        bound = self.signature.bind_partial(**kwargs)
+        bound.apply_defaults()
+        return {name: _canonical(bound.arguments.get(name)) for name in self.params}
+
+    def build_key(self, key_prefix: str, key_params: Dict[str, Any]) -> str:
+        """
+        Build cache key from key params.
+
+        :param key_prefix: key prefix.
+        :param key_params: key params.
+        :return: cache key.
+        """
+        if not key_params:
+            return key_prefix
+        canonical = json.dumps(
+            key_params,
+            sort_keys=True,
+            separators=(",", ":"),
+            default=str,
+        )
+        digest = hashlib.blake2b(canonical.encode(), digest_size=12).hexdigest()
+        return f"{key_prefix}:{digest}"
+
+    def restore_kwargs(
+        self,
+        key_params: Dict[str, Any],
+        redis_pool: ConnectionPool,
+    ) -> Dict[str, Any]:
+        """
+        Build handler kwargs from key params outside of the request.
+
+        Dependencies are created by calling their classes without arguments,
+        which is enough for DAOs.
+
+        :param key_params: key params.
+        :param redis_pool: redis pool.
+        :return: handler kwargs.
+        :raises ValueError: if dependency can't be created.
+        """
+        parameters = self.signature.parameters
+        kwargs = {
+            name: _restore(parameters[name].annotation, key_param)
+            for name, key_param in key_params.items()
+        }
+        kwargs[REDIS_POOL_PARAM] = redis_pool
+        for name, param in parameters.items():
+            if name in kwargs or not isinstance(param.default, params.Depends):
+                continue
+            dependency = param.default.dependency or param.annotation
+            if not inspect.isclass(dependency):
+                raise ValueError(f"Can't create dependency {name}")
+            kwargs[name] = dependency()
+        return kwargs
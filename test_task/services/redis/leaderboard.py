@@ -0,0 +1,321 @@
+"""Character leaderboards kept in redis sorted sets."""
+import enum
+import functools
+import uuid
+from typing import Any, AsyncIterator, Dict, List, Optional, Tuple, Type
+
+from loguru import logger
+from redis.asyncio import ConnectionPool, Redis, RedisError
+from tortoise.models import Model
+from tortoise.signals import Signals
+
+from test_task.db.dao.row_cache import after_commit
+from test_task.db.listeners import Listeners, ModelListener
+from test_task.db.models.models import Character
+from test_task.settings import settings
+
+# Level score leaves this much room for experience, which breaks ties.
+EXPERIENCE_RANGE = 1 << 32
+# Ids, levels and experience of characters.
+ScoreRows = List[Tuple[int, int, int]]
+
+
+class Board(str, enum.Enum):  # noqa: WPS600
+    """Leaderboard name."""
+
+    LEVEL = "level"
+    EXPERIENCE = "experience"
+
+
+def character_scores(level: int, experience: int) -> Dict[Board, int]:
+    """
+    Get scores of the character on every board.
+
+    Experience is clamped into EXPERIENCE_RANGE on the level board,
+    so it never changes the level part of the score.
+
+    :param level: level of the character.
+    :param experience: experience of the character.
+    :return: scores by boards.
+    """
+    tie_breaker = min(max(experience, 0), EXPERIENCE_RANGE - 1)
+    return {
+        Board.LEVEL: level * EXPERIENCE_RANGE + tie_breaker,
+        Board.EXPERIENCE: experience,
+    }
+
+
+class Leaderboards:
+    """
+    Sorted sets of character ids by scores.
+
+    Top pages and ranks are read in O(log N) without scanning characters.
+    Characters removed by database cascades stay on boards until
+    readers drop them or boards are rebuilt.
+    """
+
+    def __init__(
+        self,
+        redis_pool: ConnectionPool,
+        prefix: str = settings.leaderboard_prefix,
+        batch: int = settings.leaderboard_batch,
+    ):
+        self.redis = Redis(connection_pool=redis_pool)
+        self.prefix = prefix
+        self.batch = batch
+
+    def key(self, board: Board) -> str:
+        """
+        Get key of the board.
+
+        :param board: board.
+        :return: key.
+        """
+        return f"{self.prefix}:{board.value}"
+
+    async def update(self, character_id: int, level: int, experience: int) -> None:
+        """
+        Put character scores on every board.
+
+        :param character_id: id of the character.
+        :param level: level of the character.
+        :param experience: experience of the character.
+        """
+        async with self.redis.pipeline(transaction=False) as pipe:
+            for board, score in character_scores(level, experience).items():
+                pipe.zadd(self.key(board), {str(character_id): score})
+            await pipe.execute()
+
+    async def remove(self, *character_ids: int) -> None:
+        """
+        Drop characters from every board.
+
+        :param character_ids: ids of the characters.
+        """
+        if not character_ids:
+            return
+        members = [str(character_id) for character_id in character_ids]
+        async with self.redis.pipeline(transaction=False) as pipe:
+            for board in Board:
+                pipe.zrem(self.key(board), *members)
+            await pipe.execute()
+
+    async def top(self, board: Board, limit: int, offset: int) -> List[int]:
+        """
+        Get page of the board.
+
+        :param board: board.
+        :param limit: page size.
+        :param offset: rank of the first character, starting from 0.
+        :return: ids of characters, the highest score first.
+        """
+        if limit <= 0:
+            return []
+        members: List[bytes] = await self.redis.zrevrange(  # type: ignore
+            self.key(board),
+            offset,
+            offset + limit - 1,
+        )
+        return [int(member) for member in members]
+
+    async def rank(self, board: Board, character_id: int) -> Optional[int]:
+        """
+        Get rank of the character.
+
+        :param board: board.
+        :param character_id: id of the character.
+        :return: rank starting from 0 or None if character isn't on the board.
+        """
+        return await self.redis.zrevrank(  # type: ignore
+            self.key(board),
+            str(character_id),
+        )
+
+    async def exists(self) -> bool:
+        """
+        Check whether boards are built.
+
+        :return: True if every board exists.
+        """
+        keys = [self.key(board) for board in Board]
+        return await self.redis.exists(*keys) == len(keys)
+
+    async def rebuild(self) -> int:
+        """
+        Replace boards with ones built from all characters.
+
+        Boards are built under temporary keys and swapped atomically,
+        changes made while they're built can be lost until the next update.
+
+        :return: quantity of characters.
+        """
+        suffix = uuid.uuid4().hex
+        added = 0
+        try:  # noqa: WPS501
+            async for rows in self._batches():
+                await self._fill(suffix, rows)
+                added += len(rows)
+            async with self.redis.pipeline(transaction=True) as pipe:
+                for board in Board:
+                    if added:
+                        pipe.rename(self._building_key(board, suffix), self.key(board))
+                    else:
+                        pipe.delete(self.key(board))
+                await pipe.execute()
+        finally:
+            await self.redis.delete(
+                *[self._building_key(target, suffix) for target in Board],
+            )
+        return added
+
+    def _building_key(self, board: Board, suffix: str) -> str:
+        """
+        Get temporary key of the board which is being built.
+
+        :param board: board.
+        :param suffix: suffix of the build.
+        :return: key.
+        """
+        key = self.key(board)
+        return f"{key}:building:{suffix}"
+
+    async def _fill(self, suffix: str, rows: ScoreRows) -> None:
+        """
+        Put batch of characters on boards which are being built.
+
+        :param suffix: suffix of the build.
+        :param rows: ids, levels and experience of characters.
+        """
+        scores: Dict[Board, Dict[str, int]] = {board: {} for board in Board}
+        for character_id, level, experience in rows:
+            for board, score in character_scores(level, experience).items():
+                scores[board][str(character_id)] = score
+        async with self.redis.pipeline(transaction=False) as pipe:
+            for target, board_scores in scores.items():
+                pipe.zadd(self._building_key(target, suffix), board_scores)
+            await pipe.execute()
+
+    async def _batches(self) -> AsyncIterator[ScoreRows]:
+        """
+        Read scores of all characters in batches.
+
+        :yield: ids, levels and experience of characters.
+        """
+        last_id = 0
+        while True:
+            rows = (
+                await Character.filter(id__gt=last_id)
+                .order_by("id")
+                .limit(self.batch)
+                .values_list("id", "level", "experience")
+            )
+            if not rows:
+                return
+            last_id = rows[-1][0]
+            yield rows
+
+
+class LeaderboardSync(ModelListener):
+    """
+    Keeps leaderboards in sync with characters.
+
+    Boards are updated by post_save and post_delete signals
+    of characters, listeners are registered when sync is enabled.
+    Changes made in row_cache.transaction reach boards after commit.
+    """
+
+    def listeners(self) -> Listeners:
+        """
+        Update boards on save and delete of characters.
+
+        :return: listeners.
+        """
+        return [
+            (Character, Signals.post_save, self._on_save),
+            (Character, Signals.post_delete, self._on_delete),
+        ]
+
+    async def build_if_missing(self) -> int:
+        """
+        Build boards unless other worker has built them.
+
+        :return: quantity of characters.
+        """
+        if self.redis_pool is None:
+            return 0
+        leaderboards = Leaderboards(self.redis_pool)
+        if await leaderboards.exists():
+            return 0
+        return await leaderboards.rebuild()
+
+    async def _on_save(
+        self,
+        sender: Type[Model],
+        instance: Character,
+        *args: Any,
+    ) -> None:
+        """
+        Put scores of the saved character on boards.
+
+        :param sender: model class.
+        :param instance: saved character.
+        :param args: other signal arguments.
+        """
+        update = functools.partial(
+            self._update,
+            instance.id,
+            instance.level,
+            instance.experience,
+        )
+        if not after_commit(update):
+            await update()
+
+    async def _on_delete(
+        self,
+        sender: Type[Model],
+        instance: Character,
+        *args: Any,
+    ) -> None:
+        """
+        Drop deleted character from boards.
+
+        :param sender: model class.
+        :param instance: deleted character.
+        :param args: other signal arguments.
+        """
+        remove = functools.partial(self._remove, instance.id)
+        if not after_commit(remove):
+            await remove()
+
+    async def _update(self, character_id: int, level: int, experience: int) -> None:
+        """
+        Put character scores on boards.
+
+        :param character_id: id of the character.
+        :param level: level of the character.
+        :param experience: experience of the character.
+        """
+        if self.redis_pool is None:
+            return
+        try:
+            await Leaderboards(self.redis_pool).update(character_id, level, experience)
+        except RedisError as err:
+            logger.error("Leaderboard update error")
+            logger.error(err)
+
+    async def _remove(self, character_id: int) -> None:
+        """
+        Drop character from boards.
+
+        :param character_id: id of the character.
+        """
+        if self.redis_pool is None:
+            return
+        try:
+            await Leaderboards(self.redis_pool).remove(character_id)
+        except RedisError as err:
+            logger.error("Leaderboard update error")
+            logger.error(err)
+
+
+leaderboard_sync = LeaderboardSync()
@@ -1,24 +1,88 @@
+import asyncio
+
 from fastapi import FastAPI
 from redis.asyncio import ConnectionPool
 
+from test_task.db.dao.row_cache import row_cache
+from test_task.services.auth.login_limiter import login_limiter
+from test_task.services.auth.taken_names import taken_names
+from test_task.services.auth.user_cache import user_cache
+from test_task.services.redis.cache import get_cache
+from test_task.services.redis.leaderboard import leaderboard_sync
+from test_task.services.redis.local_cache import listen_invalidations
+from test_task.services.redis.sharding import create_pool
+from test_task.services.redis.sweeper import run_sweeper
 from test_task.settings import settings
 
 
+def _enable_services(redis_pool: ConnectionPool) -> None:  # pragma: no cover
+    """
+    Enable services which are turned on in settings.
+
+    These are read-through cache of DAO lookups, cache of authenticated
+    users, the filter of taken registration names, leaderboard updates
+    and login throttling.
+
+    :param redis_pool: redis pool.
+    """
+    if settings.dao_cache_enabled:
+        row_cache.enable(redis_pool)
+    if settings.auth_user_cache_enabled:
+        user_cache.enable(redis_pool)
+    if settings.registration_filter_enabled:
+        taken_names.enable(redis_pool)
+    if settings.leaderboard_enabled:
+        leaderboard_sync.enable(redis_pool)
+    if settings.login_rate_limit_enabled:
+        login_limiter.enable(redis_pool)
+
+
 def init_redis(app: FastAPI) -> None:  # pragma: no cover
     """
-    Creates connection pool for redis.
+    Creates connection pool and cache client for redis.
+
+    Also starts listener which keeps local cache
+    of this worker in sync with other workers
+    and sweeper of stale keys if it's enabled.
+    Services which keep state in redis are enabled here too.
+    Listener waits for messages forever, so it has own pool
+    without read timeout.
 
     :param app: current fastapi application.
     """
-    app.state.redis_pool = ConnectionPool.from_url(
+    app.state.redis_pool = create_pool(str(settings.redis_url))
+    app.state.cache = get_cache(app.state.redis_pool)
+    _enable_services(app.state.redis_pool)
+    app.state.redis_pubsub_pool = ConnectionPool.from_url(
         str(settings.redis_url),
+        socket_connect_timeout=settings.redis_socket_connect_timeout,
+        socket_keepalive=settings.redis_socket_keepalive,
+        health_check_interval=settings.redis_health_check_interval,
+    )
+    app.state.cache_invalidation_listener = asyncio.create_task(
+        listen_invalidations(app.state.redis_pubsub_pool),
     )
+    app.state.cache_sweeper = None
+    if settings.cache_sweeper_interval is not None:
+        app.state.cache_sweeper = asyncio.create_task(
+            run_sweeper(app.state.redis_pool, settings.cache_sweeper_interval),
+        )
 
 
 async def shutdown_redis(app: FastAPI) -> None:  # pragma: no cover
     """
-    Closes redis connection pool.
+    Closes redis connection pools.
 
     :param app: current FastAPI app.
     """
+    row_cache.disable()
+    user_cache.disable()
+    taken_names.disable()
+    leaderboard_sync.disable()
+    login_limiter.disable()
+    app.state.cache_invalidation_listener.cancel()
+    if app.state.cache_sweeper is not None:
+        app.state.cache_sweeper.cancel()
+    await app.state.cache.disconnect_shards()
+    await app.state.redis_pubsub_pool.disconnect()
     await app.state.redis_pool.disconnect()
@@ -0,0 +1,136 @@
+"""In-process cache which lives in front of redis."""
+import asyncio
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Optional, Tuple
+
+from loguru import logger
+from redis.asyncio import ConnectionPool, Redis, RedisError
+
+from test_task.settings import settings
+
+# Message which asks every worker to drop the whole local cache.
+FLUSH_ALL = "*"
+
+
+class LocalCache:
+    """
+    Bounded LRU cache with per-entry TTL.
+
+    Every worker process has its own instance, so entries
+    are served without any network hop.
+    """
+
+    def __init__(
+        self,
+        maxsize: int = settings.cache_local_maxsize,
+        ttl: int = settings.cache_local_ttl,
+    ):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._entries: "OrderedDict[str, Tuple[float, Any]]" = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, key: str) -> Optional[Any]:
+        """
+        Get value from the local cache.
+
+        :param key: key.
+        :return: cached value or None if it's missing or expired.
+        """
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        expires_at, value = entry
+        if expires_at <= time.monotonic():
+            self._entries.pop(key, None)
+            return None
+        self._entries.move_to_end(key)
+        return value
+
+    def set(self, key: str, value: Any, ttl: Optional[float] = None) -> None:
+        """
+        Put value into the local cache evicting the least recently used entries.
+
+        :param key: key.
+        :param value: value.
+        :param ttl: time to live in seconds, defaults to cache ttl.
+        """
+        if ttl is None:
+            ttl = self.ttl
+        self._entries[key] = (time.monotonic() + ttl, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+
+    def delete(self, key: str) -> None:
+        """
+        Drop key from the local cache.
+
+        :param key: key.
+        """
+        self._entries.pop(key, None)
+
+    def clear(self) -> None:
+        """Drop all entries."""
+        self._entries.clear()
+
+    def invalidate(self, message: str) -> None:
+        """
+        Apply invalidation message received from other workers.
+
+        :param message: cache key or FLUSH_ALL.
+        """
+        if message == FLUSH_ALL:
+            self.clear()
+        else:
+            self.delete(message)
+
+
+local_cache = LocalCache()
+
+
+def _apply_message(cache: LocalCache, message: Dict[str, Any]) -> None:
+    """
+    Apply pub/sub message to the local cache.
+
+    :param cache: local cache.
+    :param message: message received from redis.
+    """
+    if message["type"] != "message":
+        return
+    data = message["data"]
+    if isinstance(data, bytes):
+        data = data.decode()
+    cache.invalidate(data)
+
+
+async def listen_invalidations(
+    redis_pool: ConnectionPool,
+    cache: LocalCache = local_cache,
+    retry_delay: float = 1,
+) -> None:
+    """
+    Drop local entries invalidated by any worker.
+
+    Local cache is cleared after every reconnect,
+    because messages sent meanwhile are lost.
+
+    :param redis_pool: redis connection pool.
+    :param cache: local cache to invalidate.
+    :param retry_delay: delay between reconnects.
+    """
+    while True:  # noqa: WPS457
+        try:
+            async with Redis(connection_pool=redis_pool) as redis:
+                async with redis.pubsub() as pubsub:
+                    await pubsub.subscribe(settings.cache_invalidation_channel)
+                    cache.clear()
+                    async for message in pubsub.listen():
+                        _apply_message(cache, message)
+        except RedisError as err:
+            logger.error("Cache invalidation listener error")
+            logger.error(err)
+            await asyncio.sleep(retry_delay)
@@ -0,0 +1,190 @@
+"""In-process cache metrics."""
+import bisect
+from collections import defaultdict
+from typing import Any, Dict, Sequence, Tuple
+
+from redis.asyncio import BlockingConnectionPool, ConnectionPool
+
+# Upper bounds of the latency histogram buckets in seconds.
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1)
+# Label of batched calls with keys of different prefixes.
+MIXED_LABEL = "mixed"
+
+
+def key_label(key: str) -> str:
+    """
+    Get metrics label of the cache key.
+
+    Label is the key prefix, the part before the first colon.
+
+    :param key: cache key without cache prefix.
+    :return: label.
+    """
+    return key.partition(":")[0]
+
+
+def keys_label(keys: Sequence[str]) -> str:
+    """
+    Get metrics label of the batched call.
+
+    :param keys: cache keys without cache prefix.
+    :return: common label or MIXED_LABEL.
+    """
+    labels = {key_label(key) for key in keys}
+    if len(labels) == 1:
+        return labels.pop()
+    return MIXED_LABEL
+
+
+class PrefixMetrics:
+    """Counters and latency histogram of one key prefix."""
+
+    def __init__(self) -> None:
+        self.hits = 0
+        self.misses = 0
+        self.errors = 0
+        self.stale = 0
+        self.latency_buckets = [0 for _ in range(len(LATENCY_BUCKETS) + 1)]
+        self.latency_sum: float = 0
+
+    def observe(self, seconds: float) -> None:
+        """
+        Add redis call duration to the histogram.
+
+        :param seconds: call duration.
+        """
+        self.latency_buckets[bisect.bisect_left(LATENCY_BUCKETS, seconds)] += 1
+        self.latency_sum += seconds
+
+    def snapshot(self) -> Dict[str, Any]:
+        """
+        Get current values.
+
+        Histogram buckets are cumulative, the last one is +Inf.
+
+        :return: metrics.
+        """
+        buckets = {}
+        total = 0
+        bounds = [str(bound) for bound in LATENCY_BUCKETS] + ["+Inf"]
+        for bound, count in zip(bounds, self.latency_buckets):
+            total += count
+            buckets[bound] = total
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "errors": self.errors,
+            "stale": self.stale,
+            "latency": {
+                "buckets": buckets,
+                "count": total,
+                "sum": self.latency_sum,
+            },
+        }
+
+
+class CacheMetrics:
+    """
+    Cache metrics labelled by key prefix.
+
+    Metrics are kept in memory of the worker process
+    and cost a few integer increments per call.
+    """
+
+    def __init__(self) -> None:
+        self._prefixes: Dict[str, PrefixMetrics] = defaultdict(PrefixMetrics)
+
+    def hit(self, label: str) -> None:
+        """
+        Count cache hit.
+
+        :param label: key prefix.
+        """
+        self._prefixes[label].hits += 1
+
+    def miss(self, label: str) -> None:
+        """
+        Count cache miss.
+
+        :param label: key prefix.
+        """
+        self._prefixes[label].misses += 1
+
+    def error(self, label: str) -> None:
+        """
+        Count failed redis call.
+
+        :param label: key prefix.
+        """
+        self._prefixes[label].errors += 1
+
+    def stale(self, label: str) -> None:
+        """
+        Count stale value served while it's refreshed.
+
+        :param label: key prefix.
+        """
+        self._prefixes[label].stale += 1
+
+    def observe(self, label: str, seconds: float) -> None:
+        """
+        Add redis call duration to the histogram.
+
+        :param label: key prefix.
+        :param seconds: call duration.
+        """
+        self._prefixes[label].observe(seconds)
+
+    def snapshot(self) -> Dict[str, Dict[str, Any]]:
+        """
+        Get current values of all prefixes.
+
+        :return: metrics by key prefixes.
+        """
+        return {
+            label: metrics.snapshot()
+            for label, metrics in sorted(self._prefixes.items())
+        }
+
+    def reset(self) -> None:
+        """Drop all values."""
+        self._prefixes.clear()
+
+
+cache_metrics = CacheMetrics()
+
+
+def _connection_counts(pool: ConnectionPool) -> Tuple[int, int]:
+    """
+    Count connections of the pool.
+
+    Blocking pool of redis 4 keeps created connections in a list
+    and idle ones in asyncio queue padded with None, newer pools
+    keep in use and idle connections apart.
+
+    :param pool: redis connection pool.
+    :return: in use and idle connections.
+    """
+    connections = getattr(pool, "_connections", None)
+    if isinstance(pool, BlockingConnectionPool) and connections is not None:
+        queued = pool.pool._queue  # type: ignore  # noqa: WPS437
+        idle = sum(connection is not None for connection in queued)
+        return len(connections) - idle, idle
+    in_use = pool._in_use_connections  # noqa: WPS437
+    return len(in_use), len(pool._available_connections)  # noqa: WPS437
+
+
+def pool_stats(pool: ConnectionPool) -> Dict[str, int]:
+    """
+    Get usage gauges of the redis connection pool.
+
+    :param pool: redis connection pool.
+    :return: max, created, in use and idle connections.
+    """
+    in_use, idle = _connection_counts(pool)
+    return {
+        "max_connections": pool.max_connections,
+        "created": in_use + idle,
+        "in_use": in_use,
+        "idle": idle,
+    }
@@ -0,0 +1,48 @@
+"""Version counters which invalidate cache namespaces."""
+import re
+from typing import Optional, Tuple
+
+# Namespace of the counter which invalidates every namespace.
+ALL_NAMESPACES = "*"
+# Keys of the cache itself, they aren't versioned.
+SERVICE_NAMESPACES = frozenset(("hot", "lock", "tag", "version"))
+
+Version = Tuple[int, int]
+
+_VERSION_RE = re.compile(r"v(\d+)\.(\d+)")
+
+
+def version_tag(version: Version) -> str:
+    """
+    Get part of the cache key which holds its version.
+
+    Keys of never invalidated namespaces aren't versioned,
+    so they match keys written before versioning.
+
+    :param version: global and namespace counters.
+    :return: version tag or empty string.
+    """
+    if version == (0, 0):
+        return ""
+    return "v{0}.{1}".format(*version)
+
+
+def parse_cache_key(prefix: str, cache_key: str) -> Optional[Tuple[Version, str]]:
+    """
+    Split cache key into version and key.
+
+    :param prefix: cache prefix.
+    :param cache_key: cache key.
+    :return: version and key or None if it isn't a cached value.
+    """
+    head, separator, key = cache_key.partition(":")
+    if head != prefix or not separator:
+        return None
+    first_part, separator, rest = key.partition(":")
+    if first_part in SERVICE_NAMESPACES:
+        return None
+    version_match = _VERSION_RE.fullmatch(first_part)
+    if version_match is None or not separator:
+        return (0, 0), key
+    global_version, namespace_version = version_match.groups()
+    return (int(global_version), int(namespace_version)), rest
@@ -0,0 +1,114 @@
+"""Invalidations which wait until redis is reachable."""
+from typing import Dict, Iterable, Set
+
+from loguru import logger
+
+from test_task.settings import settings
+
+
+class PendingInvalidations:
+    """
+    Invalidations which failed and are retried later.
+
+    Keys, tags and namespaces are deduplicated. Node keys are cache keys
+    which have to be deleted from the shard once it's healthy again,
+    they stay here until they're deleted. If more than maxsize
+    of them are pending, they're replaced with flush of the whole cache,
+    so memory stays bounded while redis is down for long.
+    """
+
+    def __init__(self, maxsize: int = settings.cache_invalidation_pending_maxsize):
+        self.maxsize = maxsize
+        self.keys: Set[str] = set()
+        self.tags: Set[str] = set()
+        self.namespaces: Set[str] = set()
+        self.node_keys: Dict[str, Set[str]] = {}
+        self.flush = False
+
+    def __len__(self) -> int:
+        names = len(self.tags) + len(self.namespaces)
+        node_keys = sum(len(cache_keys) for cache_keys in self.node_keys.values())
+        return len(self.keys) + names + node_keys + int(self.flush)
+
+    def add(
+        self,
+        keys: Iterable[str] = (),
+        tags: Iterable[str] = (),
+        namespaces: Iterable[str] = (),
+        flush: bool = False,
+    ) -> None:
+        """
+        Remember failed invalidations.
+
+        :param keys: keys to delete.
+        :param tags: tags to invalidate.
+        :param namespaces: namespaces to invalidate.
+        :param flush: whether the whole cache has to be flushed.
+        """
+        if self.flush:
+            return
+        if flush:
+            self.clear()
+            self.flush = True
+            return
+        self.keys.update(keys)
+        self.tags.update(tags)
+        self.namespaces.update(namespaces)
+        self._check_size()
+
+    def add_node_keys(self, node: str, cache_keys: Iterable[str]) -> None:
+        """
+        Remember keys which weren't deleted from the shard.
+
+        :param node: shard.
+        :param cache_keys: cache keys.
+        """
+        if self.flush:
+            return
+        self.node_keys.setdefault(node, set()).update(cache_keys)
+        self._check_size()
+
+    def discard_node_keys(self, node: str, cache_keys: Iterable[str]) -> None:
+        """
+        Forget keys which were deleted from the shard.
+
+        :param node: shard.
+        :param cache_keys: cache keys.
+        """
+        remaining = self.node_keys.get(node, set()).difference(cache_keys)
+        if remaining:
+            self.node_keys[node] = remaining
+        else:
+            self.node_keys.pop(node, None)
+
+    def take(self) -> "PendingInvalidations":
+        """
+        Move pending invalidations out, so new ones are collected apart.
+
+        Node keys are copied, they're kept until they're deleted.
+
+        :return: pending invalidations.
+        """
+        taken = PendingInvalidations(self.maxsize)
+        taken.add(self.keys, self.tags, self.namespaces, self.flush)
+        node_keys = self.node_keys
+        taken.node_keys = {
+            node: set(cache_keys) for node, cache_keys in node_keys.items()
+        }
+        self.clear()
+        self.node_keys = node_keys
+        return taken
+
+    def clear(self) -> None:
+        """Forget all pending invalidations."""
+        self.keys = set()
+        self.tags = set()
+        self.namespaces = set()
+        self.node_keys = {}
+        self.flush = False
+
+    def _check_size(self) -> None:
+        """Replace pending invalidations with flush if there are too many."""
+        if len(self) > self.maxsize:
+            logger.warning("Too many pending cache invalidations, cache is flushed.")
+            self.add(flush=True)
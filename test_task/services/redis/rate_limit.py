@@ -0,0 +1,67 @@
+"""Sliding window rate limiter kept in redis sorted sets."""
+import time
+import uuid
+from typing import Dict
+
+from redis.asyncio import ConnectionPool, Redis
+
+# Checks every key and records the attempt only if none of them is full.
+# Keys are sorted sets of attempt timestamps in milliseconds, script
+# returns milliseconds until the oldest attempt of the full key leaves
+# the window or 0 if the attempt is allowed.
+SLIDING_WINDOW_SCRIPT = """
+local now = tonumber(ARGV[1])
+local window = tonumber(ARGV[2])
+local retry_after = 0
+for index, key in ipairs(KEYS) do
+    redis.call("ZREMRANGEBYSCORE", key, "-inf", now - window)
+    if redis.call("ZCARD", key) >= tonumber(ARGV[index + 3]) then
+        local oldest = redis.call("ZRANGE", key, 0, 0, "WITHSCORES")
+        retry_after = math.max(retry_after, tonumber(oldest[2]) + window - now)
+    end
+end
+if retry_after > 0 then
+    return retry_after
+end
+for _, key in ipairs(KEYS) do
+    redis.call("ZADD", key, now, ARGV[3])
+    redis.call("PEXPIRE", key, window)
+end
+return 0
+"""
+
+
+class SlidingWindowLimiter:
+    """
+    Limits attempts per key within a sliding window.
+
+    Every key keeps timestamps of attempts made within the window,
+    so limits don't reset at window boundaries. Keys are checked
+    and updated by one script, which redis runs atomically,
+    rejected attempts aren't counted.
+    """
+
+    def __init__(self, redis_pool: ConnectionPool, window: int):
+        self.redis = Redis(connection_pool=redis_pool)
+        self.window = window
+        self._script = self.redis.register_script(SLIDING_WINDOW_SCRIPT)
+
+    async def hit(self, limits: Dict[str, int]) -> float:
+        """
+        Count attempt against every key unless any of them is full.
+
+        Keys with limits below 1 aren't limited.
+
+        :param limits: limits of attempts within the window by keys.
+        :return: seconds until the attempt is allowed, 0 if it's counted.
+        """
+        limited = {key: limit for key, limit in limits.items() if limit > 0}
+        if not limited:
+            return 0
+        now = int(time.time() * 1000)
+        member = uuid.uuid4().hex
+        retry_after = await self._script(
+            keys=list(limited),
+            args=[now, self.window * 1000, member, *limited.values()],
+        )
+        return int(retry_after) / 1000
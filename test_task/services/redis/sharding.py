@@ -0,0 +1,87 @@
+"""Consistent hashing of cache keys across redis nodes."""
+import bisect
+import hashlib
+from typing import Collection, Dict, Optional, Sequence
+
+from redis.asyncio import BlockingConnectionPool, ConnectionPool
+
+from test_task.settings import settings
+
+# Every md5 digest gives this many points of the ring.
+_POINTS_PER_HASH = 4
+_POINT_SIZE = 4
+
+
+def _hash_point(key: str) -> int:
+    """
+    Get position of the key on the ring.
+
+    :param key: key.
+    :return: point.
+    """
+    digest = hashlib.md5(key.encode(), usedforsecurity=False).digest()
+    return int.from_bytes(digest[:_POINT_SIZE], "little")
+
+
+class HashRing:
+    """
+    Ketama-style consistent hash ring.
+
+    Every node owns replicas points of the ring and key belongs
+    to the first node clockwise from its hash. Node which is skipped
+    hands its keys to the following nodes, the rest keep their keys.
+    """
+
+    def __init__(
+        self,
+        nodes: Sequence[str],
+        replicas: int = settings.cache_shard_replicas,
+    ):
+        self.nodes = list(nodes)
+        self._owners: Dict[int, str] = {}
+        for node in self.nodes:
+            for replica in range(replicas // _POINTS_PER_HASH):
+                digest = hashlib.md5(
+                    f"{node}-{replica}".encode(),
+                    usedforsecurity=False,
+                ).digest()
+                for offset in range(0, _POINTS_PER_HASH * _POINT_SIZE, _POINT_SIZE):
+                    point_bytes = digest[offset : offset + _POINT_SIZE]
+                    point = int.from_bytes(point_bytes, "little")
+                    self._owners.setdefault(point, node)
+        self._points = sorted(self._owners)
+
+    def get_node(self, key: str, skip: Collection[str] = ()) -> Optional[str]:
+        """
+        Get node which holds the key.
+
+        :param key: key.
+        :param skip: unavailable nodes.
+        :return: node or None if all nodes are skipped.
+        """
+        if not self._points:
+            return None
+        start = bisect.bisect(self._points, _hash_point(key))
+        for index in range(start, start + len(self._points)):
+            node = self._owners[self._points[index % len(self._points)]]
+            if node not in skip:
+                return node
+        return None
+
+
+def create_pool(url: str) -> ConnectionPool:
+    """
+    Create connection pool of the cache node.
+
+    :param url: redis url.
+    :return: connection pool.
+    """
+    return BlockingConnectionPool.from_url(
+        url,
+        max_connections=settings.redis_max_connections,
+        timeout=settings.redis_pool_timeout,
+        socket_timeout=settings.redis_socket_timeout,
+        socket_connect_timeout=settings.redis_socket_connect_timeout,
+        socket_keepalive=settings.redis_socket_keepalive,
+        health_check_interval=settings.redis_health_check_interval,
+    )
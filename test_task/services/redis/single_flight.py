@@ -0,0 +1,39 @@
+"""Request coalescing for cache misses."""
+import asyncio
+from typing import Any, Awaitable, Callable, Dict
+
+
+class SingleFlight:
+    """
+    Runs only one computation per key at a time.
+
+    Concurrent callers with the same key wait for
+    the running computation and share its result.
+    """
+
+    def __init__(self) -> None:
+        self._calls: Dict[str, "asyncio.Task[Any]"] = {}
+
+    def __len__(self) -> int:
+        return len(self._calls)
+
+    async def do(self, key: str, func: Callable[[], Awaitable[Any]]) -> Any:
+        """
+        Run func or join the already running call with the same key.
+
+        Call is shielded, so cancelled caller doesn't break
+        the computation for the others.
+
+        :param key: key.
+        :param func: coroutine function to run.
+        :return: func result.
+        """
+        call = self._calls.get(key)
+        if call is None:
+            call = asyncio.ensure_future(func())
+            self._calls[key] = call
+            call.add_done_callback(lambda _: self._calls.pop(key, None))
+        return await asyncio.shield(call)
+
+
+single_flight = SingleFlight()
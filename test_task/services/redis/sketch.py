@@ -0,0 +1,177 @@
+"""Approximate access frequency of cache keys."""
+import heapq
+import operator
+from typing import Dict, List, Tuple
+
+from test_task.settings import settings
+
+_HASH_MASK = (1 << 64) - 1
+_HALF_HASH_BITS = 32
+
+
+class CountMinSketch:
+    """
+    Count-min sketch of key frequencies.
+
+    Memory is width * depth counters whatever the number of keys.
+    Estimate is never lower than the real count, collisions
+    can only make it higher.
+    """
+
+    def __init__(self, width: int, depth: int):
+        self.width = width
+        self.depth = depth
+        self._counters = [0 for _ in range(width * depth)]
+
+    def add(self, key: str) -> int:
+        """
+        Count key access.
+
+        :param key: key.
+        :return: estimated count of the key.
+        """
+        indexes = self._indexes(key)
+        for counter_index in indexes:
+            self._counters[counter_index] += 1
+        return min(self._counters[index] for index in indexes)
+
+    def estimate(self, key: str) -> int:
+        """
+        Get estimated count of the key.
+
+        :param key: key.
+        :return: estimated count.
+        """
+        return min(self._counters[index] for index in self._indexes(key))
+
+    def halve(self) -> None:
+        """Halve all counters, so old accesses weigh less."""
+        self._counters = [counter >> 1 for counter in self._counters]
+
+    def _indexes(self, key: str) -> List[int]:
+        """
+        Get counter of the key in every row.
+
+        Row hashes are derived from one hash of the key.
+
+        :param key: key.
+        :return: counter indexes.
+        """
+        key_hash = hash(key) & _HASH_MASK
+        step = (key_hash >> _HALF_HASH_BITS) | 1
+        indexes = []
+        for row in range(self.depth):
+            column = (key_hash + row * step) % self.width
+            indexes.append(row * self.width + column)
+        return indexes
+
+
+class HotKeySketch:
+    """
+    Top-K of the most accessed keys over a count-min sketch.
+
+    Candidates are kept in a min heap, so the coldest one
+    is replaced when other key gets more accesses. Counters
+    are halved every decay_interval accesses to follow recent traffic.
+    Keys are counted in memory of the worker process.
+    """
+
+    def __init__(
+        self,
+        size: int = settings.cache_hot_keys_top,
+        width: int = settings.cache_sketch_width,
+        depth: int = settings.cache_sketch_depth,
+        decay_interval: int = settings.cache_sketch_decay_interval,
+    ):
+        self.size = size
+        self.width = width
+        self.depth = depth
+        self.decay_interval = decay_interval
+        self.reset()
+
+    def add(self, key: str) -> None:
+        """
+        Count key access.
+
+        :param key: key.
+        """
+        count = self._sketch.add(key)
+        if self._make_room(key, count):
+            self._top[key] = count
+            heapq.heappush(self._heap, (count, key))
+            if len(self._heap) > self.size * 2:
+                self._rebuild_heap()
+        self._accesses += 1
+        if self._accesses >= self.decay_interval:
+            self._decay()
+
+    def is_hot(self, key: str) -> bool:
+        """
+        Check whether key is in the top.
+
+        :param key: key.
+        :return: True if key is one of the most accessed.
+        """
+        return key in self._top
+
+    def top(self) -> List[Tuple[str, int]]:
+        """
+        Get the most accessed keys.
+
+        :return: keys with estimated counts, the most accessed first.
+        """
+        return sorted(self._top.items(), key=operator.itemgetter(1), reverse=True)
+
+    def reset(self) -> None:
+        """Drop all counters."""
+        self._sketch = CountMinSketch(self.width, self.depth)
+        self._top: Dict[str, int] = {}
+        self._heap: List[Tuple[int, str]] = []
+        self._accesses = 0
+
+    def _make_room(self, key: str, count: int) -> bool:
+        """
+        Make room for the key in the top if it's hotter than the coldest one.
+
+        :param key: key.
+        :param count: estimated count of the key.
+        :return: True if key belongs to the top.
+        """
+        if key in self._top or len(self._top) < self.size:
+            return True
+        if count <= self._min_count():
+            return False
+        self._top.pop(heapq.heappop(self._heap)[1])
+        return True
+
+    def _min_count(self) -> int:
+        """
+        Get count of the coldest key in the top.
+
+        Heap entries of keys which were counted again are outdated,
+        they're dropped until the top entry is current.
+
+        :return: count.
+        """
+        while self._heap:
+            count, key = self._heap[0]
+            if self._top.get(key) == count:
+                return count
+            heapq.heappop(self._heap)
+        return 0
+
+    def _rebuild_heap(self) -> None:
+        """Drop outdated heap entries."""
+        self._heap = [(count, key) for key, count in self._top.items()]
+        heapq.heapify(self._heap)
+
+    def _decay(self) -> None:
+        """Halve counters of the sketch and the top."""
+        self._sketch.halve()
+        for key in self._top:
+            self._top[key] >>= 1
+        self._rebuild_heap()
+        self._accesses = 0
+
+
+key_sketch = HotKeySketch()
@@ -0,0 +1,129 @@
+"""Removal of keys which became unreachable after version bumps."""
+import asyncio
+from typing import Any, Dict, List
+
+from loguru import logger
+from redis.asyncio import ConnectionPool, Redis, RedisError
+
+from test_task.services.redis.cache import get_cache
+from test_task.services.redis.metrics import key_label
+from test_task.services.redis.namespaces import ALL_NAMESPACES, parse_cache_key
+from test_task.settings import settings
+
+
+async def _get_versions(redis: Redis, prefix: str) -> Dict[str, int]:
+    """
+    Get all version counters.
+
+    :param redis: redis client.
+    :param prefix: cache prefix.
+    :return: counters by namespaces.
+    """
+    version_prefix = f"{prefix}:version:"
+    version_keys = [
+        version_key.decode() if isinstance(version_key, bytes) else version_key
+        async for version_key in redis.scan_iter(match=f"{version_prefix}*")
+    ]
+    if not version_keys:
+        return {}
+    counters = await redis.mget(version_keys)
+    return {
+        version_key[len(version_prefix) :]: int(counter or 0)  # noqa: E203
+        for version_key, counter in zip(version_keys, counters)
+    }
+
+
+def _is_stale(prefix: str, cache_key: Any, versions: Dict[str, int]) -> bool:
+    """
+    Check whether cached value belongs to the old version.
+
+    :param prefix: cache prefix.
+    :param cache_key: scanned key.
+    :param versions: counters by namespaces.
+    :return: True if key is unreachable.
+    """
+    if isinstance(cache_key, bytes):
+        cache_key = cache_key.decode()
+    parsed = parse_cache_key(prefix, cache_key)
+    if parsed is None:
+        return False
+    key_version, key = parsed
+    namespace_version = versions.get(key_label(key), 0)
+    return key_version < (versions.get(ALL_NAMESPACES, 0), namespace_version)
+
+
+async def _sweep_node(
+    redis: Redis,
+    prefix: str,
+    versions: Dict[str, int],
+    batch: int,
+) -> int:
+    """
+    Unlink stale keys of one redis node.
+
+    :param redis: redis client of the node.
+    :param prefix: cache prefix.
+    :param versions: counters by namespaces.
+    :param batch: scan and unlink batch size.
+    :return: quantity of removed keys.
+    """
+    removed = 0
+    stale_keys: List[Any] = []
+    async for cache_key in redis.scan_iter(match=f"{prefix}:*", count=batch):
+        if _is_stale(prefix, cache_key, versions):
+            stale_keys.append(cache_key)
+        if len(stale_keys) >= batch:
+            removed += await redis.unlink(*stale_keys)
+            stale_keys.clear()
+    if stale_keys:
+        removed += await redis.unlink(*stale_keys)
+    return removed
+
+
+async def sweep_stale_keys(
+    redis_pool: ConnectionPool,
+    prefix: str = settings.cache_prefix,
+    batch: int = settings.cache_sweeper_batch,
+) -> int:
+    """
+    Unlink cached values of old namespace versions.
+
+    Keys are scanned in batches, so redis isn't blocked.
+    Keys written by newer versions than the loaded ones are kept.
+    Versions are kept in the redis, values are swept
+    from it and from every cache shard.
+
+    :param redis_pool: redis pool.
+    :param prefix: cache prefix.
+    :param batch: scan and unlink batch size.
+    :return: quantity of removed keys.
+    """
+    shards = get_cache(redis_pool).shards
+    async with Redis(connection_pool=redis_pool) as redis:
+        versions = await _get_versions(redis, prefix)
+        removed = await _sweep_node(redis, prefix, versions, batch)
+    shards_removed = [
+        await _sweep_node(shard, prefix, versions, batch) for shard in shards.values()
+    ]
+    return removed + sum(shards_removed)
+
+
+async def run_sweeper(
+    redis_pool: ConnectionPool,
+    interval: float,
+) -> None:  # pragma: no cover
+    """
+    Sweep stale keys periodically.
+
+    :param redis_pool: redis pool.
+    :param interval: delay between sweeps in seconds.
+    """
+    while True:  # noqa: WPS457
+        await asyncio.sleep(interval)
+        try:
+            removed = await sweep_stale_keys(redis_pool)
+        except RedisError as err:
+            logger.error("Cache sweeper error")
+            logger.error(err)
+            continue
+        logger.info(f"Cache sweeper removed {removed} stale keys.")
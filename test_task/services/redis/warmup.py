@@ -0,0 +1,67 @@
+"""Cache warming from the list of hot keys."""
+import asyncio
+
+from loguru import logger
+from redis.asyncio import ConnectionPool, RedisError
+
+from test_task.services.redis.cache import cached_handlers
+from test_task.services.redis.hot_keys import HotKeys, decode_member
+from test_task.settings import settings
+
+
+async def _warm_member(
+    redis_pool: ConnectionPool,
+    member: str,
+    semaphore: asyncio.Semaphore,
+) -> bool:
+    """
+    Fill cached call from the hot list.
+
+    :param redis_pool: redis pool.
+    :param member: hot list member.
+    :param semaphore: semaphore which bounds concurrency.
+    :return: True if handler was called.
+    """
+    key_prefix, key_params = decode_member(member)
+    handler = cached_handlers.get(key_prefix)
+    if handler is None:
+        logger.warning(f"Unknown cached handler {key_prefix}")
+        return False
+    async with semaphore:
+        return await handler.warm(redis_pool, key_params)
+
+
+async def warm_cache(
+    redis_pool: ConnectionPool,
+    limit: int = settings.cache_warmup_keys,
+    concurrency: int = settings.cache_warmup_concurrency,
+) -> int:
+    """
+    Fill the most requested keys which are missing in cache.
+
+    Handlers are registered by cacheable, so routers
+    must be imported before warming.
+
+    :param redis_pool: redis pool.
+    :param limit: max quantity of keys.
+    :param concurrency: max quantity of handlers running at once.
+    :return: quantity of filled keys.
+    """
+    try:
+        members = await HotKeys(redis_pool).top(limit)
+    except RedisError as err:
+        logger.error("Cache warmup error")
+        logger.error(err)
+        return 0
+    semaphore = asyncio.Semaphore(concurrency)
+    results = await asyncio.gather(
+        *[_warm_member(redis_pool, member, semaphore) for member in members],
+        return_exceptions=True,
+    )
+    for error in results:
+        if isinstance(error, Exception):
+            logger.error("Cache warmup error")
+            logger.error(error)
+    filled = sum(result is True for result in results)
+    logger.info(f"Warmed {filled} hot cache keys.")
+    return filled
@@ -1,7 +1,7 @@
 import enum
 from pathlib import Path
 from tempfile import gettempdir
-from typing import Optional
+from typing import List, Optional
 
 from pydantic_settings import BaseSettings, SettingsConfigDict
 from yarl import URL
@@ -53,6 +53,13 @@ class Settings(BaseSettings):
     redis_user: Optional[str] = None
     redis_pass: Optional[str] = None
     redis_base: Optional[int] = None
+    # Pool waits up to redis_pool_timeout for a free connection
+    redis_max_connections: int = 50
+    redis_pool_timeout: float = 1
+    redis_socket_timeout: float = 1
+    redis_socket_connect_timeout: float = 1
+    redis_socket_keepalive: bool = True
+    redis_health_check_interval: int = 30
 
     # Variables for RabbitMQ
     rabbit_host: str = "test_task-rmq"
@@ -72,10 +79,102 @@ class Settings(BaseSettings):
     algorithm: str = "HS256"
     jwt_secret_key: str = "JWT_SECRET_KEY"
     jwt_refresh_secret_key: str = "JWT_REFRESH_SECRET_KEY"
+    # Users resolved from access tokens are cached for this long
+    auth_user_cache_enabled: bool = True
+    auth_user_cache_ttl: int = 60
+    # Validated access tokens are kept in memory until they expire
+    auth_token_cache_maxsize: int = 10000
+    # Password hashing runs in this many threads,
+    # calls beyond the queue size are rejected with 503
+    password_hash_workers: int = 4
+    password_hash_queue_size: int = 64
+    # Scheme and cost of new password hashes, hashes made with other
+    # rounds or deprecated schemes are replaced on login
+    password_hash_scheme: str = "bcrypt"
+    password_hash_rounds: int = 12
+    password_hash_deprecated_schemes: List[str] = []
+    # Login attempts within the sliding window by client address and email,
+    # limits below 1 turn the check off
+    login_rate_limit_enabled: bool = True
+    login_rate_limit_prefix: str = "rate_limit:login"
+    login_rate_limit_window: int = 60
+    login_rate_limit_per_ip: int = 30
+    login_rate_limit_per_email: int = 5
 
     # Cache
     cache_prefix: str = "cache"
     cache_ttl: int = 3600
+    # In-process (L1) cache in front of redis
+    cache_local_maxsize: int = 1024
+    cache_local_ttl: int = 30
+    # Pub/sub channel used to drop L1 entries in every worker
+    cache_invalidation_channel: str = "cache:invalidate"
+    # Lock which lets only one worker fill an expired key
+    cache_lock_timeout: float = 5
+    cache_lock_poll_interval: float = 0.05
+    # How long expired values are served while being refreshed
+    cache_stale_ttl: int = 300
+    # How long missing entities are remembered
+    cache_negative_ttl: int = 30
+    # Values larger than min size are compressed,
+    # codec is lz4 when it's installed and zlib otherwise
+    cache_compression: Optional[str] = None
+    cache_compression_min_size: int = 1024
+    cache_compression_level: int = 1
+    # Share of requests counted in the rolling list of hot keys
+    cache_hot_keys_sample_rate: float = 0.1
+    cache_hot_keys_window: int = 3600
+    # In-process top of the most accessed keys,
+    # they're kept longer in local cache
+    cache_hot_keys_top: int = 20
+    cache_hot_keys_local_ttl: int = 120
+    cache_sketch_width: int = 2048
+    cache_sketch_depth: int = 4
+    cache_sketch_decay_interval: int = 100000
+    # Bounds of TTLs which follow reads and changes of the keys
+    cache_adaptive_ttl_min: int = 30
+    cache_adaptive_ttl_max: int = 86400
+    cache_adaptive_ttl_min_reads: int = 1
+    cache_adaptive_ttl_maxsize: int = 10000
+    # Hot keys filled on startup before the worker is ready
+    cache_warmup_on_startup: bool = True
+    cache_warmup_keys: int = 100
+    cache_warmup_concurrency: int = 10
+    cache_warmup_timeout: float = 30
+    # Circuit breaker which stops calling redis while it's unhealthy
+    cache_breaker_failure_threshold: int = 5
+    cache_breaker_recovery_timeout: float = 10
+    # Failed invalidations are retried in background until redis takes them,
+    # past the size limit they're replaced with flush of the whole cache
+    cache_invalidation_retry_interval: float = 1
+    cache_invalidation_pending_maxsize: int = 10000
+    # Namespace versions are kept in local cache and dropped on bump
+    cache_version_local_ttl: int = 60
+    # Sweeper removes keys of old versions, it's off if interval is None
+    cache_sweeper_interval: Optional[int] = None
+    cache_sweeper_batch: int = 500
+    # Cache values are spread across these nodes by consistent hashing,
+    # versions, tags, locks and invalidations stay on redis_url
+    cache_shard_urls: List[str] = []
+    cache_shard_replicas: int = 160
+    # Read-through cache of DAO lookups by id
+    dao_cache_enabled: bool = False
+    dao_cache_ttl: int = 300
+    # Changed rows can't be cached again for this long,
+    # so fills which read them before the change are dropped
+    dao_cache_fence_ttl: int = 5
+    # Bloom filter of registered emails and usernames,
+    # it's built on startup unless other worker has built it
+    registration_filter_enabled: bool = True
+    registration_filter_key: str = "registration:taken"
+    registration_filter_size: int = 1 << 24
+    registration_filter_hashes: int = 7
+    registration_filter_batch: int = 1000
+    # Character leaderboards in sorted sets,
+    # they're built on startup unless other worker has built them
+    leaderboard_enabled: bool = True
+    leaderboard_prefix: str = "leaderboard"
+    leaderboard_batch: int = 1000
 
     @property
     def db_url(self) -> URL:
@@ -17,6 +17,10 @@ from test_task.db.models.models import (
 )
 from test_task.services.auth.auth import create_access_token
 from test_task.services.auth.auth import create_refresh_token as cft
+from test_task.services.auth.hashing import build_password_context
+
+# Cheap bcrypt hash, so fixtures don't spend time on the real cost.
+TEST_PASSWORD_HASH = build_password_context(rounds=4).hash("testpassword")
 
 
 @pytest.fixture()
@@ -73,7 +77,7 @@ async def create_user(
     user = await User.create(
         username="test_user",
         email="test_user@example.com",
-        password_hash="hashed_password",
+        password_hash=TEST_PASSWORD_HASH,
         role=create_role,
     )
     yield user
@@ -1,10 +1,21 @@
+from typing import Any, Callable
+
 import pytest
 from fastapi import FastAPI
 from httpx import AsyncClient
 from pytest_mock import MockerFixture
+from redis.asyncio import ConnectionPool, Redis
 from starlette import status
 
 from test_task.db.models.models import Role, User
+from test_task.services.auth.auth import create_access_token
+from test_task.services.auth.hashing import (
+    build_password_context,
+    password_needs_update,
+)
+from test_task.services.auth.login_limiter import LoginLimiter, login_limiter
+from test_task.services.auth.taken_names import TakenNames, taken_names
+from test_task.services.auth.user_cache import UserCache, user_cache
 
 
 @pytest.mark.anyio
@@ -178,3 +189,197 @@ async def test_get_me_forbidden(
     url = fastapi_app.url_path_for("get_me")
     response = await client.get(url)
     assert response.status_code == status.HTTP_401_UNAUTHORIZED
+
+
+@pytest.fixture
+def enabled_taken_names(enable_service: Callable[[Any], Any]) -> TakenNames:
+    """
+    Enable filter of taken registration names.
+
+    :param enable_service: enables redis services.
+    :return: filter of taken names.
+    """
+    return enable_service(taken_names)
+
+
+@pytest.mark.anyio
+async def test_taken_names_filter(
+    fake_redis_pool: ConnectionPool,
+    enabled_taken_names: TakenNames,
+    create_user: User,
+) -> None:
+    """Tests that filter reports registered names and is updated on save."""
+    assert await enabled_taken_names.might_be_taken(create_user.email, "new")
+    assert not await enabled_taken_names.might_be_taken("new@example.com", "new")
+    async with Redis(connection_pool=fake_redis_pool) as redis:
+        await redis.delete(enabled_taken_names.key)
+    assert await enabled_taken_names.might_be_taken("new@example.com", "new")
+
+    assert await enabled_taken_names.rebuild() == 1
+    assert await enabled_taken_names.might_be_taken("new@example.com", "test_user")
+    assert not await enabled_taken_names.might_be_taken("new@example.com", "new")
+    create_user.username = "new"
+    await create_user.save()
+    assert await enabled_taken_names.might_be_taken("new@example.com", "new")
+
+
+@pytest.mark.anyio
+async def test_register_free_names_skips_lookup(
+    fastapi_app: FastAPI,
+    client: AsyncClient,
+    create_role: Role,
+    enabled_taken_names: TakenNames,
+    mocker: MockerFixture,
+) -> None:
+    """Tests that names which are definitely free aren't looked up."""
+    await enabled_taken_names.rebuild()
+    filter_spy = mocker.spy(User, "filter")
+    user_data = {
+        "email": "free@example.com",
+        "password": "testpassword",
+        "username": "free",
+    }
+
+    response = await client.post(
+        fastapi_app.url_path_for("create_user"),
+        json=user_data,
+    )
+
+    assert response.status_code == status.HTTP_200_OK
+    assert filter_spy.call_count == 0
+
+
+@pytest.mark.anyio
+async def test_register_taken_username(
+    fastapi_app: FastAPI,
+    client: AsyncClient,
+    create_user: User,
+    create_role: Role,
+) -> None:
+    """Tests that unique constraint rejects taken names."""
+    user_data = {
+        "email": "other@example.com",
+        "password": "testpassword",
+        "username": create_user.username,
+    }
+
+    response = await client.post(
+        fastapi_app.url_path_for("create_user"),
+        json=user_data,
+    )
+
+    assert response.status_code == status.HTTP_400_BAD_REQUEST
+    assert response.json()["detail"] == "User with this email or username already exist"
+
+
+@pytest.fixture
+def enabled_user_cache(enable_service: Callable[[Any], Any]) -> UserCache:
+    """
+    Enable cache of authenticated users.
+
+    :param enable_service: enables redis services.
+    :return: cache of users.
+    """
+    return enable_service(user_cache)
+
+
+@pytest.mark.anyio
+async def test_current_user_is_cached(
+    client: AsyncClient,
+    fastapi_app: FastAPI,
+    enabled_user_cache: UserCache,
+    create_user: User,
+    mocker: MockerFixture,
+) -> None:
+    """Tests that authenticated user is cached until it's changed."""
+    token = create_access_token(
+        {
+            "email": create_user.email,
+            "username": create_user.username,
+            "user_id": create_user.id,
+        },
+    )
+    url = fastapi_app.url_path_for("get_me")
+    headers = {"Authorization": f"Bearer {token}"}
+    await client.get(url, headers=headers)
+    filter_spy = mocker.spy(User, "filter")
+
+    response = await client.get(url, headers=headers)
+    assert response.status_code == status.HTTP_200_OK
+    assert response.json()["username"] == create_user.username
+    assert filter_spy.call_count == 0
+
+    create_user.username = "renamed"
+    await create_user.save()
+    response = await client.get(url, headers=headers)
+    assert response.status_code == status.HTTP_403_FORBIDDEN
+    assert filter_spy.call_count == 1
+
+
+@pytest.fixture
+def enabled_login_limiter(enable_service: Callable[[Any], Any]) -> LoginLimiter:
+    """
+    Enable login throttling, fake redis runs scripts with lupa.
+
+    :param enable_service: enables redis services.
+    :return: login limiter.
+    """
+    return enable_service(login_limiter)
+
+
+@pytest.mark.anyio
+async def test_login_is_throttled(
+    fastapi_app: FastAPI,
+    client: AsyncClient,
+    enabled_login_limiter: LoginLimiter,
+    mocker: MockerFixture,
+) -> None:
+    """Tests that attempts beyond the limit are rejected before lookups."""
+    mocker.patch.object(enabled_login_limiter, "per_email", 2)
+    url = fastapi_app.url_path_for("login")
+    login_data = {
+        "email": "throttled@example.com",
+        "password": "wrongpassword",
+        "username": "throttled",
+    }
+    for _ in range(2):
+        response = await client.post(url, json=login_data)
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+
+    filter_spy = mocker.spy(User, "filter")
+    response = await client.post(url, json=login_data)
+    assert response.status_code == status.HTTP_429_TOO_MANY_REQUESTS
+    retry_after = int(response.headers["Retry-After"])
+    assert 0 < retry_after <= enabled_login_limiter.window
+    filter_spy.assert_not_called()
+
+    login_data["email"] = "other@example.com"
+    response = await client.post(url, json=login_data)
+    assert response.status_code == status.HTTP_400_BAD_REQUEST
+
+
+@pytest.mark.anyio
+async def test_login_rehashes_outdated_password(
+    fastapi_app: FastAPI,
+    client: AsyncClient,
+    create_user: User,
+) -> None:
+    """Tests that hash made with outdated cost is replaced on login."""
+    outdated_hash = build_password_context(rounds=4).hash("testpassword")
+    create_user.password_hash = outdated_hash
+    await create_user.save()
+    url = fastapi_app.url_path_for("login")
+    login_data = {
+        "email": create_user.email,
+        "password": "testpassword",
+        "username": create_user.username,
+    }
+
+    response = await client.post(url, json=login_data)
+    assert response.status_code == status.HTTP_200_OK
+    await create_user.refresh_from_db()
+    assert create_user.password_hash != outdated_hash
+    assert not password_needs_update(create_user.password_hash)
+
+    response = await client.post(url, json=login_data)
+    assert response.status_code == status.HTTP_200_OK
@@ -1,9 +1,28 @@
+import asyncio
+import hashlib
+import threading
+import time
+from typing import Iterator
+from unittest.mock import Mock
+
+import pytest
+from fastapi import HTTPException
+from jose import jwt
+
 from test_task.services.auth.auth import (
     create_access_token,
     create_refresh_token,
     decode_access_token,
     decode_refresh_token,
+    get_current_user,
+    token_cache,
+    verify_token_access,
+)
+from test_task.services.auth.hashing import (
+    PasswordHasher,
+    build_password_context,
     get_hashed_password,
+    password_needs_update,
     verify_password,
 )
 
@@ -54,3 +73,102 @@ def test_decode_refresh_token() -> None:
     assert decoded_data.email == data["email"]
     assert decoded_data.username == data["username"]
     assert decoded_data.user_id == data["user_id"]
+
+
+@pytest.mark.anyio
+async def test_password_hasher_runs_in_pool() -> None:
+    """Tests that passwords are hashed and verified in threads."""
+    hasher = PasswordHasher(workers=2, queue_size=2)
+    hashed_password = await hasher.hash("testpassword")
+
+    assert await hasher.verify("testpassword", hashed_password)
+    assert not await hasher.verify("otherpassword", hashed_password)
+    assert not hasher.pending
+    hasher.shutdown()
+
+
+@pytest.mark.anyio
+async def test_password_hasher_rejects_when_full() -> None:
+    """Tests that calls beyond the queue are rejected with 503."""
+    hasher = PasswordHasher(workers=1, queue_size=0)
+    release = threading.Event()
+    blocked = asyncio.ensure_future(hasher.run(release.wait))
+    await asyncio.sleep(0)
+
+    try:
+        with pytest.raises(HTTPException) as rejected:
+            await hasher.verify("testpassword", "hashed")
+        assert rejected.value.status_code == 503  # noqa: WPS441
+    finally:
+        release.set()
+        await blocked
+        hasher.shutdown()
+
+    assert not hasher.pending
+
+
+@pytest.fixture
+def empty_token_cache() -> Iterator[None]:
+    """
+    Drop validated tokens before and after the test.
+
+    :yield: nothing.
+    """
+    token_cache.clear()
+    yield
+    token_cache.clear()
+
+
+@pytest.mark.usefixtures("empty_token_cache")
+def test_verify_token_access_caches_tokens(monkeypatch: pytest.MonkeyPatch) -> None:
+    """Tests that repeated tokens aren't decoded again."""
+    data = {"email": "test@example.com", "username": "testuser", "user_id": 1}
+    token = create_access_token(data)  # type: ignore
+    token_data = verify_token_access(token)
+    monkeypatch.setattr(jwt, "decode", Mock(side_effect=AssertionError))
+
+    assert verify_token_access(token) == token_data
+    assert len(token_cache) == 1
+
+
+@pytest.mark.usefixtures("empty_token_cache")
+def test_verify_token_access_skips_expired_tokens() -> None:
+    """Tests that expired tokens are rejected and not cached."""
+    data = {"email": "test@example.com", "username": "testuser", "user_id": 1}
+    token = create_access_token(data, expires_delta=-1)  # type: ignore
+
+    with pytest.raises(jwt.ExpiredSignatureError):
+        verify_token_access(token)
+    assert not len(token_cache)
+
+
+@pytest.mark.anyio
+@pytest.mark.usefixtures("empty_token_cache")
+async def test_expired_cached_token_is_rejected() -> None:
+    """Tests that cached token is rejected as before once it expires."""
+    data = {"email": "test@example.com", "username": "testuser", "user_id": 1}
+    token = create_access_token(data)  # type: ignore
+    token_data = verify_token_access(token)
+    digest = hashlib.sha256(token.encode()).hexdigest()
+    expired_at = int(time.time()) - 1
+    expired = token_data.model_copy(update={"exp": expired_at})
+    token_cache.set(digest, expired)
+
+    with pytest.raises(HTTPException) as rejected:
+        await get_current_user(token)
+    assert rejected.value.status_code == 403  # noqa: WPS441
+    assert rejected.value.detail == "Could not validate credentials"  # noqa: WPS441
+    assert token_cache.get(digest) is None
+
+
+def test_password_needs_update() -> None:
+    """Tests that hashes made with other cost need update."""
+    outdated_hash = build_password_context(rounds=4).hash("testpassword")
+    context = build_password_context(rounds=5)
+    current_hash = context.hash("testpassword")
+
+    assert context.needs_update(outdated_hash)
+    assert not context.needs_update(current_hash)
+    assert context.verify("testpassword", outdated_hash)
+    assert password_needs_update(outdated_hash)
+    assert not password_needs_update(get_hashed_password("testpassword"))
@@ -0,0 +1,841 @@
+import asyncio
+import json
+import uuid
+from typing import Dict, Iterator, List, Optional
+
+import pytest
+from fakeredis import FakeServer
+from fakeredis.aioredis import FakeRedis
+from fastapi import Depends, HTTPException
+from fastapi.responses import Response, UJSONResponse
+from pydantic import BaseModel
+from pytest_mock import MockerFixture
+from redis.asyncio import ConnectionPool, Redis, RedisError
+
+from test_task.services.redis.adaptive_ttl import AdaptiveTTL
+from test_task.services.redis.cache import (
+    MISSING,
+    BreakerState,
+    Cache,
+    CircuitBreaker,
+    cacheable,
+    get_cache,
+)
+from test_task.services.redis.compression import ZLIB, Compressor
+from test_task.services.redis.dependency import get_redis_pool
+from test_task.services.redis.hot_keys import HotKeys
+from test_task.services.redis.key_builder import CacheKeyBuilder
+from test_task.services.redis.local_cache import (
+    LocalCache,
+    listen_invalidations,
+    local_cache,
+)
+from test_task.services.redis.pending import PendingInvalidations
+from test_task.services.redis.sharding import HashRing
+from test_task.services.redis.sketch import HotKeySketch
+from test_task.services.redis.sweeper import sweep_stale_keys
+from test_task.services.redis.warmup import warm_cache
+from test_task.settings import settings
+
+
+class ItemDTO(BaseModel):
+    """DTO for cached test items."""
+
+    id: int
+
+
+def test_local_cache_evicts_least_recently_used() -> None:
+    """Tests that local cache is bounded."""
+    local = LocalCache(maxsize=2, ttl=60)
+    local.set("a", 1)
+    local.set("b", 2)
+    assert local.get("a") == 1
+    local.set("c", 3)
+
+    assert local.get("b") is None
+    assert local.get("a") == 1
+    assert local.get("c") == 3
+
+
+def test_local_cache_expires_entries() -> None:
+    """Tests that local cache entries expire."""
+    local = LocalCache(maxsize=2, ttl=60)
+    local.set("a", 1, ttl=0)
+    assert local.get("a") is None
+    assert not local
+
+
+@pytest.mark.anyio
+async def test_cache_serves_from_local_cache(
+    fake_redis_pool: ConnectionPool,
+) -> None:
+    """
+    Tests that local cache is used before redis.
+
+    :param fake_redis_pool: fake redis pool.
+    """
+    local = LocalCache(maxsize=10, ttl=60)
+    cache = Cache(fake_redis_pool, local=local)
+    test_key = uuid.uuid4().hex
+    await cache.set(test_key, "value")
+
+    async with Redis(connection_pool=fake_redis_pool) as redis:
+        await redis.delete(f"cache:{test_key}")
+
+    assert await cache.get(test_key) == "value"
+
+
+@pytest.mark.anyio
+async def test_local_cache_invalidated_by_other_worker(
+    fake_redis_pool: ConnectionPool,
+) -> None:
+    """
+    Tests that deleting key drops it from local caches of other workers.
+
+    :param fake_redis_pool: fake redis pool.
+    """
+    local = LocalCache(maxsize=10, ttl=60)
+    listener = asyncio.create_task(listen_invalidations(fake_redis_pool, local))
+    await asyncio.sleep(0.1)
+    test_key = uuid.uuid4().hex
+    await Cache(fake_redis_pool, local=local).set(test_key, "value")
+
+    await Cache(fake_redis_pool).delete(test_key)
+    for _ in range(50):
+        if local.get(f"cache:{test_key}") is None:
+            break
+        await asyncio.sleep(0.01)
+    listener.cancel()
+
+    assert local.get(f"cache:{test_key}") is None
+
+
+@pytest.mark.anyio
+async def test_invalidate_tags(fake_redis_pool: ConnectionPool) -> None:
+    """
+    Tests that keys are deleted by their tags.
+
+    :param fake_redis_pool: fake redis pool.
+    """
+    cache = Cache(fake_redis_pool)
+    await cache.set("item_1", "first", tags=["item:1", "item:list"])
+    await cache.set("item_2", "second", tags=["item:2", "item:list"])
+    await cache.set("items", "all", tags=["item:list"])
+
+    await cache.invalidate_tags("item:1")
+    assert await cache.get("item_1") is None
+    assert await cache.get("item_2") == b"second"
+
+    await cache.invalidate_tags("item:list")
+    assert await cache.get("item_2") is None
+    assert await cache.get("items") is None
+
+
+@pytest.mark.anyio
+async def test_tags_fall_back_to_namespaces(
+    fake_redis_pool: ConnectionPool,
+    mocker: MockerFixture,
+) -> None:
+    """
+    Tests that namespaces are invalidated if tag sets can't be read.
+
+    :param fake_redis_pool: fake redis pool.
+    :param mocker: mocker.
+    """
+    cache = Cache(fake_redis_pool)
+    await cache.set("items:1", "first", tags=["item:list"])
+    mocker.patch.object(cache, "_invalidate_tags", side_effect=RedisError)
+
+    assert await cache.invalidate_tags("item:list", namespaces=["items"])
+    assert await cache.get("items:1") is None
+
+
+@pytest.mark.anyio
+async def test_failed_invalidations_are_retried(
+    fake_redis_pool: ConnectionPool,
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    """
+    Tests that invalidations lost while redis is down are kept until it's up.
+
+    :param fake_redis_pool: fake redis pool.
+    :param monkeypatch: monkeypatch.
+    """
+    monkeypatch.setattr(settings, "cache_invalidation_retry_interval", 0.01)
+    server = fake_redis_pool.connection_kwargs["server"]
+    breaker = CircuitBreaker(failure_threshold=1, recovery_timeout=0.05)
+    cache = Cache(fake_redis_pool, breaker=breaker)
+    await cache.set("item_1", "first", tags=["item:1"])
+    await cache.set("item_2", "second")
+
+    server.connected = False
+    assert not await cache.invalidate_tags("item:1")
+    assert not await cache.delete("item_2")
+    assert breaker.snapshot()["state"] == BreakerState.OPEN
+    await asyncio.sleep(0.3)
+    assert cache.pending.tags == {"item:1"}
+    assert cache.pending.keys == {"item_2"}
+
+    server.connected = True
+    await asyncio.sleep(0.1)
+    assert not cache.pending
+    assert await cache.get("item_1") is None
+    assert await cache.get("item_2") is None
+
+
+def test_pending_overflow_flushes_cache() -> None:
+    """Tests that pending invalidations past the limit turn into flush."""
+    pending = PendingInvalidations(maxsize=2)
+    pending.add(keys=["item_1"], tags=["item:1"])
+    assert not pending.flush
+
+    pending.add(namespaces=["items"])
+    assert pending.flush
+    assert len(pending) == 1
+    assert pending.take().flush
+    assert not pending
+
+
+@pytest.mark.anyio
+async def test_concurrent_misses_run_handler_once(
+    fake_redis_pool: ConnectionPool,
+) -> None:
+    """
+    Tests that concurrent misses of one key are coalesced.
+
+    :param fake_redis_pool: fake redis pool.
+    """
+    calls = []
+
+    @cacheable(key_prefix=uuid.uuid4().hex, dto_model=ItemDTO)
+    async def handler(  # noqa: WPS430
+        item_id: int,
+        redis_pool: ConnectionPool,
+    ) -> ItemDTO:
+        calls.append(item_id)
+        await asyncio.sleep(0.05)
+        return ItemDTO(id=item_id)
+
+    results = await asyncio.gather(
+        *[handler(item_id=1, redis_pool=fake_redis_pool) for _ in range(10)],
+    )
+
+    assert calls == [1]
+    assert all(item.id == 1 for item in results)
+
+
+@pytest.mark.anyio
+async def test_waiting_for_other_worker(fake_redis_pool: ConnectionPool) -> None:
+    """
+    Tests that worker waits for the lock holder instead of filling the key.
+
+    :param fake_redis_pool: fake redis pool.
+    """
+    cache = Cache(fake_redis_pool)
+    token = await cache.acquire_lock("item", timeout=1)
+    assert token is not None
+    assert await cache.acquire_lock("item", timeout=1) is None
+
+    waiter = asyncio.create_task(cache.wait_for("item", timeout=1))
+    await cache.set("item", "value")
+    await cache.release_lock("item", token)
+
+    assert await waiter == b"value"
+    assert await cache.acquire_lock("item", timeout=1) is not None
+
+
+@pytest.mark.anyio
+async def test_stale_value_is_served_and_refreshed(
+    fake_redis_pool: ConnectionPool,
+) -> None:
+    """
+    Tests stale-while-revalidate mode.
+
+    :param fake_redis_pool: fake redis pool.
+    """
+    key_prefix = uuid.uuid4().hex
+    calls = []
+
+    @cacheable(key_prefix=key_prefix, dto_model=ItemDTO, stale_ttl=60)
+    async def handler(redis_pool: ConnectionPool) -> ItemDTO:  # noqa: WPS430
+        calls.append(True)
+        return ItemDTO(id=2)
+
+    cache = Cache(fake_redis_pool)
+    await cache.set(key_prefix, '{"stale_at": 0}\n{"id": 1}')
+
+    stale_item = await handler(redis_pool=fake_redis_pool)
+    assert stale_item.id == 1
+    for _ in range(50):
+        if calls:
+            break
+        await asyncio.sleep(0.01)
+    await asyncio.sleep(0.01)
+
+    fresh_item = await handler(redis_pool=fake_redis_pool)
+    assert fresh_item.id == 2
+    assert len(calls) == 1
+
+
+def test_cache_key_depends_on_all_parameters() -> None:
+    """Tests that every query parameter is part of the cache key."""
+
+    async def handler(  # noqa: WPS430
+        limit: int = 10,
+        offset: int = 0,
+        redis_pool: ConnectionPool = Depends(get_redis_pool),
+    ) -> None:
+        """Handler with pagination."""
+
+    build_key = CacheKeyBuilder(handler)
+    first_page = build_key("items", {"limit": 10, "offset": 0})
+
+    assert first_page == build_key("items", {})
+    assert first_page == build_key("items", {"offset": 0, "limit": 10})
+    assert first_page != build_key("items", {"limit": 10, "offset": 50})
+    assert first_page.startswith("items:")
+
+
+@pytest.mark.anyio
+async def test_cached_response_is_returned_raw(
+    fake_redis_pool: ConnectionPool,
+) -> None:
+    """
+    Tests that rendered response is cached and returned without DTOs.
+
+    :param fake_redis_pool: fake redis pool.
+    """
+
+    @cacheable(
+        key_prefix=uuid.uuid4().hex,
+        dto_model=ItemDTO,
+        response_class=UJSONResponse,
+    )
+    async def handler(redis_pool: ConnectionPool) -> List[ItemDTO]:  # noqa: WPS430
+        return [ItemDTO(id=1), ItemDTO(id=2)]
+
+    await handler(redis_pool=fake_redis_pool)
+    response = await handler(redis_pool=fake_redis_pool)
+
+    assert isinstance(response, Response)
+    assert response.headers["content-type"] == "application/json"
+    assert response.body == b'[{"id":1},{"id":2}]'
+
+
+@pytest.mark.anyio
+async def test_many_keys_operations(fake_redis_pool: ConnectionPool) -> None:
+    """
+    Tests batched get, set and delete.
+
+    :param fake_redis_pool: fake redis pool.
+    """
+    cache = Cache(fake_redis_pool)
+    await cache.set_many({"first": "1", "second": "2"}, expire={"first": 10})
+
+    assert await cache.get_many(["first", "missing", "second"]) == [
+        b"1",
+        None,
+        b"2",
+    ]
+    async with Redis(connection_pool=fake_redis_pool) as redis:
+        assert 0 < await redis.ttl("cache:first") <= 10
+
+    await cache.delete_many(["first", "second"])
+    assert await cache.get_many(["first", "second"]) == [None, None]
+
+
+@pytest.mark.anyio
+async def test_missing_entity_is_cached(fake_redis_pool: ConnectionPool) -> None:
+    """
+    Tests that missing entities are cached with negative ttl.
+
+    :param fake_redis_pool: fake redis pool.
+    """
+    key_prefix = uuid.uuid4().hex
+    calls = []
+
+    @cacheable(key_prefix=key_prefix, dto_model=ItemDTO, negative_ttl=5)
+    async def handler(redis_pool: ConnectionPool) -> None:  # noqa: WPS430
+        calls.append(True)
+
+    for _ in range(2):
+        with pytest.raises(HTTPException):
+            await handler(redis_pool=fake_redis_pool)
+
+    assert len(calls) == 1
+    async with Redis(connection_pool=fake_redis_pool) as redis:
+        assert await redis.get(f"cache:{key_prefix}") == MISSING
+        assert 0 < await redis.ttl(f"cache:{key_prefix}") <= 5
+
+
+@pytest.mark.anyio
+async def test_large_values_are_compressed(fake_redis_pool: ConnectionPool) -> None:
+    """
+    Tests that large values are compressed and old entries stay readable.
+
+    :param fake_redis_pool: fake redis pool.
+    """
+    cache = Cache(fake_redis_pool, compression=Compressor("zlib", min_size=100))
+    items = [{"id": index} for index in range(100)]
+    large_value = json.dumps(items).encode()
+    await cache.set("large", large_value)
+    await cache.set("small", b"\x02small")
+
+    async with Redis(connection_pool=fake_redis_pool) as redis:
+        assert await redis.getrange("cache:large", 0, 0) == ZLIB
+        assert await redis.strlen("cache:large") < len(large_value)
+        await redis.set("cache:legacy", b'{"id": 1}')
+
+    assert await cache.get("large") == large_value
+    assert await cache.get("small") == b"\x02small"
+    assert await cache.get_many(["legacy", "large"]) == [b'{"id": 1}', large_value]
+
+
+class ItemsDAO:
+    """DAO created by warmup outside of request."""
+
+    async def get_item(self, item_id: int) -> ItemDTO:
+        """
+        Get item.
+
+        :param item_id: item id.
+        :return: item.
+        """
+        return ItemDTO(id=item_id)
+
+
+@pytest.mark.anyio
+async def test_hot_keys_are_warmed(
+    fake_redis_pool: ConnectionPool,
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    """
+    Tests that the most requested keys are filled by warmup.
+
+    :param fake_redis_pool: fake redis pool.
+    :param monkeypatch: monkeypatch.
+    """
+    monkeypatch.setattr(settings, "cache_hot_keys_sample_rate", 1)
+    key_prefix = uuid.uuid4().hex
+    calls = []
+
+    @cacheable(key_prefix=key_prefix, dto_model=ItemDTO)
+    async def handler(  # noqa: WPS430
+        item_id: int,
+        items_dao: ItemsDAO = Depends(),
+        redis_pool: ConnectionPool = Depends(get_redis_pool),
+    ) -> ItemDTO:
+        calls.append(item_id)
+        return await items_dao.get_item(item_id)
+
+    await handler(item_id=7, items_dao=ItemsDAO(), redis_pool=fake_redis_pool)
+    hot_keys = HotKeys(fake_redis_pool)
+    for _ in range(50):
+        if await hot_keys.top(10):
+            break
+        await asyncio.sleep(0.01)
+    async with Redis(connection_pool=fake_redis_pool) as redis:
+        cached_keys = await redis.keys(f"cache:{key_prefix}*")
+        await redis.delete(*cached_keys)
+
+    assert await warm_cache(fake_redis_pool) == 1
+    assert await warm_cache(fake_redis_pool) == 0
+    assert calls == [7, 7]
+
+
+@pytest.mark.anyio
+async def test_circuit_breaker_skips_unhealthy_redis(
+    fake_redis_pool: ConnectionPool,
+) -> None:
+    """
+    Tests that breaker opens on failures and closes after successful probe.
+
+    :param fake_redis_pool: fake redis pool.
+    """
+    server = fake_redis_pool.connection_kwargs["server"]
+    server.connected = False
+    breaker = CircuitBreaker(failure_threshold=2, recovery_timeout=0.05)
+    cache = Cache(fake_redis_pool, breaker=breaker)
+
+    await cache.set("item", "value")
+    assert await cache.get("item") is None
+    assert breaker.snapshot()["state"] == BreakerState.OPEN
+    assert not breaker.allow()
+
+    server.connected = True
+    await asyncio.sleep(0.06)
+    await cache.set("item", "value")
+    assert breaker.snapshot()["state"] == BreakerState.CLOSED
+    assert await cache.get("item") == b"value"
+
+
+def test_cache_client_is_shared(fake_redis_pool: ConnectionPool) -> None:
+    """
+    Tests that one cache client is used per pool.
+
+    :param fake_redis_pool: fake redis pool.
+    """
+    assert get_cache(fake_redis_pool) is get_cache(fake_redis_pool)
+    assert get_cache(fake_redis_pool).local is local_cache
+
+
+@pytest.mark.anyio
+async def test_flush_bumps_version(fake_redis_pool: ConnectionPool) -> None:
+    """
+    Tests that flush and namespace invalidation keep other redis data.
+
+    :param fake_redis_pool: fake redis pool.
+    """
+    cache = Cache(fake_redis_pool)
+    await cache.set_many({"items:1": "item", "users:1": "user"})
+    async with Redis(connection_pool=fake_redis_pool) as redis:
+        await redis.set("taskiq:result", "kept")
+
+    await cache.invalidate_namespace("items")
+    assert await cache.get_many(["items:1", "users:1"]) == [None, b"user"]
+    await cache.set("items:1", "new item")
+    assert await cache.get("items:1") == b"new item"
+
+    await cache.flush()
+    assert await cache.get_many(["items:1", "users:1"]) == [None, None]
+    async with Redis(connection_pool=fake_redis_pool) as other_redis:
+        assert await other_redis.get("taskiq:result") == b"kept"
+        assert await other_redis.exists("cache:users:1")
+
+
+@pytest.mark.anyio
+async def test_sweeper_removes_old_versions(fake_redis_pool: ConnectionPool) -> None:
+    """
+    Tests that sweeper unlinks only unreachable keys.
+
+    :param fake_redis_pool: fake redis pool.
+    """
+    cache = Cache(fake_redis_pool)
+    await cache.set_many({"items:1": "old", "users:1": "user"}, expire=60)
+    await cache.set("items:2", "tagged", tags=["item:2"])
+    await cache.invalidate_namespace("items")
+    await cache.set("items:1", "new")
+    await cache.acquire_lock("items:1", timeout=10)
+
+    assert await sweep_stale_keys(fake_redis_pool, batch=1) == 2
+    assert await cache.get_many(["items:1", "users:1"]) == [b"new", b"user"]
+    async with Redis(connection_pool=fake_redis_pool) as redis:
+        assert await redis.exists("cache:lock:items:1", "cache:tag:item:2") == 2
+
+
+def test_hash_ring_remaps_skipped_node_keys() -> None:
+    """Tests that skipped node hands over only its own keys."""
+    ring = HashRing(["a", "b", "c"])
+    keys = [f"items:{index}" for index in range(300)]
+    nodes = {key: ring.get_node(key) for key in keys}
+
+    assert set(nodes.values()) == {"a", "b", "c"}
+    for key, node in nodes.items():
+        remapped = ring.get_node(key, skip={"b"})
+        assert remapped != "b"
+        if node != "b":
+            assert remapped == node
+    assert ring.get_node("items:1", skip={"a", "b", "c"}) is None
+
+
+@pytest.mark.anyio
+async def test_sharded_cache_spreads_keys(fake_redis_pool: ConnectionPool) -> None:
+    """
+    Tests that values are spread across shards and found there.
+
+    :param fake_redis_pool: fake redis pool.
+    """
+    shards = {node: FakeRedis(server=FakeServer()) for node in ("a", "b", "c")}
+    cache = Cache(
+        fake_redis_pool,
+        shards={node: shard.connection_pool for node, shard in shards.items()},
+    )
+    items = {f"items:{index}": str(index) for index in range(30)}
+
+    await cache.set_many(items, expire=60)
+    await cache.set("items:tagged", "tagged", tags=["item:tagged"])
+
+    cached_values = await cache.get_many(list(items))
+    assert cached_values == [item_value.encode() for item_value in items.values()]
+    for shard in shards.values():
+        assert await shard.dbsize()
+    async with Redis(connection_pool=fake_redis_pool) as redis:
+        assert not await redis.keys("cache:items:*")
+    await cache.invalidate_tags("item:tagged")
+    await cache.delete_many(list(items))
+    for emptied_shard in shards.values():
+        assert not await emptied_shard.dbsize()
+
+
+@pytest.mark.anyio
+async def test_sharded_cache_routes_around_failed_shard(
+    fake_redis_pool: ConnectionPool,
+) -> None:
+    """
+    Tests that keys of the failed shard go to other shards.
+
+    :param fake_redis_pool: fake redis pool.
+    """
+    servers = {node: FakeServer() for node in ("a", "b", "c")}
+    cache = Cache(
+        fake_redis_pool,
+        shards={
+            node: FakeRedis(server=server).connection_pool
+            for node, server in servers.items()
+        },
+    )
+    for node in servers:
+        cache.shard_breakers[node] = CircuitBreaker(failure_threshold=1)
+    keys = [f"items:{index}" for index in range(30)]
+    await cache.set_many(dict.fromkeys(keys, "value"), expire=60)
+    ring = HashRing(list(servers))
+    nodes = {key: ring.get_node(f"cache:{key}") for key in keys}
+    failed_keys = [key for key, key_node in nodes.items() if key_node == "b"]
+    expected: Dict[str, Optional[bytes]] = dict.fromkeys(keys, b"value")
+    expected.update(dict.fromkeys(failed_keys))
+    expected[failed_keys[0]] = b"moved"
+    servers["b"].connected = False
+
+    assert await cache.get(failed_keys[0]) is None
+    assert cache.shard_breakers["b"].state == BreakerState.OPEN
+    await cache.set(failed_keys[0], "moved")
+    assert await cache.get(failed_keys[0]) == b"moved"
+    assert await cache.get_many(keys) == list(expected.values())
+
+
+@pytest.mark.anyio
+async def test_recovered_shard_drops_invalidated_keys(
+    fake_redis_pool: ConnectionPool,
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    """
+    Tests that keys invalidated while their shard was down aren't served by it.
+
+    :param fake_redis_pool: fake redis pool.
+    :param monkeypatch: monkeypatch.
+    """
+    monkeypatch.setattr(settings, "cache_invalidation_retry_interval", 0.01)
+    servers = {node: FakeServer() for node in ("a", "b", "c")}
+    shards = {node: FakeRedis(server=server) for node, server in servers.items()}
+    cache = Cache(
+        fake_redis_pool,
+        shards={node: shard.connection_pool for node, shard in shards.items()},
+    )
+    for node in servers:
+        cache.shard_breakers[node] = CircuitBreaker(
+            failure_threshold=1,
+            recovery_timeout=0.05,
+        )
+    await cache.set("item_1", "stale", tags=["item:1"])
+    owner = str(HashRing(list(servers)).get_node("cache:item_1"))
+    servers[owner].connected = False
+
+    assert await cache.get("item_1") is None
+    await cache.set("item_1", "moved", tags=["item:1"])
+    assert await cache.invalidate_tags("item:1")
+    assert cache.pending.node_keys == {owner: {"cache:item_1"}}
+
+    servers[owner].connected = True
+    await asyncio.sleep(0.3)
+    assert not cache.pending
+    assert not await shards[owner].exists("cache:item_1")
+    assert await cache.get("item_1") is None
+
+
+def test_hot_key_sketch_keeps_most_accessed() -> None:
+    """Tests that sketch keeps the hottest keys in bounded top."""
+    sketch = HotKeySketch(size=2, width=1024, depth=4, decay_interval=1000)
+    for key, accesses in (("a", 5), ("b", 3), ("c", 1)):
+        for _ in range(accesses):
+            sketch.add(key)
+
+    assert sketch.top() == [("a", 5), ("b", 3)]
+    assert not sketch.is_hot("c")
+    for _ in range(4):
+        sketch.add("c")
+    assert sketch.top() == [("a", 5), ("c", 5)]
+    assert not sketch.is_hot("b")
+
+
+def test_hot_key_sketch_decays() -> None:
+    """Tests that old accesses weigh less."""
+    sketch = HotKeySketch(size=2, width=1024, depth=4, decay_interval=4)
+    for _ in range(4):
+        sketch.add("a")
+
+    assert sketch.top() == [("a", 2)]
+
+
+@pytest.mark.anyio
+async def test_hot_keys_live_longer_in_local_cache(
+    fake_redis_pool: ConnectionPool,
+) -> None:
+    """
+    Tests that only hot keys outlive local ttl.
+
+    :param fake_redis_pool: fake redis pool.
+    """
+    sketch = HotKeySketch(size=1, width=1024, depth=4, decay_interval=1000)
+    cache = Cache(fake_redis_pool, local=LocalCache(ttl=0), sketch=sketch)
+    await cache.set_many({"items:1": "hot", "items:2": "cold"})
+    await cache.get("items:1")
+    await cache.get("items:2")
+
+    async with Redis(connection_pool=fake_redis_pool) as redis:
+        await redis.delete("cache:items:1", "cache:items:2")
+    assert await cache.get_many(["items:1", "items:2"]) == [b"hot", None]
+
+
+@pytest.mark.anyio
+async def test_local_entries_expire_with_redis(fake_redis_pool: ConnectionPool) -> None:
+    """
+    Tests that local entries don't outlive redis values, even hot ones.
+
+    :param fake_redis_pool: fake redis pool.
+    """
+    sketch = HotKeySketch(size=2, width=1024, depth=4, decay_interval=1000)
+    cache = Cache(fake_redis_pool, local=LocalCache(ttl=60), sketch=sketch)
+    async with Redis(connection_pool=fake_redis_pool) as redis:
+        await redis.set("cache:items:1", "first", px=100)
+        await redis.set("cache:items:2", "second", px=100)
+
+    assert await cache.get("items:1") == b"first"
+    assert await cache.get_many(["items:2"]) == [b"second"]
+    assert sketch.is_hot("items:1")
+    await asyncio.sleep(0.2)
+    assert await cache.get_many(["items:1", "items:2"]) == [None, None]
+
+
+def test_adaptive_ttl_follows_reads_and_changes(mocker: MockerFixture) -> None:
+    """Tests that read keys live longer and changed keys expire sooner."""
+    clock = mocker.patch(
+        "test_task.services.redis.adaptive_ttl.time.monotonic",
+        return_value=0,
+    )
+    policy = AdaptiveTTL(min_ttl=10, max_ttl=100, min_reads=1, maxsize=10)
+    assert policy.ttl("item", 40) == 40
+
+    clock.return_value = 50
+    assert policy.ttl("item", 40) == 40
+    policy.read("item")
+    clock.return_value = 100
+    assert policy.ttl("item", 40) == 80
+    policy.read("item")
+    clock.return_value = 200
+    assert policy.ttl("item", 40) == 100
+
+    clock.return_value = 201
+    assert policy.ttl("item", 40) == 50
+    for _ in range(3):
+        policy.ttl("item", 40)
+    assert policy.ttl("item", 40) == 10
+
+
+@pytest.mark.anyio
+async def test_invalidated_keys_get_shorter_ttl(
+    fake_redis_pool: ConnectionPool,
+) -> None:
+    """
+    Tests that cacheable stores invalidated keys with adapted ttl.
+
+    :param fake_redis_pool: fake redis pool.
+    """
+    key_prefix = uuid.uuid4().hex
+
+    @cacheable(  # noqa: WPS430
+        key_prefix=key_prefix,
+        dto_model=ItemDTO,
+        expire=1000,
+        tags=["items"],
+        adaptive_ttl=True,
+    )
+    async def handler(redis_pool: ConnectionPool) -> ItemDTO:  # noqa: WPS430
+        return ItemDTO(id=1)
+
+    await handler(redis_pool=fake_redis_pool)
+    async with Redis(connection_pool=fake_redis_pool) as redis:
+        assert 500 < await redis.ttl(f"cache:{key_prefix}") <= 1000
+        await Cache(fake_redis_pool).invalidate_tags("items")
+        await handler(redis_pool=fake_redis_pool)
+        assert 0 < await redis.ttl(f"cache:{key_prefix}") <= 500
+
+
+@pytest.fixture
+def sharded_cache(
+    fake_redis_pool: ConnectionPool,
+    mocker: MockerFixture,
+) -> Iterator[Cache]:
+    """
+    Configure cache shards in fake redis servers.
+
+    :param fake_redis_pool: fake redis pool.
+    :param mocker: mocker.
+    :yield: shared cache client of the pool.
+    """
+    shards = {node: FakeRedis(server=FakeServer()) for node in ("a", "b", "c")}
+    mocker.patch.object(settings, "cache_shard_urls", list(shards))
+    mocker.patch(
+        "test_task.services.redis.cache.create_pool",
+        side_effect=lambda url: shards[url].connection_pool,
+    )
+    get_cache.cache_clear()
+    yield get_cache(fake_redis_pool)
+    get_cache.cache_clear()
+
+
+@pytest.mark.anyio
+async def test_sweeper_sweeps_shards(
+    fake_redis_pool: ConnectionPool,
+    sharded_cache: Cache,
+) -> None:
+    """
+    Tests that sweeper unlinks stale keys of every shard.
+
+    :param fake_redis_pool: fake redis pool.
+    :param sharded_cache: shared cache client with shards.
+    """
+    items = {f"items:{index}": "old" for index in range(10)}
+    await sharded_cache.set_many(items, expire=60)
+    await sharded_cache.set("users:1", "user")
+    await sharded_cache.invalidate_namespace("items")
+
+    assert await sweep_stale_keys(fake_redis_pool) == len(items)
+    shard_keys = [
+        await shard.keys("cache:*") for shard in sharded_cache.shards.values()
+    ]
+    assert [cache_key for keys in shard_keys for cache_key in keys] == [
+        b"cache:users:1",
+    ]
+
+
+@pytest.mark.anyio
+async def test_cacheable_uses_sharded_client(
+    fake_redis_pool: ConnectionPool,
+    sharded_cache: Cache,
+) -> None:
+    """
+    Tests that handler values are invalidated by the shared sharded client.
+
+    :param fake_redis_pool: fake redis pool.
+    :param sharded_cache: shared cache client with shards.
+    """
+    key_prefix = uuid.uuid4().hex
+    calls = []
+
+    @cacheable(  # noqa: WPS430
+        key_prefix=key_prefix,
+        dto_model=ItemDTO,
+        tags=["sharded:items"],
+        local_ttl=60,
+    )
+    async def handler(redis_pool: ConnectionPool) -> ItemDTO:  # noqa: WPS430
+        calls.append(True)
+        return ItemDTO(id=len(calls))
+
+    assert (await handler(redis_pool=fake_redis_pool)).id == 1
+    assert (await handler(redis_pool=fake_redis_pool)).id == 1
+    async with Redis(connection_pool=fake_redis_pool) as redis:
+        assert not await redis.exists(f"cache:{key_prefix}")
+
+    await sharded_cache.invalidate_tags("sharded:items")
+    assert (await handler(redis_pool=fake_redis_pool)).id == 2
@@ -1,9 +1,19 @@
+from typing import Any, Callable
+
 import pytest
 from fastapi import FastAPI, status
 from httpx import AsyncClient
+from redis.asyncio import ConnectionPool
 
 from test_task.db.dao.character_dao import CharacterDAO
+from test_task.db.dao.row_cache import row_cache
 from test_task.db.models.models import Character, User
+from test_task.services.redis.leaderboard import (
+    Board,
+    Leaderboards,
+    character_scores,
+    leaderboard_sync,
+)
 
 
 @pytest.mark.anyio
@@ -105,3 +115,127 @@ async def test_delete_character(
 
     deleted_character = await Character.filter(id=create_character.id).first()
     assert deleted_character is None
+
+
+@pytest.fixture
+def enabled_leaderboards(
+    fake_redis_pool: ConnectionPool,
+    enable_service: Callable[[Any], Any],
+) -> Leaderboards:
+    """
+    Keep leaderboards in sync with characters.
+
+    :param fake_redis_pool: fake redis pool.
+    :param enable_service: enables redis services.
+    :return: leaderboards.
+    """
+    enable_service(leaderboard_sync)
+    return Leaderboards(fake_redis_pool)
+
+
+@pytest.mark.anyio
+async def test_leaderboard_follows_characters(
+    fastapi_app: FastAPI,
+    client: AsyncClient,
+    create_user: User,
+    enabled_leaderboards: Leaderboards,
+) -> None:
+    """Tests that leaderboards are updated on create, edit and delete."""
+    dao = CharacterDAO()
+    first = await dao.create_character("First", create_user.id, level=2, experience=5)
+    second = await dao.create_character("Second", create_user.id, experience=50)
+    url = fastapi_app.url_path_for("get_leaderboard", board="level")
+
+    response = await client.get(url)
+    assert response.status_code == status.HTTP_200_OK
+    entries = response.json()
+    assert [entry["rank"] for entry in entries] == [1, 2]
+    character_ids = [entry["character"]["id"] for entry in entries]
+    assert character_ids == [first.id, second.id]
+
+    await dao.edit_character(second.id, level=3)
+    rank_url = fastapi_app.url_path_for(
+        "get_leaderboard_rank",
+        board="level",
+        character_id=second.id,
+    )
+    response = await client.get(rank_url)
+    assert response.json()["rank"] == 1
+    assert response.json()["character"]["level"] == 3
+
+    experience_url = fastapi_app.url_path_for("get_leaderboard", board="experience")
+    response = await client.get(experience_url, params={"limit": 1, "offset": 1})
+    entries = response.json()
+    assert [entry["character"]["id"] for entry in entries] == [first.id]
+
+    await second.delete()
+    response = await client.get(rank_url)
+    assert response.status_code == status.HTTP_404_NOT_FOUND
+    await first.delete()
+
+
+@pytest.mark.anyio
+async def test_leaderboard_waits_for_commit(
+    create_user: User,
+    enabled_leaderboards: Leaderboards,
+) -> None:
+    """
+    Tests that changes of rolled back transactions don't reach boards.
+
+    :param create_user: user.
+    :param enabled_leaderboards: leaderboards.
+    :raises RuntimeError: to roll the transaction back.
+    """
+    character = await CharacterDAO().create_character("Hero", create_user.id)
+    level_key = enabled_leaderboards.key(Board.LEVEL)
+    member = str(character.id)
+    first_score = character_scores(1, 0)[Board.LEVEL]
+
+    with pytest.raises(RuntimeError):
+        async with row_cache.transaction():
+            character.level = 10
+            await character.save()
+            raise RuntimeError("rollback")
+    assert await enabled_leaderboards.redis.zscore(level_key, member) == first_score
+
+    async with row_cache.transaction():
+        character.level = 5
+        await character.save()
+        score = await enabled_leaderboards.redis.zscore(level_key, member)
+        assert score == first_score
+    score = await enabled_leaderboards.redis.zscore(level_key, member)
+    assert score == character_scores(5, 0)[Board.LEVEL]
+    await character.delete()
+
+
+def test_experience_keeps_level_order() -> None:
+    """Tests that experience never outweighs the level."""
+    huge = character_scores(1, 1 << 40)
+    assert huge[Board.LEVEL] < character_scores(2, 0)[Board.LEVEL]
+    assert huge[Board.EXPERIENCE] == 1 << 40
+    negative = character_scores(2, -1)
+    assert negative[Board.LEVEL] == character_scores(2, 0)[Board.LEVEL]
+
+
+@pytest.mark.anyio
+async def test_leaderboard_rebuilt_from_db(
+    fastapi_app: FastAPI,
+    client: AsyncClient,
+    fake_redis_pool: ConnectionPool,
+    create_character: Character,
+) -> None:
+    """Tests that boards are rebuilt and deleted characters are dropped."""
+    leaderboards = Leaderboards(fake_redis_pool, batch=1)
+    assert not await leaderboards.exists()
+
+    assert await leaderboards.rebuild() == 1
+    assert await leaderboards.rank(Board.LEVEL, create_character.id) == 0
+    await leaderboards.update(create_character.id + 1, level=5, experience=0)
+
+    response = await client.get(
+        fastapi_app.url_path_for("get_leaderboard", board="level"),
+    )
+    assert [entry["rank"] for entry in response.json()] == [2]
+    assert await leaderboards.top(Board.LEVEL, limit=10, offset=0) == [
+        create_character.id,
+    ]
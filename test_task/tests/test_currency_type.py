@@ -1,6 +1,7 @@
 import pytest
 from fastapi import FastAPI, status
 from httpx import AsyncClient
+from pytest_mock import MockerFixture
 
 from test_task.db.dao.currency_type_dao import CurrencyTypeDAO
 from test_task.db.models.models import CurrencyType
@@ -89,3 +90,74 @@ async def test_delete_currency_type(
         id=create_currency_type.id,
     ).first()
     assert deleted_currency_type is None
+
+
+@pytest.mark.anyio
+async def test_edit_currency_type_invalidates_cache(
+    fastapi_app: FastAPI,
+    client: AsyncClient,
+    create_currency_type: CurrencyType,
+) -> None:
+    """Tests that editing currency type drops its cached copies."""
+    url = fastapi_app.url_path_for(
+        "get_currency_type_model",
+        currency_type_id=create_currency_type.id,
+    )
+    response = await client.get(url)
+    assert response.json()["name"] == "Gold"
+
+    edit_url = fastapi_app.url_path_for(
+        "edit_currency_type_model",
+        currency_type_id=create_currency_type.id,
+    )
+    await client.put(edit_url, json={"name": "Platinum", "description": ""})
+
+    response = await client.get(url)
+    assert response.json()["name"] == "Platinum"
+
+
+@pytest.mark.anyio
+async def test_currency_type_pages_cached_separately(
+    fastapi_app: FastAPI,
+    client: AsyncClient,
+    create_currency_type: CurrencyType,
+) -> None:
+    """Tests that every page of currency types has its own cache key."""
+    second_currency_type = await CurrencyType.create(name="Silver")
+    url = fastapi_app.url_path_for("get_currency_type_models")
+
+    first_page = await client.get(url, params={"limit": 1, "offset": 0})
+    second_page = await client.get(url, params={"limit": 1, "offset": 1})
+
+    assert first_page.json()[0]["id"] == create_currency_type.id
+    assert second_page.json()[0]["id"] == second_currency_type.id
+    await second_currency_type.delete()
+
+
+@pytest.mark.anyio
+async def test_missing_currency_type_cached(
+    fastapi_app: FastAPI,
+    client: AsyncClient,
+    create_currency_type: CurrencyType,
+    mocker: MockerFixture,
+) -> None:
+    """Tests negative caching of missing currency types."""
+    get_by_id = mocker.spy(CurrencyTypeDAO, "get_currency_type_by_id")
+    url = fastapi_app.url_path_for(
+        "get_currency_type_model",
+        currency_type_id=create_currency_type.id + 1,
+    )
+
+    for _ in range(3):
+        response = await client.get(url)
+        assert response.status_code == status.HTTP_404_NOT_FOUND
+    assert get_by_id.call_count == 1
+
+    create_url = fastapi_app.url_path_for("create_currency_type_model")
+    response = await client.post(create_url, json={"name": "Silver"})
+    assert response.json()["id"] == create_currency_type.id + 1
+
+    response = await client.get(url)
+    assert response.status_code == status.HTTP_200_OK
+    assert response.json()["name"] == "Silver"
+    await CurrencyType.filter(id=create_currency_type.id + 1).delete()
@@ -0,0 +1,143 @@
+from asyncio import LifoQueue
+from typing import Optional
+
+import pytest
+from fakeredis import FakeServer
+from fakeredis.aioredis import FakeConnection
+from fastapi import FastAPI
+from httpx import AsyncClient
+from redis.asyncio import Connection, ConnectionPool
+from starlette import status
+
+from test_task.services.redis.cache import Cache
+from test_task.services.redis.dependency import get_redis_pool
+from test_task.services.redis.metrics import cache_metrics, pool_stats
+from test_task.services.redis.sharding import create_pool
+from test_task.settings import settings
+
+
+@pytest.mark.anyio
+async def test_cache_metrics(
+    fastapi_app: FastAPI,
+    client: AsyncClient,
+    fake_redis_pool: ConnectionPool,
+) -> None:
+    """
+    Tests that cache hits, misses and latency are reported by key prefix.
+
+    :param fastapi_app: current application.
+    :param client: client for the app.
+    :param fake_redis_pool: fake redis pool.
+    """
+    cache_metrics.reset()
+    cache = Cache(fake_redis_pool)
+    await cache.get("items:1")
+    await cache.set("items:1", "value")
+    await cache.get("items:1")
+
+    url = fastapi_app.url_path_for("get_cache_metrics")
+    response = await client.get(url)
+
+    assert response.status_code == status.HTTP_200_OK
+    items_metrics = response.json()["items"]
+    assert items_metrics["hits"] == 1
+    assert items_metrics["misses"] == 1
+    assert items_metrics["errors"] == 0
+    assert items_metrics["latency"]["count"] == 3
+    assert items_metrics["latency"]["buckets"]["+Inf"] == 3
+
+
+@pytest.mark.anyio
+async def test_cache_hot_keys(
+    fastapi_app: FastAPI,
+    client: AsyncClient,
+    fake_redis_pool: ConnectionPool,
+) -> None:
+    """
+    Tests that the most accessed keys are reported.
+
+    :param fastapi_app: current application.
+    :param client: client for the app.
+    :param fake_redis_pool: fake redis pool.
+    """
+    cache = Cache(fake_redis_pool)
+    for _ in range(3):
+        await cache.get("items:1")
+    await cache.get_many(["items:1", "items:2"])
+
+    url = fastapi_app.url_path_for("get_cache_hot_keys")
+    response = await client.get(url)
+
+    assert response.status_code == status.HTTP_200_OK
+    assert response.json()[0] == {"key": "items:1", "count": 4}
+    assert {"key": "items:2", "count": 1} in response.json()
+
+
+@pytest.mark.anyio
+async def test_cache_breaker_state(
+    fastapi_app: FastAPI,
+    client: AsyncClient,
+) -> None:
+    """
+    Tests that state of the cache circuit breaker is reported.
+
+    :param fastapi_app: current application.
+    :param client: client for the app.
+    """
+    url = fastapi_app.url_path_for("get_cache_breaker")
+    response = await client.get(url)
+
+    assert response.status_code == status.HTTP_200_OK
+    assert response.json() == {"state": "closed", "failures": 0, "retry_in": None}
+
+
+@pytest.mark.anyio
+async def test_redis_pool_stats(
+    fastapi_app: FastAPI,
+    client: AsyncClient,
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    """
+    Tests that usage of the blocking pool made for the app is reported.
+
+    :param fastapi_app: current application.
+    :param client: client for the app.
+    :param monkeypatch: monkeypatch.
+    """
+    monkeypatch.setattr(settings, "redis_health_check_interval", 0)
+    pool = create_pool("redis://localhost")
+    pool.connection_class = FakeConnection  # type: ignore
+    pool.connection_kwargs["server"] = FakeServer()
+    fastapi_app.dependency_overrides[get_redis_pool] = lambda: pool
+    connection = await pool.get_connection("PING")
+
+    url = fastapi_app.url_path_for("get_redis_pool_stats")
+    response = await client.get(url)
+    await pool.release(connection)
+
+    assert response.status_code == status.HTTP_200_OK
+    assert response.json() == {
+        "max_connections": settings.redis_max_connections,
+        "created": 1,
+        "in_use": 1,
+        "idle": 0,
+    }
+    await pool.disconnect()
+
+
+def test_legacy_blocking_pool_stats() -> None:
+    """Tests counts of the blocking pool which keeps connections in a queue."""
+    pool = create_pool("redis://localhost")
+    connection = Connection()
+    pool._connections = [connection, Connection()]  # type: ignore  # noqa: WPS437
+    idle_connections: "LifoQueue[Optional[Connection]]" = LifoQueue()
+    for idle in (None, None, connection):
+        idle_connections.put_nowait(idle)
+    pool.pool = idle_connections  # type: ignore
+
+    assert pool_stats(pool) == {
+        "max_connections": settings.redis_max_connections,
+        "created": 2,
+        "in_use": 1,
+        "idle": 1,
+    }
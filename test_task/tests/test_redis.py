@@ -3,9 +3,12 @@ import uuid
 import pytest
 from fastapi import FastAPI
 from httpx import AsyncClient
+from pytest_mock import MockerFixture
 from redis.asyncio import ConnectionPool, Redis
 from starlette import status
 
+from test_task.services.redis.rate_limit import SlidingWindowLimiter
+
 
 @pytest.mark.anyio
 async def test_setting_value(
@@ -61,3 +64,27 @@ async def test_getting_value(
     assert response.status_code == status.HTTP_200_OK
     assert response.json()["key"] == test_key
     assert response.json()["value"] == test_val
+
+
+@pytest.mark.anyio
+async def test_sliding_window_limiter(
+    fake_redis_pool: ConnectionPool,
+    mocker: MockerFixture,
+) -> None:
+    """Tests that attempts are limited within the sliding window."""
+    clock = mocker.patch("test_task.services.redis.rate_limit.time.time")
+    clock.return_value = 1000
+    limiter = SlidingWindowLimiter(fake_redis_pool, window=10)
+    limits = {"ip": 2, "email": 3}
+
+    assert await limiter.hit(limits) == 0
+    clock.return_value = 1004
+    assert await limiter.hit(limits) == 0
+    assert await limiter.hit(limits) == 6
+    assert await limiter.hit({"email": 3}) == 0
+    assert await limiter.hit({"email": 3}) == 6
+
+    clock.return_value = 1010
+    assert await limiter.hit(limits) == 0
+    assert await limiter.hit(limits) == 4
+    assert await limiter.hit({"ip": 0}) == 0
@@ -0,0 +1,229 @@
+import asyncio
+from typing import Any, Callable
+
+import pytest
+from pytest_mock import MockerFixture
+from redis.asyncio import ConnectionPool
+from tortoise import connections
+
+from test_task.db.dao.character_dao import CharacterDAO
+from test_task.db.dao.currency_balance_dao import CurrencyBalanceDAO
+from test_task.db.dao.equipment_dao import EquipmentDAO
+from test_task.db.dao.row_cache import (
+    FENCE,
+    decode_row,
+    encode_row,
+    generate_row_key,
+    row_cache,
+)
+from test_task.db.dao.transaction_dao import TransactionDAO
+from test_task.db.models.models import (
+    Character,
+    CurrencyBalance,
+    Equipment,
+    Transaction,
+    User,
+)
+from test_task.services.redis.cache import Cache, circuit_breaker, get_cache
+from test_task.settings import settings
+
+
+@pytest.fixture
+def enabled_row_cache(
+    fake_redis_pool: ConnectionPool,
+    enable_service: Callable[[Any], Any],
+) -> ConnectionPool:
+    """
+    Enable read-through cache of DAO lookups.
+
+    :param fake_redis_pool: fake redis pool.
+    :param enable_service: enables redis services.
+    :return: redis pool of the cache.
+    """
+    enable_service(row_cache)
+    return fake_redis_pool
+
+
+@pytest.mark.anyio
+async def test_row_roundtrip(create_equipment: Equipment) -> None:
+    """Tests that cached row builds the same instance."""
+    equipment = decode_row(Equipment, encode_row(create_equipment))
+
+    assert equipment is not None
+    assert equipment.pk == create_equipment.pk
+    assert equipment.slot == create_equipment.slot
+    assert equipment.price == create_equipment.price
+    assert equipment.created_at == create_equipment.created_at
+    assert equipment.character_id == create_equipment.character_id  # type: ignore
+    assert equipment._saved_in_db  # noqa: WPS437
+
+
+@pytest.mark.anyio
+async def test_dao_lookup_is_cached(
+    enabled_row_cache: ConnectionPool,
+    create_character: Character,
+    mocker: MockerFixture,
+) -> None:
+    """Tests that repeated lookups don't query the row."""
+    dao = CharacterDAO()
+    await dao.get_character_by_id(create_character.id)
+    filter_spy = mocker.spy(Character, "filter")
+
+    character = await dao.get_character_by_id(create_character.id)
+
+    assert filter_spy.call_count == 0
+    assert character is not None
+    assert character.name == create_character.name
+    assert character.user.id == create_character.user_id  # type: ignore
+
+
+@pytest.mark.anyio
+async def test_dao_lookup_invalidated_on_save(
+    enabled_row_cache: ConnectionPool,
+    create_equipment: Equipment,
+) -> None:
+    """Tests that saved rows are dropped from the cache."""
+    dao = EquipmentDAO()
+    await dao.get_equipment_by_id(create_equipment.id)
+    await dao.edit_equipment(create_equipment.id, name="Renamed", power=42)
+
+    equipment = await dao.get_equipment_by_id(create_equipment.id)
+
+    assert equipment is not None
+    assert equipment.name == "Renamed"
+    assert equipment.power == 42
+
+
+@pytest.mark.anyio
+async def test_dao_lookup_invalidated_by_cascade(
+    enabled_row_cache: ConnectionPool,
+    create_character: Character,
+) -> None:
+    """Tests that rows deleted by cascade are dropped from the cache."""
+    dao = CharacterDAO()
+    await dao.get_character_by_id(create_character.id)
+    user = await User.get(id=create_character.user_id)  # type: ignore
+
+    await user.delete()
+
+    assert await dao.get_character_by_id(create_character.id) is None
+
+
+@pytest.mark.anyio
+async def test_fill_racing_with_edit_is_dropped(
+    enabled_row_cache: ConnectionPool,
+    create_currency_balance: CurrencyBalance,
+    mocker: MockerFixture,
+) -> None:
+    """Tests that row read before a concurrent edit isn't cached."""
+    dao = CurrencyBalanceDAO()
+    add = Cache.add
+
+    async def add_after_edit(  # noqa: WPS430
+        cache: Cache,
+        key: str,
+        cached_row: str,
+        expire: int,
+    ) -> bool:
+        await dao.edit_currency_balance(create_currency_balance.id, balance=100)
+        return await add(cache, key, cached_row, expire=expire)
+
+    mocker.patch.object(Cache, "add", add_after_edit)
+    await dao.get_currency_balance_by_id(create_currency_balance.id)
+
+    balance = await dao.get_currency_balance_by_id(create_currency_balance.id)
+    assert balance is not None
+    assert balance.balance == 100
+
+
+@pytest.mark.anyio
+async def test_edit_reads_row_from_database(
+    enabled_row_cache: ConnectionPool,
+    create_currency_balance: CurrencyBalance,
+) -> None:
+    """Tests that edits don't write back columns of the cached row."""
+    dao = CurrencyBalanceDAO()
+    await dao.get_currency_balance_by_id(create_currency_balance.id)
+    await CurrencyBalance.filter(id=create_currency_balance.id).update(balance=50)
+
+    await dao.edit_currency_balance(
+        create_currency_balance.id,
+        character_id=create_currency_balance.character_id,  # type: ignore
+    )
+
+    balance = await CurrencyBalance.get(id=create_currency_balance.id)
+    assert balance.balance == 50
+
+
+@pytest.mark.anyio
+async def test_rows_changed_in_transaction_are_fenced(
+    enabled_row_cache: ConnectionPool,
+    create_character: Character,
+) -> None:
+    """Tests that transactions don't fill the cache and fence saved rows."""
+    dao = CharacterDAO()
+    key = generate_row_key(Character, create_character.id)
+    cache = get_cache(enabled_row_cache)
+
+    async with row_cache.transaction():
+        character = await dao.get_character_by_id(create_character.id)
+        assert character is not None
+        assert await cache.get(key) is None
+        character.level = 2
+        await character.save()
+    assert await cache.get(key) == FENCE
+
+    await cache.delete(key)
+    character = await dao.get_character_by_id(create_character.id)
+    assert character is not None
+    assert character.level == 2
+
+
+@pytest.mark.anyio
+async def test_failed_invalidation_is_retried(
+    enabled_row_cache: ConnectionPool,
+    create_character: Character,
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    """Tests that rows changed while redis is down are dropped after it's up."""
+    monkeypatch.setattr(settings, "cache_invalidation_retry_interval", 0.01)
+    dao = CharacterDAO()
+    await dao.get_character_by_id(create_character.id)
+    key = generate_row_key(Character, create_character.id)
+    cache = get_cache(enabled_row_cache)
+    server = enabled_row_cache.connection_kwargs["server"]
+
+    server.connected = False
+    await row_cache.invalidate(create_character)
+    assert cache.pending.keys == {key}
+
+    server.connected = True
+    circuit_breaker.reset()
+    await asyncio.sleep(0.1)
+    assert not cache.pending
+    assert await cache.get(key) is None
+
+
+@pytest.mark.anyio
+async def test_cached_relations_skip_database(
+    enabled_row_cache: ConnectionPool,
+    create_transaction: Transaction,
+    mocker: MockerFixture,
+) -> None:
+    """Tests that relations of the cached row are read from the cache too."""
+    dao = TransactionDAO()
+    await dao.get_transaction_by_id(create_transaction.id)
+    db_client = connections.get("default")
+    query_spy = mocker.spy(db_client, "execute_query")
+    dict_query_spy = mocker.spy(db_client, "execute_query_dict")
+
+    transaction = await dao.get_transaction_by_id(create_transaction.id)
+
+    assert transaction is not None
+    assert query_spy.call_count == 0
+    assert dict_query_spy.call_count == 0
+    currency_type_id = create_transaction.currency_type_id  # type: ignore
+    character_id = create_transaction.character_to_id  # type: ignore
+    assert transaction.currency_type.id == currency_type_id
+    assert transaction.character_to.id == character_id
+    assert transaction.item is None
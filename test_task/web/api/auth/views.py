@@ -1,6 +1,7 @@
 from typing import Dict
 
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Request, status
+from tortoise.exceptions import IntegrityError
 
 from test_task.db.models.models import Role, User
 from test_task.services.auth.auth import (
@@ -8,48 +9,84 @@ from test_task.services.auth.auth import (
     create_refresh_token,
     decode_refresh_token,
     get_current_user,
-    get_hashed_password,
-    verify_password,
 )
+from test_task.services.auth.hashing import password_hasher, password_needs_update
+from test_task.services.auth.login_limiter import login_limiter
+from test_task.services.auth.taken_names import taken_names
 from test_task.web.api.auth.schema import CreateUser, LoginUser, Token, UserOutput
 
 router = APIRouter()
 
 
+async def _upgrade_password_hash(user: User, password: str) -> None:
+    """
+    Hash the password again if the hash was made with outdated settings.
+
+    Hash is kept if the hashing pool is busy, it's replaced on the next login.
+
+    :param user: user who has logged in.
+    :param password: verified password.
+    """
+    if not password_needs_update(user.password_hash):
+        return
+    try:
+        user.password_hash = await password_hasher.hash(password)
+    except HTTPException:
+        return
+    await user.save(update_fields=["password_hash"])
+
+
 @router.post("/register", response_model=UserOutput)
 async def create_user(data: CreateUser) -> UserOutput:
     """
     Create user in database.
 
+    Emails which are definitely free by the filter of taken names
+    skip the lookup, unique constraints reject the rest.
+
     :param data: user data.
     :raises HTTPException: HTTPException.
     :return: user model.
     """
-    user = await User.filter(email=data.email).first()
-    if user is not None:
+    if await taken_names.might_be_taken(data.email, data.username):
+        user = await User.filter(email=data.email).first()
+        if user is not None:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="User with this email already exist",
+            )
+    role = await Role.get(id=1)
+    try:
+        user = await User.create(
+            email=data.email,
+            username=data.username,
+            password_hash=await password_hasher.hash(data.password),
+            role=role,
+        )
+    except IntegrityError:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
-            detail="User with this email already exist",
+            detail="User with this email or username already exist",
         )
-    role = await Role.get(id=1)
-    user = await User.create(
-        email=data.email,
-        username=data.username,
-        password_hash=get_hashed_password(data.password),
-        role=role,
-    )
     return UserOutput.model_validate(user)
 
 
 @router.post("/login", response_model=Token)
-async def login(form_data: LoginUser) -> Token:
+async def login(form_data: LoginUser, request: Request) -> Token:
     """
     Login user.
 
+    Attempts are throttled by client address and email
+    before the user is looked up. Hashes made with outdated
+    scheme or cost are replaced after successful login.
+
     :param form_data: user data.
+    :param request: current request.
     :raises HTTPException: HTTPException.
     :return: access and refresh token.
     """
+    client_ip = request.client.host if request.client else None
+    await login_limiter.check(client_ip, form_data.email)
     user = await User.filter(email=form_data.email).first()
     if user is None:
         raise HTTPException(
@@ -58,11 +95,12 @@ async def login(form_data: LoginUser) -> Token:
         )
 
     hashed_pass = user.password_hash
-    if not verify_password(form_data.password, hashed_pass):
+    if not await password_hasher.verify(form_data.password, hashed_pass):
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="Incorrect email or password",
         )
+    await _upgrade_password_hash(user, form_data.password)
 
     data = {
         "email": str(user.email),
@@ -27,6 +27,17 @@ class CharacterModelIDDTO(BaseModel):
     model_config = ConfigDict(from_attributes=True)
 
 
+class LeaderboardEntryDTO(BaseModel):
+    """
+    DTO for leaderboard entries.
+
+    Rank starts from 1.
+    """
+
+    rank: int
+    character: CharacterModelDTO
+
+
 class CharacterModelInputDTO(BaseModel):
     """DTO for creating new character model."""
 
@@ -1,11 +1,18 @@
 from typing import List
 
-from fastapi import APIRouter
+from fastapi import APIRouter, HTTPException, status
 from fastapi.param_functions import Depends
+from redis.asyncio import ConnectionPool
 
 from test_task.db.dao.character_dao import CharacterDAO
 from test_task.db.models.models import Character
-from test_task.web.api.character.schema import CharacterModelDTO, CharacterModelInputDTO
+from test_task.services.redis.dependency import get_redis_pool
+from test_task.services.redis.leaderboard import Board, Leaderboards
+from test_task.web.api.character.schema import (
+    CharacterModelDTO,
+    CharacterModelInputDTO,
+    LeaderboardEntryDTO,
+)
 
 router = APIRouter()
 
@@ -27,6 +34,78 @@ async def get_character_models(
     return await character_dao.get_all_characters(limit=limit, offset=offset)
 
 
+@router.get("/leaderboard/{board}/", response_model=List[LeaderboardEntryDTO])
+async def get_leaderboard(
+    board: Board,
+    limit: int = 10,
+    offset: int = 0,
+    character_dao: CharacterDAO = Depends(),
+    redis_pool: ConnectionPool = Depends(get_redis_pool),
+) -> List[LeaderboardEntryDTO]:
+    """
+    Retrieve page of the leaderboard.
+
+    Characters which are already deleted are dropped from the board.
+
+    :param board: leaderboard name.
+    :param limit: limit of characters, defaults to 10.
+    :param offset: offset of characters, defaults to 0.
+    :param character_dao: DAO for character models.
+    :param redis_pool: redis connection pool.
+    :return: characters with their ranks.
+    """
+    leaderboards = Leaderboards(redis_pool)
+    character_ids = await leaderboards.top(board, limit=limit, offset=offset)
+    characters = await character_dao.get_characters_by_ids(character_ids)
+    await leaderboards.remove(
+        *[
+            character_id
+            for character_id in character_ids
+            if character_id not in characters
+        ],
+    )
+    return [
+        LeaderboardEntryDTO(
+            rank=offset + index + 1,
+            character=CharacterModelDTO.model_validate(characters[character_id]),
+        )
+        for index, character_id in enumerate(character_ids)
+        if character_id in characters
+    ]
+
+
+@router.get("/leaderboard/{board}/{character_id}/", response_model=LeaderboardEntryDTO)
+async def get_leaderboard_rank(
+    board: Board,
+    character_id: int,
+    character_dao: CharacterDAO = Depends(),
+    redis_pool: ConnectionPool = Depends(get_redis_pool),
+) -> LeaderboardEntryDTO:
+    """
+    Retrieve rank of the character on the leaderboard.
+
+    :param board: leaderboard name.
+    :param character_id: character_id.
+    :param character_dao: DAO for character models.
+    :param redis_pool: redis connection pool.
+    :raises HTTPException: if character isn't on the board.
+    :return: character with its rank.
+    """
+    rank = await Leaderboards(redis_pool).rank(board, character_id)
+    character = None
+    if rank is not None:
+        character = await character_dao.get_character_by_id(character_id)
+    if rank is None or character is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Character is not on the leaderboard",
+        )
+    return LeaderboardEntryDTO(
+        rank=rank + 1,
+        character=CharacterModelDTO.model_validate(character),
+    )
+
+
 @router.get("/{character_id}/", response_model=CharacterModelDTO)
 async def get_character_model(
     character_id: int,
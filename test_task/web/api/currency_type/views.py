@@ -1,13 +1,15 @@
-from typing import List
+from typing import List, Optional
 
 from fastapi import APIRouter
 from fastapi.param_functions import Depends
-from redis.asyncio import Redis
+from fastapi.responses import UJSONResponse
+from redis.asyncio import ConnectionPool
 
 from test_task.db.dao.currency_type_dao import CurrencyTypeDAO
 from test_task.db.models.models import CurrencyType
-from test_task.services.redis.cache import cacheable
+from test_task.services.redis.cache import cacheable, get_cache
 from test_task.services.redis.dependency import get_redis_pool
+from test_task.settings import settings
 from test_task.web.api.currency_type.schema import (
     CurrencyTypeModelDTO,
     CurrencyTypeModelInputDTO,
@@ -15,14 +17,29 @@ from test_task.web.api.currency_type.schema import (
 
 router = APIRouter()
 
+# Cache tags of currency types.
+CURRENCY_TYPE_TAG = "currency_type:{currency_type_id}"
+CURRENCY_TYPES_TAG = "currency_type:list"
+# Key prefixes of cached currency types, invalidated if tags can't be.
+CURRENCY_TYPE_PREFIX = "type_model"
+CURRENCY_TYPES_PREFIX = "type_models"
+
 
 @router.get("/", response_model=List[CurrencyTypeModelDTO])
-@cacheable(key_prefix="type_models", dto_model=CurrencyTypeModelDTO)
+@cacheable(
+    key_prefix=CURRENCY_TYPES_PREFIX,
+    dto_model=CurrencyTypeModelDTO,
+    local_ttl=settings.cache_local_ttl,
+    stale_ttl=settings.cache_stale_ttl,
+    adaptive_ttl=True,
+    tags=["currency_type", CURRENCY_TYPES_TAG],
+    response_class=UJSONResponse,
+)
 async def get_currency_type_models(
     limit: int = 10,
     offset: int = 0,
     currency_type_dao: CurrencyTypeDAO = Depends(),
-    redis_pool: Redis = Depends(get_redis_pool),
+    redis_pool: ConnectionPool = Depends(get_redis_pool),
 ) -> List[CurrencyType]:
     """
     Retrieve all currency_type objects from the database.
@@ -37,23 +54,32 @@ async def get_currency_type_models(
 
 
 @router.get("/{currency_type_id}/", response_model=CurrencyTypeModelDTO)
-@cacheable(key_prefix="type_model", dto_model=CurrencyTypeModelDTO)
+@cacheable(
+    key_prefix=CURRENCY_TYPE_PREFIX,
+    dto_model=CurrencyTypeModelDTO,
+    local_ttl=settings.cache_local_ttl,
+    stale_ttl=settings.cache_stale_ttl,
+    adaptive_ttl=True,
+    tags=["currency_type", CURRENCY_TYPE_TAG],
+)
 async def get_currency_type_model(
     currency_type_id: int,
     currency_type_dao: CurrencyTypeDAO = Depends(),
-    redis_pool: Redis = Depends(get_redis_pool),
-) -> CurrencyTypeModelDTO:
+    redis_pool: ConnectionPool = Depends(get_redis_pool),
+) -> Optional[CurrencyTypeModelDTO]:
     """
     Retrieve currency_type object from the database.
 
     :param currency_type_id: currency_type_id.
     :param currency_type_dao: DAO for currency_type models.
     :param redis_pool: redis pool dependency.
-    :return: currency_type object from database.
+    :return: currency_type object from database or None if it's missing.
     """
     currency_type = await currency_type_dao.get_currency_type_by_id(
         type_id=currency_type_id,
     )
+    if currency_type is None:
+        return None
     return CurrencyTypeModelDTO.model_validate(currency_type)
 
 
@@ -62,6 +88,7 @@ async def edit_currency_type_model(
     currency_type_id: int,
     new_currency_type_object: CurrencyTypeModelInputDTO,
     currency_type_dao: CurrencyTypeDAO = Depends(),
+    redis_pool: ConnectionPool = Depends(get_redis_pool),
 ) -> None:
     """
     Creates currency_type model in the database.
@@ -69,19 +96,25 @@ async def edit_currency_type_model(
     :param currency_type_id: currency_type_id.
     :param new_currency_type_object: new currency_type model item.
     :param currency_type_dao: DAO for currency_type models.
+    :param redis_pool: redis pool dependency.
     """
     await currency_type_dao.edit_currency_type(
         type_id=currency_type_id,
         name=new_currency_type_object.name,
         description=new_currency_type_object.description,
     )
+    await get_cache(redis_pool).invalidate_tags(
+        CURRENCY_TYPE_TAG.format(currency_type_id=currency_type_id),
+        CURRENCY_TYPES_TAG,
+        namespaces=(CURRENCY_TYPE_PREFIX, CURRENCY_TYPES_PREFIX),
+    )
 
 
 @router.post("/", response_model=CurrencyTypeModelDTO)
 async def create_currency_type_model(
     new_currency_type_object: CurrencyTypeModelInputDTO,
     currency_type_dao: CurrencyTypeDAO = Depends(),
-    redis_pool: Redis = Depends(get_redis_pool),
+    redis_pool: ConnectionPool = Depends(get_redis_pool),
 ) -> CurrencyTypeModelDTO:
     """
     Creates currency_type model in the database.
@@ -95,6 +128,11 @@ async def create_currency_type_model(
         name=new_currency_type_object.name,
         description=new_currency_type_object.description,
     )
+    await get_cache(redis_pool).invalidate_tags(
+        CURRENCY_TYPE_TAG.format(currency_type_id=currency_type.id),
+        CURRENCY_TYPES_TAG,
+        namespaces=(CURRENCY_TYPE_PREFIX, CURRENCY_TYPES_PREFIX),
+    )
     return CurrencyTypeModelDTO.model_validate(currency_type)
 
 
@@ -102,13 +140,20 @@ async def create_currency_type_model(
 async def delete_currency_type_model(
     currency_type_id: int,
     currency_type_dao: CurrencyTypeDAO = Depends(),
+    redis_pool: ConnectionPool = Depends(get_redis_pool),
 ) -> None:
     """
     Deletes currency_type model in the database.
 
     :param currency_type_id: currency_type id.
     :param currency_type_dao: DAO for currency_type models.
+    :param redis_pool: redis pool dependency.
     """
     currency_type = await currency_type_dao.get_currency_type_by_id(currency_type_id)
     if currency_type:
         await currency_type.delete()
+        await get_cache(redis_pool).invalidate_tags(
+            CURRENCY_TYPE_TAG.format(currency_type_id=currency_type_id),
+            CURRENCY_TYPES_TAG,
+            namespaces=(CURRENCY_TYPE_PREFIX, CURRENCY_TYPES_PREFIX),
+        )
@@ -5,9 +5,9 @@ from aio_pika import Channel, DeliveryMode, Message
 from aio_pika.pool import Pool
 from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException, status
 from tortoise.exceptions import ValidationError
-from tortoise.transactions import in_transaction
 
 from test_task.db.dao.equipment_dao import EquipmentDAO
+from test_task.db.dao.row_cache import row_cache
 from test_task.db.models.models import (
     Character,
     CurrencyBalance,
@@ -233,7 +233,7 @@ async def transfer_item(
     :param equipment_dao: DAO for equipment models.
     :raises HTTPException: HTTPException
     """
-    async with in_transaction() as connection:
+    async with row_cache.transaction() as connection:
         item_from = await equipment_dao.filter_equipment(
             equipment_id=transfer_object.item_id,
             character_id=transfer_object.character_from,
@@ -0,0 +1,47 @@
+from typing import Dict, Optional
+
+from pydantic import BaseModel
+
+from test_task.services.redis.cache import BreakerState
+
+
+class LatencyHistogramDTO(BaseModel):
+    """DTO for latency histogram of redis calls."""
+
+    buckets: Dict[str, int]
+    count: int
+    sum: float  # noqa: WPS125
+
+
+class CacheMetricsDTO(BaseModel):
+    """DTO for cache metrics of one key prefix."""
+
+    hits: int
+    misses: int
+    errors: int
+    stale: int
+    latency: LatencyHistogramDTO
+
+
+class CircuitBreakerDTO(BaseModel):
+    """DTO for state of the cache circuit breaker."""
+
+    state: BreakerState
+    failures: int
+    retry_in: Optional[float]
+
+
+class RedisPoolDTO(BaseModel):
+    """DTO for usage of the redis connection pool."""
+
+    max_connections: int
+    created: int
+    in_use: int
+    idle: int
+
+
+class HotKeyDTO(BaseModel):
+    """DTO for access count of the hot cache key."""
+
+    key: str
+    count: int
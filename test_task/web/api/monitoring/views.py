@@ -1,4 +1,18 @@
-from fastapi import APIRouter
+from typing import Dict, List
+
+from fastapi import APIRouter, Depends
+from redis.asyncio import ConnectionPool
+
+from test_task.services.redis.cache import circuit_breaker
+from test_task.services.redis.dependency import get_redis_pool
+from test_task.services.redis.metrics import cache_metrics, pool_stats
+from test_task.services.redis.sketch import key_sketch
+from test_task.web.api.monitoring.schema import (
+    CacheMetricsDTO,
+    CircuitBreakerDTO,
+    HotKeyDTO,
+    RedisPoolDTO,
+)
 
 router = APIRouter()
 
@@ -10,3 +24,60 @@ def health_check() -> None:
 
     It returns 200 if the project is healthy.
     """
+
+
+@router.get("/cache/metrics", response_model=Dict[str, CacheMetricsDTO])
+def get_cache_metrics() -> Dict[str, CacheMetricsDTO]:
+    """
+    Get cache metrics by key prefixes.
+
+    Metrics are collected by the worker which handles the request.
+    Latency buckets are cumulative, bounds are in seconds.
+
+    :return: cache metrics.
+    """
+    return {
+        label: CacheMetricsDTO.model_validate(metrics)
+        for label, metrics in cache_metrics.snapshot().items()
+    }
+
+
+@router.get("/cache/hot-keys", response_model=List[HotKeyDTO])
+def get_cache_hot_keys() -> List[HotKeyDTO]:
+    """
+    Get the most accessed cache keys.
+
+    Counts are estimated by the worker which handles the request
+    and halved periodically, so they follow recent traffic.
+
+    :return: hot keys, the most accessed first.
+    """
+    return [HotKeyDTO(key=key, count=count) for key, count in key_sketch.top()]
+
+
+@router.get("/cache/breaker", response_model=CircuitBreakerDTO)
+def get_cache_breaker() -> CircuitBreakerDTO:
+    """
+    Get state of the cache circuit breaker.
+
+    Open breaker means redis is skipped and requests go to the database.
+
+    :return: circuit breaker state.
+    """
+    return CircuitBreakerDTO.model_validate(circuit_breaker.snapshot())
+
+
+@router.get("/cache/pool", response_model=RedisPoolDTO)
+def get_redis_pool_stats(
+    redis_pool: ConnectionPool = Depends(get_redis_pool),
+) -> RedisPoolDTO:
+    """
+    Get usage of the redis connection pool of this worker.
+
+    In use connections close to max_connections mean
+    requests wait for a free connection.
+
+    :param redis_pool: redis pool dependency.
+    :return: pool usage.
+    """
+    return RedisPoolDTO.model_validate(pool_stats(redis_pool))
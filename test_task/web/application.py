@@ -28,17 +28,18 @@ def get_app() -> FastAPI:
         default_response_class=UJSONResponse,
     )
 
-    # Adds startup and shutdown events.
-    register_startup_event(app)
-    register_shutdown_event(app)
-
-    # Main router for the API.
-    app.include_router(router=api_router, prefix="/api")
     # Configures tortoise orm.
+    # It goes first, so database is ready when cache is warmed on startup.
     register_tortoise(
         app,
         config=TORTOISE_CONFIG,
         add_exception_handlers=True,
     )
+    # Adds startup and shutdown events.
+    register_startup_event(app)
+    register_shutdown_event(app)
+
+    # Main router for the API.
+    app.include_router(router=api_router, prefix="/api")
 
     return app
@@ -1,9 +1,76 @@
+import asyncio
 from typing import Awaitable, Callable
 
 from fastapi import FastAPI
+from loguru import logger
+from redis.asyncio import RedisError
+from tortoise.exceptions import OperationalError
 
+from test_task.services.auth.hashing import password_hasher
+from test_task.services.auth.taken_names import taken_names
 from test_task.services.rabbit.lifetime import init_rabbit, shutdown_rabbit
+from test_task.services.redis.cache import get_cache
+from test_task.services.redis.leaderboard import leaderboard_sync
 from test_task.services.redis.lifetime import init_redis, shutdown_redis
+from test_task.services.redis.warmup import warm_cache
+from test_task.settings import settings
+
+# Lock which lets only one worker build redis indexes.
+REDIS_INDEXES_LOCK = "redis_indexes"
+
+
+async def _warm_cache(app: FastAPI) -> None:  # pragma: no cover
+    """
+    Fill hot cache keys before the worker starts serving requests.
+
+    Warming never blocks startup longer than cache_warmup_timeout.
+
+    :param app: the fastAPI application.
+    """
+    try:
+        await asyncio.wait_for(
+            warm_cache(app.state.redis_pool),
+            timeout=settings.cache_warmup_timeout,
+        )
+    except asyncio.TimeoutError:
+        logger.warning("Cache warmup timed out")
+
+
+async def _build_missing_indexes() -> None:  # pragma: no cover
+    """Build filter of registered names and leaderboards if they're missing."""
+    users = await taken_names.build_if_missing()
+    if users:
+        logger.info(f"Registration filter built from {users} users")
+    characters = await leaderboard_sync.build_if_missing()
+    if characters:
+        logger.info(f"Leaderboards built from {characters} characters")
+
+
+async def _build_redis_indexes(app: FastAPI) -> None:  # pragma: no cover
+    """
+    Build redis structures which mirror the database.
+
+    Filter of registered names and leaderboards are built
+    unless other worker builds or has built them.
+    Building never blocks startup longer than cache_warmup_timeout.
+
+    :param app: the fastAPI application.
+    """
+    cache = get_cache(app.state.redis_pool)
+    timeout = settings.cache_warmup_timeout
+    token = await cache.acquire_lock(REDIS_INDEXES_LOCK, timeout)
+    if token is None:
+        logger.info("Redis indexes are built by other worker")
+        return
+    try:
+        await asyncio.wait_for(_build_missing_indexes(), timeout=timeout)
+    except asyncio.TimeoutError:
+        logger.warning("Redis indexes build timed out")
+    except (RedisError, OperationalError) as err:
+        logger.error("Redis indexes build error")
+        logger.error(err)
+    finally:
+        await cache.release_lock(REDIS_INDEXES_LOCK, token)
 
 
 def register_startup_event(
@@ -24,6 +91,9 @@ def register_startup_event(
         app.middleware_stack = None
         init_redis(app)
         init_rabbit(app)
+        await _build_redis_indexes(app)
+        if settings.cache_warmup_on_startup:
+            await _warm_cache(app)
         app.middleware_stack = app.build_middleware_stack()
         pass  # noqa: WPS420
 
@@ -44,6 +114,7 @@ def register_shutdown_event(
     async def _shutdown() -> None:  # noqa: WPS430
         await shutdown_redis(app)
         await shutdown_rabbit(app)
+        password_hasher.shutdown()
         pass  # noqa: WPS420
 
     return _shutdown